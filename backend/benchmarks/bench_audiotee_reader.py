@@ -0,0 +1,126 @@
+"""Compare the zero-copy AudioTee reader against the original 2 KB reads.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_audiotee_reader --minutes 10 --speed 20
+
+A fake AudioTee subprocess writes synthetic 16 kHz PCM to its stdout in
+10 ms writes, paced at --speed times real time (0 = as fast as the pipe
+accepts it, which mostly measures kernel copies).  Each reader consumes
+the stream the way AudioRecorder does, metering every read, and reports
+CPU time on the reader thread per captured second of audio, the number of
+reads, and whether both captured the same bytes.
+"""
+
+import argparse
+import hashlib
+import subprocess
+import sys
+import time
+
+from services.frame_store import FrameStore, read_stream_into
+from services.level_meter import LevelMeter
+
+RATE = 16000
+LEGACY_READ_BYTES = 1024 * 2
+
+# Writes `seconds` of deterministic PCM in AudioTee-sized (~10 ms) writes
+FAKE_AUDIOTEE = """
+import sys, time
+rate, seconds, speed = int(sys.argv[1]), float(sys.argv[2]), float(sys.argv[3])
+chunk = bytes(range(256)) * (rate // 100 * 2 // 256 + 1)
+chunk = chunk[: rate // 100 * 2]
+out = sys.stdout.buffer
+started = time.perf_counter()
+for i in range(int(seconds * 100)):
+    out.write(chunk)
+    if speed:
+        ahead = (i + 1) / 100 / speed - (time.perf_counter() - started)
+        if ahead > 0:
+            time.sleep(ahead)
+out.flush()
+"""
+
+
+def _spawn(seconds: float, speed: float, bufsize: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-c", FAKE_AUDIOTEE, str(RATE), str(seconds), str(speed)],
+        stdout=subprocess.PIPE,
+        bufsize=bufsize,
+    )
+
+
+def legacy_reader(seconds: float, speed: float) -> tuple[float, int, str]:
+    proc = _spawn(seconds, speed, bufsize=-1)
+    meter = LevelMeter(RATE)
+    frames: list[bytes] = []
+    reads = 0
+    cpu_start = time.thread_time()
+    while True:
+        data = proc.stdout.read(LEGACY_READ_BYTES)
+        reads += 1
+        if not data:
+            break
+        frames.append(data)
+        meter.update(data)
+    cpu = time.thread_time() - cpu_start
+    proc.wait()
+    return cpu, reads, hashlib.sha1(b"".join(frames)).hexdigest()
+
+
+def zero_copy_reader(seconds: float, speed: float) -> tuple[float, int, str]:
+    proc = _spawn(seconds, speed, bufsize=0)
+    meter = LevelMeter(RATE)
+    store = FrameStore()
+    reads = 0
+
+    def on_data(view):
+        nonlocal reads
+        reads += 1
+        meter.update(view)
+
+    cpu_start = time.thread_time()
+    read_stream_into(
+        proc.stdout,
+        store,
+        keep_going=lambda: True,
+        on_data=on_data,
+    )
+    cpu = time.thread_time() - cpu_start
+    proc.wait()
+    digest = hashlib.sha1()
+    for block in store:
+        digest.update(block)
+    return cpu, reads, digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=20,
+        help="Pace output at this multiple of real time (0 = unpaced)",
+    )
+    args = parser.parse_args()
+
+    seconds = args.minutes * 60
+    print(f"{args.minutes:g} min of {RATE} Hz mono PCM, speed {args.speed or 'max'}")
+    print(f"{'reader':<10} {'CPU ms':>10} {'µs/audio s':>12} {'reads':>10}")
+    digests = []
+    for name, fn in (("legacy", legacy_reader), ("zero-copy", zero_copy_reader)):
+        cpu, reads, digest = fn(seconds, args.speed)
+        digests.append(digest)
+        print(
+            f"{name:<10} {cpu * 1000:>10.1f} {cpu / seconds * 1e6:>12.1f} {reads:>10}"
+        )
+
+    identical = digests[0] == digests[1]
+    print(f"Captured bytes identical: {identical}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
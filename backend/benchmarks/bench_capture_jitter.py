@@ -0,0 +1,135 @@
+"""Measure capture-thread jitter while another recording is finalized.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_capture_jitter --minutes 60 --runs 3
+
+A simulated mic drain thread wakes every CHUNK / DEVICE_RATE seconds (as
+PortAudio delivers buffers) and decimates and meters one chunk, like
+AudioRecorder._drain_mic.  Meanwhile a --minutes meeting is finalized from
+its spool files, the way meeting A is when meeting B has just started:
+
+    idle     nothing else running (baseline)
+    inline   mixed on a thread of this process (before the audio pool)
+    pool     mixed in the audio process pool (services.audio_executor)
+
+Reports how late the drain thread woke over all --runs (p50 / p99 / max),
+how many passes were later than one chunk period (the ring buffer has to
+absorb those) and the median finalize time.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from services.audio_executor import AudioExecutor, mix_recording
+from services.level_meter import LevelMeter
+from services.resampler import StreamingResampler
+
+CHUNK = 1024
+DEVICE_RATE = 44100
+RATE = 16000
+PERIOD = CHUNK / DEVICE_RATE
+
+
+def write_spools(directory: str, minutes: float) -> tuple[str, str]:
+    rng = np.random.default_rng(0)
+    paths = []
+    for name in ("mic", "system"):
+        path = os.path.join(directory, f"meeting.{name}.pcm")
+        with open(path, "wb") as f:
+            remaining = int(minutes * 60 * RATE)
+            while remaining:
+                n = min(remaining, RATE * 60)
+                f.write(rng.integers(-8000, 8000, n, dtype=np.int16).tobytes())
+                remaining -= n
+        paths.append(path)
+    return paths[0], paths[1]
+
+
+def drain_loop(stop: threading.Event, lateness: list[float]):
+    resampler = StreamingResampler(DEVICE_RATE, RATE)
+    meter = LevelMeter(RATE)
+    chunk = np.random.default_rng(1).integers(-8000, 8000, CHUNK, np.int16).tobytes()
+    due = time.perf_counter()
+    while not stop.is_set():
+        due += PERIOD
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        lateness.append(max(0.0, time.perf_counter() - due))
+        meter.update(resampler.process(chunk))
+        if time.perf_counter() - due > PERIOD:
+            due = time.perf_counter()  # fell behind: resync, like the ring
+
+
+def run(mode: str, spools: tuple[str, str], out_path: str, executor, mix_mode: str):
+    lateness: list[float] = []
+    stop = threading.Event()
+    drainer = threading.Thread(target=drain_loop, args=(stop, lateness))
+    drainer.start()
+    time.sleep(0.5)
+    started = time.perf_counter()
+    if mode == "inline":
+        worker = threading.Thread(
+            target=mix_recording, args=(*spools, out_path, mix_mode, RATE)
+        )
+        worker.start()
+        worker.join()
+    elif mode == "pool":
+        executor.run(mix_recording, *spools, out_path, mix_mode, RATE)
+    else:
+        time.sleep(2.0)
+    finalize = time.perf_counter() - started
+    time.sleep(0.2)
+    stop.set()
+    drainer.join()
+    return lateness, (finalize if mode != "idle" else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=60.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--mode", choices=("mixed", "multitrack"), default="mixed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spools = write_spools(tmp, args.minutes)
+        out_path = os.path.join(tmp, "meeting.wav")
+        executor = AudioExecutor()
+        executor.warm_up()
+        executor.run(time.sleep, 0.1)
+
+        print(
+            f"{args.minutes:g} min {args.mode} finalize, drain period "
+            f"{PERIOD * 1000:.1f} ms, {args.runs} runs pooled\n"
+        )
+        print(
+            f"{'':<7} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} "
+            f"{'late':>6} {'finalize s':>11}"
+        )
+        for mode in ("idle", "inline", "pool"):
+            lateness, finalize = [], []
+            for _ in range(args.runs):
+                run_lateness, run_finalize = run(
+                    mode, spools, out_path, executor, args.mode
+                )
+                lateness += run_lateness
+                finalize.append(run_finalize)
+            ms = np.array(lateness) * 1000
+            late = int((ms > PERIOD * 1000).sum())
+            print(
+                f"{mode:<7} {np.percentile(ms, 50):>7.2f} "
+                f"{np.percentile(ms, 99):>7.2f} {ms.max():>7.1f} "
+                f"{late:>3}/{len(ms):<4} {np.median(finalize):>8.2f}"
+            )
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
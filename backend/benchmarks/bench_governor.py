@@ -0,0 +1,149 @@
+"""Compare the rate governor against fixed-backoff retries under a quota.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_governor --jobs 8 --requests 6
+
+A fake server admits at most --quota requests per one-second window and
+answers the rest with a 429 carrying a retryDelay hint (the shape of a
+Gemini RESOURCE_EXHAUSTED error); a small share of requests also fail with
+a 503.  --jobs threads each make --requests calls (think chunked note
+generation for several recordings at once), either with the old
+per-call 5/10/20 s backoff (time-scaled by --time-scale) or through a
+shared RateGovernor.  Reports wall time, successful throughput, failed
+calls and how many 429s the server had to send.
+"""
+
+import argparse
+import math
+import random
+import threading
+import time
+
+from services.rate_governor import RateGovernor
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class QuotaServer:
+    """Fixed-window quota with simulated latency and transient failures."""
+
+    def __init__(self, quota: int, latency: float, error_rate: float, seed: int):
+        self.quota = quota
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._window = 0
+        self._count = 0
+        self.rejected = 0
+
+    def request(self):
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            window = int(elapsed)
+            if window != self._window:
+                self._window, self._count = window, 0
+            if self._count >= self.quota:
+                self.rejected += 1
+                retry = math.ceil(window + 1 - elapsed)
+                raise FakeAPIError(
+                    429,
+                    "RESOURCE_EXHAUSTED. {'@type': "
+                    "'type.googleapis.com/google.rpc.RetryInfo', "
+                    f"'retryDelay': '{retry}s'}}",
+                )
+            self._count += 1
+            fail = self._rng.random() < self.error_rate
+        time.sleep(self.latency)
+        if fail:
+            raise FakeAPIError(503, "UNAVAILABLE")
+        return "ok"
+
+
+def legacy_call(server: QuotaServer, time_scale: float):
+    """The old router/chunk retry loop: 3 attempts, 5/10 s backoff."""
+    last_error = None
+    for attempt in range(1, 4):
+        try:
+            return server.request()
+        except Exception as e:
+            last_error = e
+            if attempt < 3:
+                time.sleep(5 * (2 ** (attempt - 1)) * time_scale)
+    raise last_error
+
+
+def run(name: str, call, jobs: int, requests: int) -> tuple[float, int, int]:
+    ok = failed = 0
+    lock = threading.Lock()
+
+    def job():
+        nonlocal ok, failed
+        for _ in range(requests):
+            try:
+                call()
+                result = 1
+            except Exception:
+                result = 0
+            with lock:
+                ok += result
+                failed += 1 - result
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=job) for _ in range(jobs)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started, ok, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=6)
+    parser.add_argument("--quota", type=int, default=5, help="Requests per second")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=0.1,
+        help="Multiplier for the legacy backoff delays (1 = real 5/10 s)",
+    )
+    args = parser.parse_args()
+
+    total = args.jobs * args.requests
+    print(
+        f"{args.jobs} jobs x {args.requests} requests, quota {args.quota}/s, "
+        f"{args.error_rate:.0%} transient errors"
+    )
+    print(f"{'strategy':<10} {'wall (s)':>9} {'ok/s':>7} {'failed':>7} {'429s':>6}")
+
+    server = QuotaServer(args.quota, args.latency, args.error_rate, seed=1)
+    wall, ok, failed = run(
+        "legacy", lambda: legacy_call(server, args.time_scale), args.jobs, args.requests
+    )
+    print(f"{'legacy':<10} {wall:>9.2f} {ok / wall:>7.2f} {failed:>7} {server.rejected:>6}")
+
+    server = QuotaServer(args.quota, args.latency, args.error_rate, seed=1)
+    governor = RateGovernor(
+        requests_per_minute=args.quota * 60,
+        max_concurrency=args.jobs,
+        base_delay=0.2,
+    )
+    wall, ok, failed = run(
+        "governor", lambda: governor.call(server.request), args.jobs, args.requests
+    )
+    print(f"{'governor':<10} {wall:>9.2f} {ok / wall:>7.2f} {failed:>7} {server.rejected:>6}")
+    print(f"({total} calls per strategy; governor stats: {governor.stats})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""Load-test the backend's HTTP endpoints with concurrent app windows.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_http_load --notes 10000 --saved 200 --windows 4
+
+Builds a synthetic vault (--notes notes files, --transcripts transcripts
+with --segments indexed segments each) and a backlog of --saved saved
+recordings in a temp directory, and points the app at it through a
+throwaway .env.  Google Calendar is replaced by a fake that blocks for
+--google-latency per call (like the real client) and Gemini by the fake
+provider (--gemini-latency per call).
+
+Each of --windows simulated app windows then runs the frontend's polling
+loops (see POLLERS: status, levels, notes list, saved recordings,
+calendar) plus a user looking up transcript segments and asking about a
+meeting, with every interval divided by --speedup.  Requests go through
+httpx's ASGI transport to the app in this process, for --duration seconds.
+Reports requests, throughput and p50/p95/p99/max latency per endpoint.
+Latency counts from when a poll was due, so time spent waiting on a
+blocked event loop is included.
+
+As a regression gate: --save-baseline FILE records the results, and
+--baseline FILE exits with status 1 if any endpoint's p95 is more than
+--tolerance above the baseline's (plus --slack-ms), or if any request
+failed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import wave
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# (name, method, path, interval seconds in the frontend).  Paths are
+# formatted with the synthetic data's names.
+POLLERS = [
+    ("status", "GET", "/api/recording/status", 2.0),
+    ("levels", "GET", "/api/recording/levels", 0.5),
+    ("notes_list", "GET", "/api/notes/list", 30.0),
+    ("saved", "GET", "/api/recording/saved", 30.0),
+    ("calendar_upcoming", "GET", "/api/calendar/upcoming", 60.0),
+    ("current_meeting", "GET", "/api/calendar/current-meeting", 60.0),
+    ("setup_status", "GET", "/api/settings/setup-status", 60.0),
+    ("segments", "GET", "/api/notes/transcripts/{transcript}/segments?at={at}", 5.0),
+    ("ask", "POST", "/api/notes/transcripts/{transcript}/ask", 30.0),
+]
+
+SPEAKERS = ["Alice", "Bob", "Carol", "Dan"]
+
+
+# ---- Fakes ----
+
+
+class FakeCalendarService:
+    """Stands in for CalendarService: blocking calls with a fixed latency."""
+
+    def __init__(self, latency: float, meetings: int = 10):
+        self.latency = latency
+        now = datetime.now().astimezone()
+        self.meetings = [
+            {
+                "id": f"event{i}",
+                "title": f"Sync {i}",
+                "start": (now + timedelta(hours=i)).isoformat(),
+                "end": (now + timedelta(hours=i, minutes=30)).isoformat(),
+                "attendees": [
+                    {"name": n, "email": f"{n.lower()}@example.com", "organizer": False}
+                    for n in SPEAKERS[: 1 + i % len(SPEAKERS)]
+                ],
+                "description": "",
+                "meeting_link": "",
+            }
+            for i in range(meetings)
+        ]
+
+    def get_upcoming_meetings(self, max_results: int = 10) -> list[dict]:
+        time.sleep(self.latency)
+        return self.meetings[:max_results]
+
+    def get_current_meeting(self) -> dict | None:
+        for meeting in self.get_upcoming_meetings():
+            if len(meeting["attendees"]) >= 2:
+                return meeting
+        return None
+
+
+# ---- Synthetic data ----
+
+
+def build_vault(root: str, notes: int, transcripts: int, segments: int) -> list[str]:
+    """Write notes and transcripts (with segment sidecars); return transcript names."""
+    from services.transcript_index import segments_to_text, write_segments
+
+    notes_dir = os.path.join(root, "notes")
+    transcript_dir = os.path.join(root, "transcripts")
+    os.makedirs(notes_dir)
+    os.makedirs(transcript_dir)
+    start = datetime(2024, 1, 1, 9)
+    for i in range(notes):
+        timestamp = (start + timedelta(hours=i)).strftime("%Y-%m-%d_%H-%M-%S")
+        with open(os.path.join(notes_dir, f"{timestamp}_Sync_{i}_notes.md"), "w") as f:
+            f.write(f"# Sync {i}\n\n## Discussion Points\n- Item {i}\n")
+
+    names = []
+    for i in range(transcripts):
+        timestamp = (start + timedelta(hours=i)).strftime("%Y-%m-%d_%H-%M-%S")
+        name = f"{timestamp}_Sync_{i}_transcript.md"
+        segs = [
+            {
+                "start": j * 6.0,
+                "end": j * 6.0 + 5.5,
+                "speaker": SPEAKERS[j % len(SPEAKERS)],
+                "text": f"Point {j} about the rollout plan and follow-up item {j % 17}.",
+            }
+            for j in range(segments)
+        ]
+        path = os.path.join(transcript_dir, name)
+        with open(path, "w") as f:
+            f.write(f"# Transcript: Sync {i}\n\n---\n\n{segments_to_text(segs)}")
+        write_segments(segs, os.path.splitext(path)[0])
+        names.append(name)
+    return names
+
+
+def build_saved_backlog(directory: str, count: int):
+    """Saved recordings in SavedRecordingStore's layout, with 1 s of audio each."""
+    os.makedirs(directory)
+    audio = np.zeros(16000, dtype=np.int16).tobytes()
+    saved_at = datetime.now() - timedelta(days=1)
+    for i in range(count):
+        recording_id = f"2024-02-01_10-{i // 60 % 60:02d}-{i % 60:02d}_Failed_{i}"
+        with wave.open(os.path.join(directory, f"{recording_id}.wav"), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(16000)
+            wf.writeframes(audio)
+        meta = {
+            "audio_filename": f"{recording_id}.wav",
+            "audio_format": "wav",
+            "wav_bytes": len(audio) + 44,
+            "stored_bytes": len(audio) + 44,
+            "title": f"Failed {i}",
+            "timestamp": recording_id[:19],
+            "meeting_info": {"title": f"Failed {i}"},
+            "last_error": "Gemini quota exceeded",
+            "retry_count": 1,
+            "saved_at": saved_at.isoformat(),
+        }
+        with open(os.path.join(directory, f"{recording_id}.json"), "w") as f:
+            json.dump(meta, f)
+
+
+def configure_app(root: str, args) -> tuple[object, list[str]]:
+    """Point the app at the synthetic data and fakes; return (app, transcripts)."""
+    from routers import calendar, recording
+    from services.settings_store import settings_store
+
+    transcripts = build_vault(root, args.notes, args.transcripts, args.segments)
+    saved_dir = os.path.join(root, "saved-recordings")
+    build_saved_backlog(saved_dir, args.saved)
+    credentials_path = os.path.join(root, "credentials.json")
+    with open(credentials_path, "w") as f:
+        json.dump({"installed": {}}, f)
+
+    # A throwaway .env, so a developer's real settings don't leak in
+    settings_store.env_path = os.path.join(root, ".env")
+    settings_store.update(
+        {
+            "GEMINI_API_KEY": "fake",
+            "AI_PROVIDER": "fake",
+            "FAKE_PROVIDER_LATENCY": str(args.gemini_latency),
+            "NOTES_DIR": os.path.join(root, "notes"),
+            "TRANSCRIPT_DIR": os.path.join(root, "transcripts"),
+            "GOOGLE_CREDENTIALS_PATH": credentials_path,
+            "GOOGLE_TOKEN_PATH": os.path.join(root, "token.json"),
+        }
+    )
+    recording.SAVED_RECORDINGS_DIR = saved_dir
+    recording._saved_store = None
+    fake_calendar = FakeCalendarService(args.google_latency)
+    calendar._get_calendar_service = lambda: fake_calendar
+
+    # main.py's load_dotenv() fills os.environ from the real .env, and
+    # settings missing from ours fall back to os.environ. load_dotenv()
+    # never overrides, so blank the real file's keys first.
+    from dotenv import dotenv_values, find_dotenv
+
+    real_env = find_dotenv()
+    for key in dotenv_values(real_env) if real_env else {}:
+        if key not in settings_store.all():
+            os.environ[key] = ""
+
+    from main import app
+
+    return app, transcripts
+
+
+# ---- Load ----
+
+
+async def poll(client, name, method, path, interval, deadline, transcripts, results):
+    rng = random.Random(hash((name, id(results))))
+    # Windows don't poll in lockstep
+    due = time.perf_counter() + rng.uniform(0, interval)
+    while due < deadline:
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        url = path.format(
+            transcript=rng.choice(transcripts), at=rng.uniform(0, 3600)
+        )
+        body = {"question": "What did we decide?"} if method == "POST" else None
+        try:
+            response = await client.request(method, url, json=body)
+            data = response.json()
+            ok = response.status_code == 200 and not (
+                isinstance(data, dict)
+                and (data.get("status") == "error" or data.get("error"))
+            )
+        except Exception:
+            ok = False
+        # Measured from when the request was due, not when this coroutine
+        # got to send it: a blocked event loop delays both
+        finished = time.perf_counter()
+        results[name]["latencies"].append(finished - due)
+        if not ok:
+            results[name]["errors"] += 1
+        due = max(due + interval, finished)
+
+
+async def run_load(app, transcripts: list[str], args) -> dict:
+    import httpx
+
+    results = {name: {"latencies": [], "errors": 0} for name, *_ in POLLERS}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://loadtest", timeout=60
+    ) as client:
+        # One untimed request per endpoint so lazy imports aren't measured
+        for name, method, path, _ in POLLERS:
+            url = path.format(transcript=transcripts[0], at=0)
+            body = {"question": "warm-up"} if method == "POST" else None
+            await client.request(method, url, json=body)
+
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(
+            *(
+                poll(
+                    client,
+                    name,
+                    method,
+                    path,
+                    interval / args.speedup,
+                    deadline,
+                    transcripts,
+                    results,
+                )
+                for _ in range(args.windows)
+                for name, method, path, interval in POLLERS
+            )
+        )
+    return results
+
+
+def summarize(results: dict, duration: float) -> dict:
+    summary = {}
+    for name, r in results.items():
+        ms = np.array(r["latencies"]) * 1000
+        if not len(ms):
+            continue
+        summary[name] = {
+            "requests": len(ms),
+            "rps": len(ms) / duration,
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p95_ms": float(np.percentile(ms, 95)),
+            "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max()),
+            "errors": r["errors"],
+        }
+    return summary
+
+
+def print_summary(summary: dict):
+    print(
+        f"{'endpoint':<18} {'reqs':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8} {'errors':>6}"
+    )
+    for name, s in summary.items():
+        print(
+            f"{name:<18} {s['requests']:>6} {s['rps']:>7.1f} {s['p50_ms']:>8.1f} "
+            f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['max_ms']:>8.1f} "
+            f"{s['errors']:>6}"
+        )
+
+
+def check_baseline(summary: dict, baseline: dict, tolerance: float, slack_ms: float):
+    """Return a list of regressions against `baseline`."""
+    failures = []
+    for name, s in summary.items():
+        if s["errors"]:
+            failures.append(f"{name}: {s['errors']} failed requests")
+        base = baseline.get(name)
+        if base is None:
+            continue
+        limit = base["p95_ms"] * (1 + tolerance) + slack_ms
+        if s["p95_ms"] > limit:
+            failures.append(
+                f"{name}: p95 {s['p95_ms']:.1f} ms > {limit:.1f} ms "
+                f"(baseline {base['p95_ms']:.1f} ms)"
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=10_000)
+    parser.add_argument("--transcripts", type=int, default=20)
+    parser.add_argument("--segments", type=int, default=600, help="Per transcript")
+    parser.add_argument("--saved", type=int, default=200)
+    parser.add_argument("--windows", type=int, default=4)
+    parser.add_argument("--speedup", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--google-latency", type=float, default=0.15)
+    parser.add_argument("--gemini-latency", type=float, default=0.5)
+    parser.add_argument("--save-baseline", metavar="FILE")
+    parser.add_argument("--baseline", metavar="FILE")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--slack-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    os.environ["BACKGROUND_WARMUP"] = "0"
+    with tempfile.TemporaryDirectory(prefix="bench-http-") as root:
+        print(
+            f"Vault: {args.notes} notes, {args.transcripts} transcripts x "
+            f"{args.segments} segments; {args.saved} saved recordings\n"
+            f"{args.windows} windows, polling {args.speedup:g}x faster than the "
+            f"frontend, for {args.duration:g}s\n"
+        )
+        app, transcripts = configure_app(root, args)
+        results = asyncio.run(run_load(app, transcripts, args))
+    summary = summarize(results, args.duration)
+    print_summary(summary)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = check_baseline(summary, baseline, args.tolerance, args.slack_ms)
+        if failures:
+            print("\nRegressions:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Compare cached meeting context against re-sending the transcript.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_meeting_context --tokens 60000 --questions 3
+
+Generates every note template plus --questions follow-up questions for one
+synthetic transcript of about --tokens tokens, against the fake provider.
+The fake provider charges --latency seconds per call plus --token-latency
+seconds per 1000 input tokens, with cached tokens counting at a quarter
+(Gemini's cached-token discount).  "inline" sends the full transcript with
+every prompt, as format_notes does today; "cached" creates one context
+cache and sends only the prompts.  Reports wall time, tokens sent and
+billed-equivalent input tokens.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from services.ai_provider import FakeProvider
+from services.meeting_context import SYSTEM_INSTRUCTION, MeetingContextStore
+from services.note_templates import NOTE_TEMPLATES, get_template
+from services.transcript_compaction import compact_transcript
+
+SPEAKERS = ["Alice", "Bob", "Carol", "Dan"]
+
+
+def make_transcript(tokens: int) -> str:
+    lines = []
+    size = 0
+    i = 0
+    while size < tokens * 4:
+        seconds = i * 7
+        line = (
+            f"[{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}] "
+            f"{SPEAKERS[i % len(SPEAKERS)]}: Point {i} about the rollout plan, "
+            f"the migration timeline and who owns follow-up item {i % 17}.\n"
+        )
+        lines.append(line)
+        size += len(line)
+        i += 1
+    return "".join(lines)
+
+
+def report(name: str, provider: FakeProvider, wall: float):
+    sent = provider.prompt_chars // provider.CHARS_PER_TOKEN
+    cached = provider.cached_chars // provider.CHARS_PER_TOKEN
+    billed = sent + cached * provider.CACHED_TOKEN_FACTOR
+    print(
+        f"{name:<8} {wall:>9.2f} {provider.calls:>6} {sent:>12,} "
+        f"{cached:>12,} {billed:>14,.0f}"
+    )
+    return billed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=60_000)
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument(
+        "--token-latency",
+        type=float,
+        default=0.02,
+        help="Seconds per 1000 uncached input tokens",
+    )
+    args = parser.parse_args()
+
+    transcript = make_transcript(args.tokens)
+    prompts = [get_template(name)["prompt"] for name in NOTE_TEMPLATES]
+    prompts += [
+        f"Question about this meeting: what did Bob say about item {i}?"
+        for i in range(args.questions)
+    ]
+    print(
+        f"{len(prompts)} calls ({len(NOTE_TEMPLATES)} templates, "
+        f"{args.questions} questions) on a ~{args.tokens:,}-token transcript"
+    )
+    print(
+        f"{'mode':<8} {'wall (s)':>9} {'calls':>6} {'sent tokens':>12} "
+        f"{'cached tok.':>12} {'billed tokens':>14}"
+    )
+
+    provider = FakeProvider(latency=args.latency, token_latency=args.token_latency)
+    compacted = compact_transcript(transcript)
+    started = time.perf_counter()
+    for prompt in prompts:
+        provider.generate_text(
+            f"{SYSTEM_INSTRUCTION}\n\nTranscript:\n\n{compacted}\n\n{prompt}"
+        )
+    inline = report("inline", provider, time.perf_counter() - started)
+
+    provider = FakeProvider(latency=args.latency, token_latency=args.token_latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "meeting_transcript.md")
+        with open(path, "w") as f:
+            f.write(transcript)
+        store = MeetingContextStore(ttl=600)
+        started = time.perf_counter()
+        context = store.get(path, provider)
+        for prompt in prompts:
+            context.generate(prompt)
+        cached = report("cached", provider, time.perf_counter() - started)
+        store.close()
+
+    print(f"Billed input tokens saved: {1 - cached / inline:.0%}")
+
+
+if __name__ == "__main__":
+    main()
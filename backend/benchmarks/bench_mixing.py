@@ -0,0 +1,100 @@
+"""Compare the block-wise mixer against the original whole-array mix.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_mixing --minutes 30
+
+Generates synthetic mic/system chunk lists shaped like AudioRecorder's
+capture buffers, mixes them with both implementations, checks the output
+files are byte-identical and reports wall time and peak traced memory.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import wave
+
+import numpy as np
+
+from services.audio_mixer import mix_to_wav
+
+RATE = 44100
+CHUNK = 1024
+
+
+def legacy_mix(mic_frames, system_frames, output_path):
+    """The pre-block implementation of AudioRecorder.stop()'s mix."""
+    mic_audio = np.frombuffer(b"".join(mic_frames), dtype=np.int16).astype(
+        np.float32
+    )
+    if system_frames:
+        sys_audio = np.frombuffer(
+            b"".join(system_frames), dtype=np.int16
+        ).astype(np.float32)
+        max_len = max(len(mic_audio), len(sys_audio))
+        mic_audio = np.pad(mic_audio, (0, max_len - len(mic_audio)))
+        sys_audio = np.pad(sys_audio, (0, max_len - len(sys_audio)))
+        mixed = ((mic_audio + sys_audio) / 2).clip(-32768, 32767).astype(np.int16)
+    else:
+        mixed = mic_audio.clip(-32768, 32767).astype(np.int16)
+
+    with wave.open(output_path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(mixed.tobytes())
+
+
+def synthetic_frames(seconds: float, seed: int) -> list[bytes]:
+    rng = np.random.default_rng(seed)
+    n_chunks = int(seconds * RATE / CHUNK)
+    return [
+        rng.integers(-32768, 32768, CHUNK, dtype=np.int16).tobytes()
+        for _ in range(n_chunks)
+    ]
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=10)
+    args = parser.parse_args()
+
+    seconds = args.minutes * 60
+    mic = synthetic_frames(seconds, seed=1)
+    # System stream a little shorter, as AudioTee usually starts late
+    system = synthetic_frames(seconds - 0.5, seed=2)
+    audio_mb = (len(mic) + len(system)) * CHUNK * 2 / 1e6
+    print(f"{args.minutes:g} min per stream, {audio_mb:.1f} MB captured PCM")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.wav")
+        block_path = os.path.join(tmp, "block.wav")
+
+        legacy_t, legacy_peak = measure(legacy_mix, mic, system, legacy_path)
+        block_t, block_peak = measure(mix_to_wav, mic, system, block_path, RATE)
+
+        with open(legacy_path, "rb") as a, open(block_path, "rb") as b:
+            identical = a.read() == b.read()
+
+    print(f"{'implementation':<10} {'time (s)':>10} {'peak MB':>10}")
+    print(f"{'legacy':<10} {legacy_t:>10.2f} {legacy_peak / 1e6:>10.1f}")
+    print(f"{'block':<10} {block_t:>10.2f} {block_peak / 1e6:>10.1f}")
+    print(f"Output identical: {identical}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
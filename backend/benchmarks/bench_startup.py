@@ -0,0 +1,109 @@
+"""Measure backend cold start: time to first healthy response + import profile.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_startup --runs 5
+
+Each run launches uvicorn the same way the Electron shell does in dev mode
+and polls /api/health until it answers, so the number is what the user
+waits for.  Background warm-up is disabled during the runs so it can't
+compete with startup.  The import profile comes from `python -X importtime`
+and lists the slowest top-level modules pulled in by `import main`.
+"""
+
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_healthy(timeout: float = 60.0) -> float:
+    port = _free_port()
+    env = {**os.environ, "BACKGROUND_WARMUP": "0"}
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}/api/health"
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError("backend exited during startup")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, OSError):
+                time.sleep(0.01)
+        raise TimeoutError(f"no healthy response within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def import_profile(top: int) -> tuple[int, list[tuple[str, int]]]:
+    """Return total µs for `import main` and its slowest direct imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    totals: dict[str, int] = {}
+    main_total = 0
+    line_re = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+    for line in result.stderr.splitlines():
+        match = line_re.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = match.groups()
+        if len(indent) == 1 and name == "main":
+            main_total = int(cumulative)
+        elif len(indent) == 3:
+            # Imported directly by main (or by the first module that needed it)
+            package = name.split(".")[0]
+            totals[package] = totals.get(package, 0) + int(cumulative)
+    ranked = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)
+    return main_total, ranked[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    times = [time_to_healthy() for _ in range(args.runs)]
+    print(f"Time to first healthy response over {args.runs} runs:")
+    print(
+        f"  median {statistics.median(times) * 1000:.0f} ms, "
+        f"min {min(times) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms"
+    )
+
+    main_total, ranked = import_profile(args.top)
+    print(f"\n`import main` takes {main_total / 1000:.1f} ms; slowest imports:")
+    for package, micros in ranked:
+        print(f"  {micros / 1000:>8.1f} ms  {package}")
+
+
+if __name__ == "__main__":
+    main()
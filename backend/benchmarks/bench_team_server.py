@@ -0,0 +1,150 @@
+"""Load-test team mode: several users uploading recordings at once.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_team_server --users 8 --jobs 4 --workers 1,2,4
+
+Starts the app in team mode against a throwaway TEAM_DATA_DIR with the fake
+AI provider (--latency seconds per call), registers --users users and has
+each upload --jobs synthetic --minutes-long stereo recordings through
+POST /api/team/recordings, then waits for the worker pool to finish them
+all.  Repeated for each worker count in --workers.  Reports upload time,
+total wall time, jobs/s and how evenly the jobs were spread over shards.
+
+Exits non-zero if N workers aren't at least 1 + --min-scaling * (N - 1)
+times as fast as the first worker count (N capped at the CPU count), so a
+change that serializes the workers fails the run.
+"""
+
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def make_wav(minutes: float, seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    frames = int(minutes * 60 * SAMPLE_RATE)
+    audio = (rng.standard_normal((frames, 2)) * 2000).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(2)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(audio.tobytes())
+    return buf.getvalue()
+
+
+def run(workers: int, users: int, jobs: int, wav: bytes, uploaders: int) -> dict:
+    from fastapi.testclient import TestClient
+
+    import services.worker_pool as worker_pool
+    from main import app
+    from services.tenants import get_registry
+
+    data_dir = tempfile.mkdtemp(prefix="bench-team-")
+    os.environ["TEAM_DATA_DIR"] = data_dir
+    os.environ["TEAM_WORKERS"] = str(workers)
+    registry = get_registry()
+    tokens = {f"user{i}": registry.add_user(f"user{i}") for i in range(users)}
+
+    with TestClient(app) as client:
+        pool = worker_pool.get_worker_pool()
+        started = time.perf_counter()
+
+        def upload(n: int):
+            user = f"user{n % users}"
+            response = client.post(
+                "/api/team/recordings",
+                headers={"Authorization": f"Bearer {tokens[user]}"},
+                files={"file": (f"meeting{n}.wav", wav, "audio/wav")},
+                data={"meeting": json.dumps({"title": f"Sync {n}"})},
+            )
+            return response.json()["job"]["id"]
+
+        with ThreadPoolExecutor(max_workers=uploaders) as executor:
+            job_ids = list(executor.map(upload, range(users * jobs)))
+        uploaded = time.perf_counter() - started
+        if not pool.wait_idle(timeout=600):
+            raise RuntimeError("Jobs did not finish within 10 minutes")
+        wall = time.perf_counter() - started
+        records = [pool.get(job_id) for job_id in job_ids]
+
+    failed = [r for r in records if r["state"] != "done"]
+    if failed:
+        raise RuntimeError(f"{len(failed)} jobs failed, e.g.: {failed[0].get('error')}")
+    per_shard = [sum(r["shard"] == s for r in records) for s in range(workers)]
+    return {"uploaded": uploaded, "wall": wall, "per_shard": per_shard}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=4, help="Recordings per user")
+    parser.add_argument("--minutes", type=float, default=5.0)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--uploaders", type=int, default=8, help="Concurrent uploads")
+    parser.add_argument(
+        "--min-scaling",
+        type=float,
+        default=0.5,
+        help="Required speedup per extra worker, as a fraction of linear (default 0.5)",
+    )
+    args = parser.parse_args()
+
+    # Read by the worker processes, which inherit the environment
+    os.environ.update(
+        {
+            "TEAM_MODE": "1",
+            "AI_PROVIDER": "fake",
+            "FAKE_PROVIDER_LATENCY": str(args.latency),
+            "GEMINI_API_KEY": "fake",
+            "BACKGROUND_WARMUP": "0",
+        }
+    )
+    wav = make_wav(args.minutes, seed=0)
+    total = args.users * args.jobs
+    print(
+        f"{total} recordings ({args.users} users x {args.jobs}), "
+        f"{args.minutes:g} min stereo ({len(wav) / 1e6:.1f} MB) each, "
+        f"fake latency {args.latency:g}s\n"
+    )
+    print(f"{'workers':>7} {'upload s':>9} {'wall s':>8} {'jobs/s':>7}  per shard")
+    baseline = None
+    regressions = []
+    for workers in (int(w) for w in args.workers.split(",")):
+        result = run(workers, args.users, args.jobs, wav, args.uploaders)
+        rate = total / result["wall"]
+        if baseline is None:
+            baseline, baseline_workers = rate, workers
+        print(
+            f"{workers:>7} {result['uploaded']:>9.2f} {result['wall']:>8.2f} "
+            f"{rate:>7.2f}  {result['per_shard']}  ({rate / baseline:.1f}x)"
+        )
+        cores = os.cpu_count() or 1
+        extra = min(workers, cores) - min(baseline_workers, cores)
+        required = 1 + args.min_scaling * extra
+        if extra > 0 and rate / baseline < required:
+            regressions.append(
+                f"{workers} workers: {rate / baseline:.2f}x the throughput of "
+                f"{baseline_workers}, expected at least {required:.2f}x"
+            )
+
+    if regressions:
+        print("\nREGRESSION: throughput doesn't scale with workers")
+        for line in regressions:
+            print(f"  {line}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
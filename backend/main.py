@@ -1,25 +1,68 @@
+import importlib
 import os
+import threading
+import time
 from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from routers import calendar, notes, recording, settings
+from routers import calendar, imports, notes, recording, settings, team
+from services.settings_store import settings_store
 
 load_dotenv()
 
+# Heavy modules that routers import lazily. With BACKGROUND_WARMUP enabled
+# (the default) they are imported on a background thread shortly after
+# startup, so the first real request doesn't pay for them either.
+WARMUP_MODULES = [
+    "services.audio_capture",
+    "services.transcription",
+    "services.note_formatter",
+    "services.calendar_service",
+    "services.drive_service",
+    "services.google_auth",
+]
+WARMUP_DELAY_SECONDS = 1.0
+
+
+def _warm_up_imports():
+    time.sleep(WARMUP_DELAY_SECONDS)
+    started = time.perf_counter()
+    for name in WARMUP_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"[Startup] Warm-up import of {name} failed: {e}")
+    print(f"[Startup] Warm-up imports done in {time.perf_counter() - started:.2f}s")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    transcript_dir = os.getenv("TRANSCRIPT_DIR", "")
-    notes_dir = os.getenv("NOTES_DIR", "")
+    transcript_dir = settings_store.get("TRANSCRIPT_DIR")
+    notes_dir = settings_store.get("NOTES_DIR")
     if transcript_dir:
         os.makedirs(transcript_dir, exist_ok=True)
     if notes_dir:
         os.makedirs(notes_dir, exist_ok=True)
-    os.makedirs("/tmp/meeting-recordings", exist_ok=True)
+    os.makedirs(recording.RECORDINGS_DIR, exist_ok=True)
+    recording.recover_interrupted_recordings()
+    threading.Thread(target=imports.resume_interrupted_imports, daemon=True).start()
+    if os.getenv("BACKGROUND_WARMUP", "1") != "0":
+        threading.Thread(target=_warm_up_imports, daemon=True).start()
+    if team.team_mode_enabled():
+        team.recover_team_jobs()
+    calendar.start_meeting_scheduler()
     yield
+    from services.meeting_scheduler import shutdown_meeting_scheduler
+
+    shutdown_meeting_scheduler()
+    from services.audio_executor import shutdown_audio_executor
+    from services.worker_pool import shutdown_worker_pool
+
+    shutdown_worker_pool()
+    shutdown_audio_executor()
 
 
 app = FastAPI(title="Meeting Note-Taker", lifespan=lifespan)
@@ -32,10 +75,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(recording.router, prefix="/api/recording")
-app.include_router(calendar.router, prefix="/api/calendar")
-app.include_router(notes.router, prefix="/api/notes")
-app.include_router(settings.router, prefix="/api/settings")
+# The desktop app's routers act on this machine's mic, .env and files
+# without authentication, so a team server doesn't serve them
+desktop_only = [Depends(team.desktop_only)]
+app.include_router(recording.router, prefix="/api/recording", dependencies=desktop_only)
+app.include_router(calendar.router, prefix="/api/calendar", dependencies=desktop_only)
+app.include_router(notes.router, prefix="/api/notes", dependencies=desktop_only)
+app.include_router(settings.router, prefix="/api/settings", dependencies=desktop_only)
+app.include_router(team.router, prefix="/api/team")
+app.include_router(imports.router, prefix="/api/import", dependencies=desktop_only)
 
 
 @app.get("/api/health")
@@ -47,6 +95,19 @@ async def health():
 async def config():
     """Return non-secret config values the frontend needs."""
     return {
-        "obsidian_vault_name": os.getenv("OBSIDIAN_VAULT_NAME", ""),
-        "obsidian_notes_subpath": os.getenv("OBSIDIAN_NOTES_SUBPATH", ""),
+        "obsidian_vault_name": settings_store.get("OBSIDIAN_VAULT_NAME"),
+        "obsidian_notes_subpath": settings_store.get("OBSIDIAN_NOTES_SUBPATH"),
     }
+
+
+if __name__ == "__main__":
+    # The PyInstaller build runs this file directly.  Audio and team
+    # worker processes are spawned by re-running the executable, and
+    # freeze_support() turns those runs into workers instead of servers.
+    import multiprocessing
+
+    multiprocessing.freeze_support()
+
+    import uvicorn
+
+    uvicorn.run(app, host="127.0.0.1", port=8000)
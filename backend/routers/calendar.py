@@ -1,24 +1,71 @@
 import os
+from typing import TYPE_CHECKING
 
 from fastapi import APIRouter
 
-from services.calendar_service import CalendarService
-from services.google_auth import get_credentials
+from services.settings_store import settings_store
+
+# The Google API client is slow to import; load it on first calendar request.
+if TYPE_CHECKING:
+    from services.calendar_service import CalendarService
 
 router = APIRouter()
 
+# Building the discovery client is slow; reuse it until credentials change.
+_calendar_service: "CalendarService | None" = None
+_calendar_creds = None
+
+
+def _reset_calendar_service(_changed_keys=None):
+    global _calendar_service, _calendar_creds
+    _calendar_service = None
+    _calendar_creds = None
+
 
-def _get_calendar_service() -> CalendarService | None:
-    creds_path = os.getenv("GOOGLE_CREDENTIALS_PATH", "./credentials.json")
-    token_path = os.getenv("GOOGLE_TOKEN_PATH", "./token.json")
+settings_store.subscribe(
+    _reset_calendar_service, ["GOOGLE_CREDENTIALS_PATH", "GOOGLE_TOKEN_PATH"]
+)
+
+
+def _get_calendar_service() -> "CalendarService | None":
+    global _calendar_service, _calendar_creds
+    from services.calendar_service import CalendarService
+    from services.google_auth import get_cached_credentials
+
+    creds_path = settings_store.resolve_path("GOOGLE_CREDENTIALS_PATH", "./credentials.json")
+    token_path = settings_store.resolve_path("GOOGLE_TOKEN_PATH", "./token.json")
     if not os.path.exists(creds_path):
         return None
-    creds = get_credentials(creds_path, token_path)
-    return CalendarService(creds)
+    creds = get_cached_credentials(creds_path, token_path)
+    if _calendar_service is None or creds is not _calendar_creds:
+        _calendar_service = CalendarService(creds)
+        _calendar_creds = creds
+    return _calendar_service
+
+
+def start_meeting_scheduler():
+    """Keep today's meetings in memory and warm up before each (MEETING_PREFETCH)."""
+    from services.meeting_scheduler import prefetch_enabled
+    from services.meeting_scheduler import start_meeting_scheduler as start
+
+    if prefetch_enabled():
+        # Late-bound so the scheduler always uses this module's current factory
+        start(lambda: _get_calendar_service())
+
+
+def _ready_scheduler():
+    from services.meeting_scheduler import get_meeting_scheduler
+
+    scheduler = get_meeting_scheduler()
+    return scheduler if scheduler is not None and scheduler.ready else None
 
 
 @router.get("/current-meeting")
 async def current_meeting():
+    # In-progress meetings first, answered from the scheduler's timeline
+    scheduler = _ready_scheduler()
+    if scheduler is not None:
+        return {"meeting": scheduler.current_meeting()}
     try:
         cal_service = _get_calendar_service()
         if not cal_service:
@@ -39,3 +86,14 @@ async def upcoming_meetings():
         return {"meetings": meetings}
     except Exception as e:
         return {"meetings": [], "error": str(e)}
+
+
+@router.get("/today")
+async def todays_meetings():
+    """The scheduler's timeline of today's meetings, with warm-up reports."""
+    from services.meeting_scheduler import get_meeting_scheduler
+
+    scheduler = get_meeting_scheduler()
+    if scheduler is None:
+        return {"meetings": [], "error": "Meeting prefetch is disabled"}
+    return {"meetings": scheduler.timeline(), "error": scheduler.last_error}
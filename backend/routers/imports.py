@@ -0,0 +1,52 @@
+"""Batch import of existing audio files (see services.audio_import)."""
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+router = APIRouter()
+
+
+class ImportRequest(BaseModel):
+    paths: list[str]  # audio files and/or folders on the server
+    recursive: bool = True
+    match_calendar: bool = True
+    max_workers: int | None = Field(default=None, ge=1)  # default: IMPORT_MAX_WORKERS
+
+
+def resume_interrupted_imports():
+    from services.audio_import import get_import_manager
+
+    try:
+        get_import_manager().resume()
+    except Exception as e:
+        print(f"[Import] Could not resume imports: {e}")
+
+
+@router.post("")
+def start_import(req: ImportRequest):
+    """Start importing; poll GET /api/import/{id} for per-file progress."""
+    from services.audio_import import find_audio_files, get_import_manager
+
+    if not find_audio_files(req.paths, req.recursive):
+        return {"status": "error", "message": "No audio files found"}
+    job = get_import_manager().start_import(
+        req.paths, req.recursive, req.match_calendar, req.max_workers
+    )
+    return {"status": "started", "job": job}
+
+
+@router.get("")
+def list_imports():
+    from services.audio_import import get_import_manager
+
+    return {"imports": get_import_manager().list_jobs()}
+
+
+@router.get("/{job_id}")
+def get_import(job_id: str):
+    from services.audio_import import get_import_manager
+
+    job = get_import_manager().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return job
@@ -2,13 +2,16 @@ import os
 from pathlib import Path
 
 from fastapi import APIRouter
+from pydantic import BaseModel
+
+from services.settings_store import settings_store
 
 router = APIRouter()
 
 
 @router.get("/list")
 async def list_notes():
-    notes_dir = os.getenv("NOTES_DIR", "")
+    notes_dir = settings_store.get("NOTES_DIR")
     if not notes_dir or not os.path.exists(notes_dir):
         return {"notes": []}
 
@@ -34,3 +37,127 @@ async def list_notes():
         )
 
     return {"notes": notes[:20]}  # Return last 20
+
+
+@router.post("/sync-drive")
+def sync_notes_to_drive():
+    """Upload new and changed notes to Google Drive; unchanged files are skipped."""
+    from services.drive_sync import DriveSync
+    from services.google_auth import get_cached_credentials
+
+    notes_dir = settings_store.get("NOTES_DIR")
+    if not notes_dir or not os.path.exists(notes_dir):
+        return {"status": "error", "message": "Notes directory not configured"}
+
+    try:
+        creds = get_cached_credentials(
+            settings_store.resolve_path("GOOGLE_CREDENTIALS_PATH", "./credentials.json"),
+            settings_store.resolve_path("GOOGLE_TOKEN_PATH", "./token.json"),
+        )
+    except Exception as e:
+        return {"status": "error", "message": f"Google auth failed: {e}"}
+
+    folder_name = settings_store.get("DRIVE_FOLDER_NAME", "notes")
+    result = DriveSync(creds, folder_name).sync_folder(notes_dir)
+    return {"status": "ok", **result}
+
+
+@router.get("/transcripts/{filename}/segments")
+def get_transcript_segments(
+    filename: str,
+    at: float | None = None,
+    start: float | None = None,
+    end: float | None = None,
+    speaker: str | None = None,
+):
+    """Look up transcript segments by time (`at`, or `start`–`end`) or speaker."""
+    from services.transcript_index import SEGMENTS_SUFFIX, TranscriptIndex
+
+    transcript_dir = settings_store.get("TRANSCRIPT_DIR")
+    base = os.path.join(transcript_dir, os.path.basename(filename))
+    base = os.path.splitext(base)[0]
+    if not transcript_dir or not os.path.exists(base + SEGMENTS_SUFFIX):
+        return {"status": "error", "message": "No segments for this transcript"}
+
+    index = TranscriptIndex(base)
+    if at is not None:
+        segment = index.segment_at(at)
+        segments = [segment] if segment else []
+    elif speaker is not None:
+        segments = index.by_speaker(speaker)
+    else:
+        segments = index.between(start or 0.0, end)
+    return {
+        "speakers": index.speakers,
+        "speaker_seconds": index.speaker_seconds(),
+        "segments": segments,
+    }
+
+
+class TemplatesRequest(BaseModel):
+    templates: list[str] | None = None  # default: all templates
+
+
+class QuestionRequest(BaseModel):
+    question: str
+
+
+def _meeting_context(filename: str):
+    """The cached context for a transcript in TRANSCRIPT_DIR, or None."""
+    from services.ai_provider import get_provider
+    from services.meeting_context import get_context_store
+
+    transcript_dir = settings_store.get("TRANSCRIPT_DIR")
+    path = os.path.join(transcript_dir, os.path.basename(filename))
+    if not transcript_dir or not os.path.isfile(path):
+        return None
+    provider = get_provider(settings_store.get("GEMINI_API_KEY"))
+    return get_context_store().get(path, provider)
+
+
+@router.get("/templates")
+async def list_templates():
+    from services.note_templates import NOTE_TEMPLATES
+
+    return {
+        "templates": [
+            {"name": name, "title": t["title"]} for name, t in NOTE_TEMPLATES.items()
+        ]
+    }
+
+
+@router.post("/transcripts/{filename}/templates")
+def run_templates(filename: str, req: TemplatesRequest):
+    """Generate note templates for a transcript, sharing one cached context."""
+    from services.note_templates import NOTE_TEMPLATES, get_template
+
+    names = req.templates or list(NOTE_TEMPLATES)
+    try:
+        for name in names:
+            get_template(name)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    context = _meeting_context(filename)
+    if context is None:
+        return {"status": "error", "message": "Transcript not found"}
+
+    outputs = {}
+    for name in names:
+        try:
+            outputs[name] = {"content": context.run_template(name)}
+        except Exception as e:
+            outputs[name] = {"error": str(e)}
+    return {"status": "ok", "outputs": outputs, "context": context.stats}
+
+
+@router.post("/transcripts/{filename}/ask")
+def ask_about_meeting(filename: str, req: QuestionRequest):
+    """Answer a question about a past meeting from its transcript."""
+    context = _meeting_context(filename)
+    if context is None:
+        return {"status": "error", "message": "Transcript not found"}
+    try:
+        answer = context.ask(req.question)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    return {"status": "ok", "answer": answer, "context": context.stats}
@@ -1,42 +1,59 @@
 import json
 import os
-import shutil
-import time
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from fastapi import APIRouter, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
-from services.audio_capture import AudioRecorder
-from services.drive_service import DriveService
-from services.google_auth import get_credentials
-from services.note_formatter import NoteFormatter
-from services.transcription import TranscriptionService
+from services import tracing
+from services.settings_store import settings_store
+from services.spool import find_orphaned_spools
+
+# Services pull in pyaudio, numpy and the Google SDKs. They are imported on
+# first use so the server can answer /api/health before those load.
+if TYPE_CHECKING:
+    from services.audio_capture import AudioRecorder
 
 router = APIRouter()
 
 # Module-level state
-recorder: AudioRecorder | None = None
+recorder: "AudioRecorder | None" = None
 current_meeting: dict | None = None
 processing_status = {"state": "idle", "step": "", "error": None}
 
-# Retry configuration
-MAX_RETRIES = 3
-RETRY_BASE_DELAY = 5  # seconds; doubles each retry (5, 10, 20)
+# Scratch directory for in-progress recordings and their checkpoint spools
+RECORDINGS_DIR = "/tmp/meeting-recordings"
 
 # Directory for saved recordings that failed processing
 SAVED_RECORDINGS_DIR = os.path.join(
     os.path.dirname(os.path.dirname(__file__)), "saved-recordings"
 )
 
+# Records of submitted Gemini batch jobs
+BATCH_DIR = os.path.join(SAVED_RECORDINGS_DIR, "batches")
+_batch_manager = None
+_saved_store = None
+
 
 class StartRequest(BaseModel):
     meeting: dict[str, Any] | None = None
     custom_title: str | None = None
 
 
+def _meeting_in_progress() -> dict | None:
+    """The calendar meeting running right now, if the scheduler knows one."""
+    from services.meeting_scheduler import get_meeting_scheduler
+
+    scheduler = get_meeting_scheduler()
+    if scheduler is None or not scheduler.ready:
+        return None
+    return scheduler.current_meeting(upcoming=False)
+
+
 @router.post("/start")
 async def start_recording(request: StartRequest):
     global recorder, current_meeting, processing_status
@@ -54,6 +71,8 @@ async def start_recording(request: StartRequest):
             "description": "",
             "meeting_link": "",
         }
+    elif meeting := _meeting_in_progress():
+        current_meeting = meeting
     else:
         current_meeting = {
             "title": "untitled",
@@ -66,8 +85,10 @@ async def start_recording(request: StartRequest):
 
     title = current_meeting["title"]
 
-    recorder = AudioRecorder(output_dir="/tmp/meeting-recordings")
-    recorder.start(meeting_title=title)
+    from services.audio_capture import AudioRecorder
+
+    recorder = AudioRecorder(output_dir=RECORDINGS_DIR)
+    recorder.start(meeting_title=title, meeting_info=current_meeting)
 
     return {"status": "recording", "meeting": current_meeting}
 
@@ -79,18 +100,38 @@ async def stop_recording(background_tasks: BackgroundTasks):
     if not recorder or not recorder.is_recording:
         return {"status": "error", "message": "Not currently recording"}
 
-    wav_path = recorder.stop()
-    recorder.cleanup()
+    # Finalizing the WAV waits on the audio process pool; do it off the
+    # event loop.  Detach the recorder first, so a second /stop arriving
+    # meanwhile finds nothing to stop; a new recording may also start and
+    # replace `current_meeting`, so keep our own references.
+    stopped, meeting = recorder, current_meeting or {}
+    recorder = None
+    trace = tracing.new_trace("recording", title=meeting.get("title", "untitled"))
+    with tracing.activate(trace):
+        try:
+            wav_path = await run_in_threadpool(stopped.stop)
+        except Exception as e:
+            if recorder is None and stopped.is_recording:
+                recorder = stopped  # still running: let the user stop it again
+            trace.end(e)
+            raise
+    stopped.cleanup()
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
     processing_status = {
         "state": "processing",
         "step": "Uploading audio to Gemini...",
         "error": None,
+        "trace_id": trace.trace_id,
     }
 
     background_tasks.add_task(
-        process_recording, wav_path, current_meeting or {}, timestamp
+        process_recording,
+        wav_path,
+        meeting,
+        timestamp,
+        capture_stats=stopped.capture_stats,
+        trace=trace,
     )
 
     return {"status": "processing", "message": "Recording stopped. Processing..."}
@@ -108,34 +149,41 @@ async def get_status():
     }
 
 
+@router.get("/levels")
+async def get_levels():
+    """Live per-stream audio levels and mic capture health while recording."""
+    if not recorder or not recorder.is_recording:
+        return {"recording": False, "mic": None, "system": None, "capture": None}
+    return {
+        "recording": True,
+        **recorder.get_levels(),
+        "capture": recorder.get_capture_stats(),
+    }
+
+
 @router.get("/saved")
 async def list_saved_recordings():
     """List recordings that were saved after failed processing."""
-    if not os.path.isdir(SAVED_RECORDINGS_DIR):
-        return {"recordings": []}
-
+    store = get_saved_store()
     recordings = []
-    for meta_file in sorted(
-        Path(SAVED_RECORDINGS_DIR).glob("*.json"), reverse=True
-    ):
-        try:
-            meta = json.loads(meta_file.read_text())
-            wav_name = meta.get("wav_filename", "")
-            wav_path = os.path.join(SAVED_RECORDINGS_DIR, wav_name)
-            if os.path.exists(wav_path):
-                recordings.append(
-                    {
-                        "id": meta_file.stem,
-                        "title": meta.get("title", "Unknown"),
-                        "timestamp": meta.get("timestamp", ""),
-                        "error": meta.get("last_error", ""),
-                        "retries": meta.get("retry_count", 0),
-                    }
-                )
-        except (json.JSONDecodeError, KeyError):
-            continue
+    for recording_id, meta in store.list_recordings():
+        stored_bytes = os.path.getsize(store.audio_path(meta))
+        recordings.append(
+            {
+                "id": recording_id,
+                "title": meta.get("title", "Unknown"),
+                "timestamp": meta.get("timestamp", ""),
+                "error": meta.get("last_error", ""),
+                "retries": meta.get("retry_count", 0),
+                "batch_id": meta.get("batch_id"),
+                "capture_stats": meta.get("capture_stats"),
+                "audio_format": meta.get("audio_format", "wav"),
+                "stored_bytes": stored_bytes,
+                "saved_bytes": (meta.get("wav_bytes") or stored_bytes) - stored_bytes,
+            }
+        )
 
-    return {"recordings": recordings}
+    return {"recordings": recordings, "storage": store.usage()}
 
 
 @router.post("/retry/{recording_id}")
@@ -145,32 +193,242 @@ async def retry_saved_recording(
     """Retry processing a saved recording."""
     global processing_status
 
-    meta_path = os.path.join(SAVED_RECORDINGS_DIR, f"{recording_id}.json")
+    store = get_saved_store()
+    meta_path = store.meta_path(os.path.basename(recording_id))
     if not os.path.exists(meta_path):
         return {"status": "error", "message": "Recording not found"}
 
     meta = json.loads(Path(meta_path).read_text())
-    wav_path = os.path.join(SAVED_RECORDINGS_DIR, meta["wav_filename"])
-    if not os.path.exists(wav_path):
+    if not os.path.exists(store.audio_path(meta)):
         return {"status": "error", "message": "Audio file missing"}
+    if _is_in_running_batch(meta):
+        return {"status": "error", "message": "Recording is being processed in a batch job"}
 
     processing_status = {
         "state": "processing",
-        "step": "Retrying transcription...",
+        "step": "Decompressing saved audio...",
         "error": None,
     }
 
-    background_tasks.add_task(
-        process_recording,
-        wav_path,
-        meta.get("meeting_info", {}),
-        meta.get("timestamp", datetime.now().strftime("%Y-%m-%d_%H-%M-%S")),
-        saved_meta_path=meta_path,
-    )
+    background_tasks.add_task(_retry_saved, Path(meta_path).stem)
 
     return {"status": "processing", "message": "Retrying..."}
 
 
+def _retry_saved(recording_id: str):
+    """Background task: decode a saved recording and process it again."""
+    global processing_status
+
+    store = get_saved_store()
+    try:
+        wav_path, meta = store.checkout(recording_id, RECORDINGS_DIR)
+    except Exception as e:
+        processing_status = {
+            "state": "idle",
+            "step": "",
+            "error": f"Could not read saved audio: {e}",
+        }
+        return
+    processing_status["step"] = "Retrying transcription..."
+    try:
+        process_recording(
+            wav_path,
+            meta.get("meeting_info", {}),
+            meta.get("timestamp", datetime.now().strftime("%Y-%m-%d_%H-%M-%S")),
+            saved_meta_path=store.meta_path(recording_id),
+            capture_stats=meta.get("capture_stats"),
+        )
+    finally:
+        # save() and remove() release it too, but not if they never ran
+        store.release(recording_id)
+
+
+# ---- Batch mode ----
+
+
+class ReformatRequest(BaseModel):
+    transcripts: list[str]
+
+
+def get_batch_manager():
+    global _batch_manager
+    if _batch_manager is None:
+        from services.batch_jobs import BatchJobManager
+
+        _batch_manager = BatchJobManager(BATCH_DIR, _on_batch_notes_saved)
+    return _batch_manager
+
+
+def _is_in_running_batch(meta: dict) -> bool:
+    """Whether a saved recording is still in flight in a batch job.
+
+    It stays in flight through the follow-up format batch, until its notes
+    are saved (which removes the recording) or it finally fails.
+    """
+    if not meta.get("batch_id") or not os.path.isdir(BATCH_DIR):
+        return False
+    return get_batch_manager().is_item_pending(
+        meta["batch_id"], meta.get("timestamp", ""), meta.get("title", "untitled")
+    )
+
+
+def get_saved_store():
+    global _saved_store
+    if _saved_store is None:
+        from services.saved_store import SavedRecordingStore
+
+        _saved_store = SavedRecordingStore(SAVED_RECORDINGS_DIR, _is_in_running_batch)
+    return _saved_store
+
+
+def _on_batch_notes_saved(item: dict, notes_filename: str):
+    """Finish a batch item the same way process_recording finishes a recording."""
+    title = item["meeting_info"].get("title", "untitled")
+    _upload_to_drive(
+        settings_store.get("NOTES_DIR"), notes_filename, title, item["timestamp"]
+    )
+    if item.get("wav_path"):
+        _cleanup_saved_recording(item.get("meta_path"), item["wav_path"])
+
+
+@router.post("/batch/saved")
+def submit_saved_batch():
+    """Transcribe every saved recording in one Gemini batch job.
+
+    Recordings already in a batch, and multitrack (stereo) recordings, which
+    are transcribed per track, are left for the normal retry path.
+    """
+    if not settings_store.get("GEMINI_API_KEY"):
+        return {"status": "error", "message": "Gemini API key not configured"}
+    if not os.path.isdir(SAVED_RECORDINGS_DIR):
+        return {"status": "error", "message": "No saved recordings"}
+
+    manager = get_batch_manager()
+    store = get_saved_store()
+    recordings = []
+    for recording_id, meta in store.list_recordings():
+        if _is_in_running_batch(meta):
+            continue
+        audio_path = store.audio_path(meta)
+        if meta.get("channels") is None:
+            # Saved before channel counts were recorded: always a WAV
+            import wave
+
+            with wave.open(audio_path, "rb") as wf:
+                meta["channels"] = wf.getnchannels()
+        if meta["channels"] != 1:
+            continue
+        # Gemini accepts FLAC directly, so stored audio is uploaded as-is
+        recordings.append(
+            {
+                "wav_path": audio_path,
+                "meta_path": store.meta_path(recording_id),
+                "meeting_info": meta.get("meeting_info", {}),
+                "timestamp": meta.get("timestamp", ""),
+            }
+        )
+    if not recordings:
+        return {"status": "error", "message": "No recordings eligible for batch"}
+
+    record = manager.submit_recordings(recordings)
+    for rec in recordings:
+        store.update(Path(rec["meta_path"]).stem, batch_id=record["id"])
+    return {"status": "submitted", "batch": record}
+
+
+@router.post("/batch/reformat")
+def submit_reformat_batch(request: ReformatRequest):
+    """Regenerate notes for existing transcripts in one Gemini batch job."""
+    if not settings_store.get("GEMINI_API_KEY"):
+        return {"status": "error", "message": "Gemini API key not configured"}
+    transcript_dir = settings_store.get("TRANSCRIPT_DIR")
+
+    items = []
+    for filename in request.transcripts:
+        if not os.path.isfile(os.path.join(transcript_dir, filename)):
+            return {"status": "error", "message": f"Transcript not found: {filename}"}
+        # Filename: {timestamp}_{title}_transcript.md
+        stem = filename.rsplit("_transcript", 1)[0]
+        timestamp, title = stem[:19], stem[20:].replace("_", " ") or "untitled"
+        items.append(
+            {
+                "transcript_filename": filename,
+                "meeting_info": {"title": title},
+                "timestamp": timestamp,
+            }
+        )
+
+    record = get_batch_manager().submit_reformat(items)
+    if record is None:
+        return {"status": "done", "message": "All transcripts formatted directly"}
+    return {"status": "submitted", "batch": record}
+
+
+@router.get("/batch")
+async def list_batches():
+    """List submitted batch jobs, newest first."""
+    return {"batches": get_batch_manager().list_jobs()}
+
+
+# ---- Tracing ----
+
+
+@router.get("/traces")
+def list_traces(limit: int = 20):
+    """The most recent recording jobs' traces (root spans only)."""
+    return {"traces": tracing.list_traces(limit)}
+
+
+@router.get("/traces/{trace_id}")
+def get_trace(trace_id: str):
+    """Every span of one job's trace, in start order."""
+    spans = tracing.get_trace(trace_id)
+    if not spans:
+        return {"status": "error", "message": "Trace not found"}
+    return {"trace_id": trace_id, "spans": spans}
+
+
+# ---- Crash recovery ----
+
+
+def _recover_and_process(spool_paths: list[str]):
+    """Rebuild WAVs from orphaned spools and process them one at a time."""
+    from services.audio_capture import recover_spool
+
+    if spool_paths:
+        print(f"[Recording] Found {len(spool_paths)} interrupted recording(s)")
+    for meta_path in spool_paths:
+        try:
+            meta = recover_spool(meta_path)
+        except Exception as e:
+            print(f"[Recording] Could not recover {meta_path}: {e}")
+            continue
+        if not meta:
+            continue
+        process_recording(
+            meta["wav_path"],
+            meta.get("meeting_info") or {},
+            meta.get("timestamp")
+            or datetime.now().strftime("%Y-%m-%d_%H-%M-%S"),
+        )
+
+    # Pick up batch jobs that were still running when we last shut down
+    if os.path.isdir(BATCH_DIR):
+        get_batch_manager().resume()
+
+
+def recover_interrupted_recordings():
+    """Queue recordings interrupted by a crash for processing.
+
+    Called once at startup, before the server takes requests, so every
+    spool listed here belongs to a dead process and not to a recording
+    started since.  Only the listing (a glob) runs here; recovering and
+    processing them runs on a background thread.
+    """
+    spool_paths = find_orphaned_spools(RECORDINGS_DIR)
+    threading.Thread(target=_recover_and_process, args=(spool_paths,), daemon=True).start()
+
+
 # ---- Background processing ----
 
 
@@ -180,44 +438,41 @@ def _save_recording_for_later(
     timestamp: str,
     error_msg: str,
     retry_count: int,
+    capture_stats: dict | None = None,
 ):
-    """Move WAV to saved-recordings/ with a metadata JSON sidecar."""
-    os.makedirs(SAVED_RECORDINGS_DIR, exist_ok=True)
-
-    title = meeting_info.get("title", "untitled")
-    safe_title = title.replace(" ", "_").replace("/", "-")
-    recording_id = f"{timestamp}_{safe_title}"
-    wav_filename = f"{recording_id}.wav"
-    dest_wav = os.path.join(SAVED_RECORDINGS_DIR, wav_filename)
-
-    # Move WAV (or leave in place if already in saved-recordings)
-    if os.path.abspath(wav_path) != os.path.abspath(dest_wav):
-        shutil.move(wav_path, dest_wav)
-
-    # Write metadata
-    meta = {
-        "wav_filename": wav_filename,
-        "title": title,
-        "timestamp": timestamp,
-        "meeting_info": meeting_info,
-        "last_error": error_msg,
-        "retry_count": retry_count,
-        "saved_at": datetime.now().isoformat(),
-    }
-    meta_path = os.path.join(SAVED_RECORDINGS_DIR, f"{recording_id}.json")
-    Path(meta_path).write_text(json.dumps(meta, indent=2))
-
-    print(f"[Recording] Saved for later retry: {dest_wav}")
+    """Compress the WAV into saved-recordings/ with a metadata JSON sidecar."""
+    meta_path = get_saved_store().save(
+        wav_path, meeting_info, timestamp, error_msg, retry_count, capture_stats
+    )
+    print(f"[Recording] Saved for later retry: {meta_path}")
     return meta_path
 
 
+def _retry_count(saved_meta_path: str | None) -> int:
+    """How many times a saved recording has failed processing so far."""
+    if not saved_meta_path:
+        return 0
+    try:
+        return json.loads(Path(saved_meta_path).read_text()).get("retry_count", 0)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return 0
+
+
 def _cleanup_saved_recording(saved_meta_path: str | None, wav_path: str):
-    """Remove the saved recording files after successful processing."""
+    """Remove the recording's audio and any saved copy after processing."""
     if os.path.exists(wav_path):
         os.remove(wav_path)
 
-    if saved_meta_path and os.path.exists(saved_meta_path):
-        os.remove(saved_meta_path)
+    if saved_meta_path:
+        get_saved_store().remove(saved_meta_path)
+
+
+def _upload_to_drive(notes_dir: str, notes_filename: str, title: str, timestamp: str):
+    """Sync saved notes to Google Drive. Failures are logged, not raised."""
+    from services.pipeline import config_from_settings, upload_to_drive
+
+    config = {**config_from_settings(settings_store), "notes_dir": notes_dir}
+    upload_to_drive(config, notes_filename, title, timestamp)
 
 
 def process_recording(
@@ -225,125 +480,72 @@ def process_recording(
     meeting_info: dict,
     timestamp: str,
     saved_meta_path: str | None = None,
+    capture_stats: dict | None = None,
+    trace=None,
 ):
-    """Background task: transcribe, format, save, upload — with retries."""
-    global processing_status
-
-    transcript_dir = os.getenv("TRANSCRIPT_DIR", "")
-    notes_dir = os.getenv("NOTES_DIR", "")
-    api_key = os.getenv("GEMINI_API_KEY", "")
-    title = meeting_info.get("title", "untitled")
-
-    try:
-        if not api_key:
-            raise ValueError(
-                "Gemini API key not configured. Go to Settings to add it."
-            )
-        if not transcript_dir or not notes_dir:
-            raise ValueError(
-                "Transcript/Notes directories not configured. Go to Settings."
-            )
+    """Background task: transcribe, format, save, upload — with retries.
 
-        # 1. Transcribe (with retries)
-        def update_step(msg: str):
-            processing_status["step"] = msg
-
-        transcriber = TranscriptionService(api_key)
-        transcript_text = _transcribe_with_retries(
-            transcriber, wav_path, update_step
-        )
+    `trace` is the job's root span when the recording was just stopped
+    (its stop/mix spans are already in it); otherwise a new trace starts.
+    """
+    global processing_status
 
-        # 2. Save transcript
-        processing_status["step"] = "Saving transcript..."
-        transcript_filename = transcriber.save_transcript(
-            transcript_text, title, transcript_dir, timestamp
-        )
+    from services.pipeline import config_from_settings, run_pipeline
 
-        # 3. Format notes (with retries)
-        processing_status["step"] = "Generating structured notes..."
-        formatter = NoteFormatter(api_key)
-        notes_content = _format_with_retries(
-            formatter, transcript_text, meeting_info, transcript_filename
-        )
+    def update_step(msg: str):
+        processing_status["step"] = msg
 
-        # 4. Save notes
-        processing_status["step"] = "Saving notes..."
-        notes_filename = formatter.save_notes(
-            notes_content, title, notes_dir, timestamp
+    if trace is None:
+        trace = tracing.new_trace(
+            "recording",
+            title=meeting_info.get("title", "untitled"),
+            retry=saved_meta_path is not None,
         )
+    if os.path.exists(wav_path):
+        trace.set(wav_bytes=os.path.getsize(wav_path))
+    processing_status["trace_id"] = trace.trace_id
+    error = None
 
-        # 5. Upload to Google Drive (non-fatal)
-        processing_status["step"] = "Uploading to Google Drive..."
+    with tracing.activate(trace):
         try:
-            creds_path = os.getenv("GOOGLE_CREDENTIALS_PATH", "./credentials.json")
-            token_path = os.getenv("GOOGLE_TOKEN_PATH", "./token.json")
-            creds = get_credentials(creds_path, token_path)
-            drive_svc = DriveService(creds)
-            notes_filepath = os.path.join(notes_dir, notes_filename)
-            folder_name = os.getenv("DRIVE_FOLDER_NAME", "notes")
-            drive_svc.upload_notes_as_doc(
-                notes_filepath, f"{title} - {timestamp}", folder_name
+            result = run_pipeline(
+                wav_path,
+                meeting_info,
+                timestamp,
+                config_from_settings(settings_store),
+                on_status=update_step,
             )
-        except Exception as e:
-            print(f"Drive upload failed (non-fatal): {e}")
 
-        # 6. Success — clean up WAV and any saved metadata
-        _cleanup_saved_recording(saved_meta_path, wav_path)
+            # Success — clean up WAV and any saved metadata
+            _cleanup_saved_recording(saved_meta_path, wav_path)
 
-        processing_status = {"state": "idle", "step": "Done!", "error": None}
+            processing_status = {
+                "state": "idle",
+                "step": "Done!",
+                "error": None,
+                "report": result["report"],
+                "trace_id": trace.trace_id,
+            }
 
-    except Exception as e:
-        # All retries exhausted — save recording for later
-        error_msg = str(e)
-        _save_recording_for_later(
-            wav_path, meeting_info, timestamp, error_msg, retry_count=MAX_RETRIES
-        )
-
-        processing_status = {
-            "state": "idle",
-            "step": "",
-            "error": f"{error_msg} — audio saved for retry.",
-        }
-        print(f"Processing failed after retries: {e}")
-
-
-def _transcribe_with_retries(transcriber, wav_path, update_step):
-    """Attempt transcription up to MAX_RETRIES times with backoff."""
-    last_error = None
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            return transcriber.transcribe(wav_path, on_status=update_step)
         except Exception as e:
-            last_error = e
-            if attempt < MAX_RETRIES:
-                delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
-                update_step(
-                    f"Transcription failed (attempt {attempt}/{MAX_RETRIES}). "
-                    f"Retrying in {delay}s..."
-                )
-                print(
-                    f"[Recording] Transcription attempt {attempt} failed: {e}. "
-                    f"Retrying in {delay}s..."
+            # Retries exhausted or a non-retryable error — save for later
+            error = e
+            error_msg = str(e)
+            with tracing.span("save_for_retry"):
+                _save_recording_for_later(
+                    wav_path,
+                    meeting_info,
+                    timestamp,
+                    error_msg,
+                    retry_count=_retry_count(saved_meta_path) + 1,
+                    capture_stats=capture_stats,
                 )
-                time.sleep(delay)
-    raise last_error
 
-
-def _format_with_retries(formatter, transcript_text, meeting_info, transcript_filename):
-    """Attempt note formatting up to MAX_RETRIES times with backoff."""
-    last_error = None
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            return formatter.format_notes(
-                transcript_text, meeting_info, transcript_filename
-            )
-        except Exception as e:
-            last_error = e
-            if attempt < MAX_RETRIES:
-                delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
-                print(
-                    f"[Recording] Formatting attempt {attempt} failed: {e}. "
-                    f"Retrying in {delay}s..."
-                )
-                time.sleep(delay)
-    raise last_error
+            processing_status = {
+                "state": "idle",
+                "step": "",
+                "error": f"{error_msg} — audio saved for retry.",
+                "trace_id": trace.trace_id,
+            }
+            print(f"Processing failed after retries: {e}")
+    trace.end(error)
@@ -3,13 +3,13 @@ import os
 import shutil
 from pathlib import Path
 
-from dotenv import dotenv_values
 from fastapi import APIRouter, UploadFile, File
 from pydantic import BaseModel
 
+from services.settings_store import settings_store
+
 router = APIRouter()
 
-ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env")
 CREDENTIALS_PATH_DEFAULT = os.path.join(
     os.path.dirname(os.path.dirname(__file__)), "credentials.json"
 )
@@ -28,29 +28,6 @@ SETTING_KEYS = [
 MASKED_KEYS = {"GEMINI_API_KEY"}
 
 
-def _read_env() -> dict[str, str]:
-    """Read current .env values."""
-    if not os.path.exists(ENV_PATH):
-        return {}
-    return dotenv_values(ENV_PATH)
-
-
-def _write_env(values: dict[str, str]):
-    """Write values to .env, preserving keys not in `values`."""
-    existing = _read_env()
-    existing.update(values)
-
-    # Always include these defaults
-    existing.setdefault("GOOGLE_CREDENTIALS_PATH", "./credentials.json")
-    existing.setdefault("GOOGLE_TOKEN_PATH", "./token.json")
-
-    lines = []
-    for key, val in existing.items():
-        if val is not None:
-            lines.append(f"{key}={val}")
-    Path(ENV_PATH).write_text("\n".join(lines) + "\n")
-
-
 def _mask(value: str) -> str:
     """Mask a secret value for display: show last 4 chars only."""
     if not value or len(value) <= 4:
@@ -61,7 +38,7 @@ def _mask(value: str) -> str:
 @router.get("")
 async def get_settings():
     """Return current settings. Secrets are masked."""
-    env = _read_env()
+    env = settings_store.all()
     settings = {}
     for key in SETTING_KEYS:
         val = env.get(key, "")
@@ -71,15 +48,13 @@ async def get_settings():
             settings[key] = val or ""
 
     # Check if credentials.json exists
-    creds_path = env.get("GOOGLE_CREDENTIALS_PATH", "./credentials.json")
-    if not os.path.isabs(creds_path):
-        creds_path = os.path.join(os.path.dirname(ENV_PATH), creds_path)
+    creds_path = settings_store.resolve_path(
+        "GOOGLE_CREDENTIALS_PATH", "./credentials.json"
+    )
     settings["google_credentials_configured"] = os.path.exists(creds_path)
 
     # Check if token.json exists (user has completed OAuth)
-    token_path = env.get("GOOGLE_TOKEN_PATH", "./token.json")
-    if not os.path.isabs(token_path):
-        token_path = os.path.join(os.path.dirname(ENV_PATH), token_path)
+    token_path = settings_store.resolve_path("GOOGLE_TOKEN_PATH", "./token.json")
     settings["google_authenticated"] = os.path.exists(token_path)
 
     return settings
@@ -103,10 +78,7 @@ async def update_settings(update: SettingsUpdate):
         if val is not None:
             changes[key] = val
     if changes:
-        _write_env(changes)
-        # Reload env vars into the current process
-        for key, val in changes.items():
-            os.environ[key] = val
+        settings_store.update(changes)
     return {"status": "ok"}
 
 
@@ -127,31 +99,30 @@ async def upload_credentials(file: UploadFile = File(...)):
         return {"status": "error", "message": "File is not valid JSON."}
 
     # Write to credentials.json
-    env = _read_env()
-    creds_path = env.get("GOOGLE_CREDENTIALS_PATH", "./credentials.json")
-    if not os.path.isabs(creds_path):
-        creds_path = os.path.join(os.path.dirname(ENV_PATH), creds_path)
-
+    creds_path = settings_store.resolve_path(
+        "GOOGLE_CREDENTIALS_PATH", "./credentials.json"
+    )
     Path(creds_path).write_bytes(content)
 
     # Remove any existing token so user re-authenticates with new credentials
-    token_path = env.get("GOOGLE_TOKEN_PATH", "./token.json")
-    if not os.path.isabs(token_path):
-        token_path = os.path.join(os.path.dirname(ENV_PATH), token_path)
+    token_path = settings_store.resolve_path("GOOGLE_TOKEN_PATH", "./token.json")
     if os.path.exists(token_path):
         os.remove(token_path)
 
+    # Drop cached credentials/clients built from the old files
+    settings_store.notify(["GOOGLE_CREDENTIALS_PATH", "GOOGLE_TOKEN_PATH"])
+
     return {"status": "ok"}
 
 
 @router.get("/setup-status")
 async def setup_status():
     """Check if the app has minimum required configuration to function."""
-    env = _read_env()
+    env = settings_store.all()
     gemini_ok = bool(env.get("GEMINI_API_KEY"))
-    creds_path = env.get("GOOGLE_CREDENTIALS_PATH", "./credentials.json")
-    if not os.path.isabs(creds_path):
-        creds_path = os.path.join(os.path.dirname(ENV_PATH), creds_path)
+    creds_path = settings_store.resolve_path(
+        "GOOGLE_CREDENTIALS_PATH", "./credentials.json"
+    )
     google_ok = os.path.exists(creds_path)
     paths_ok = bool(env.get("TRANSCRIPT_DIR")) and bool(env.get("NOTES_DIR"))
 
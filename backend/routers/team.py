@@ -0,0 +1,252 @@
+"""Team server mode: recordings uploaded by thin clients, one private
+workspace per user (see services.tenants), processed by a pool of worker
+processes (see services.worker_pool).
+
+Disabled unless TEAM_MODE=1.  Every request authenticates with
+``Authorization: Bearer <token>`` (tokens from
+``python -m services.tenants add <user>``).  In team mode the desktop
+app's routers (recording, calendar, notes, settings, import) answer 404.
+"""
+
+import json
+import os
+import shutil
+import uuid
+import wave
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, UploadFile
+
+from services.settings_store import settings_store
+
+router = APIRouter()
+
+# Job record fields that stay on the server
+_PRIVATE_JOB_FIELDS = {"wav_path", "record_path"}
+
+
+def team_mode_enabled() -> bool:
+    return settings_store.get("TEAM_MODE", "0").lower() in ("1", "true", "yes")
+
+
+def desktop_only():
+    """Dependency of the single-user routers, which a team server doesn't serve.
+
+    They act on the server's own .env, microphone, notes and filesystem,
+    and have no authentication of their own.
+    """
+    if team_mode_enabled():
+        raise HTTPException(status_code=404, detail="Not available in team mode")
+
+
+def current_tenant(authorization: str = Header("")):
+    if not team_mode_enabled():
+        raise HTTPException(status_code=404, detail="Team mode is disabled")
+    from services.tenants import get_registry
+
+    scheme, _, token = authorization.partition(" ")
+    tenant = get_registry().authenticate(token if scheme.lower() == "bearer" else "")
+    if tenant is None:
+        raise HTTPException(status_code=401, detail="Invalid or missing API token")
+    return tenant
+
+
+def _public(record: dict) -> dict:
+    return {k: v for k, v in record.items() if k not in _PRIVATE_JOB_FIELDS}
+
+
+def _submit(tenant, job_id: str, wav_path: str, meeting_info: dict, timestamp: str):
+    from services.worker_pool import get_worker_pool
+
+    return get_worker_pool().submit(
+        {
+            "id": job_id,
+            "user_id": tenant.user_id,
+            "wav_path": wav_path,
+            "meeting_info": meeting_info,
+            "timestamp": timestamp,
+            "config": tenant.pipeline_config(),
+            "record_path": os.path.join(tenant.jobs_dir, f"{job_id}.json"),
+        }
+    )
+
+
+def recover_team_jobs():
+    """Re-queue jobs a previous server run left queued or half-processed."""
+    from services.tenants import get_registry
+    from services.worker_pool import load_job_records
+
+    registry = get_registry()
+    for user_id in registry.user_ids():
+        tenant = registry.tenant(user_id)
+        for record in load_job_records(tenant.jobs_dir):
+            if record.get("state") not in ("queued", "processing"):
+                continue
+            if not os.path.exists(record.get("wav_path", "")):
+                continue
+            print(f"[Team] Re-queueing interrupted job {record['id']}")
+            _submit(
+                tenant,
+                record["id"],
+                record["wav_path"],
+                record["meeting_info"],
+                record["timestamp"],
+            )
+
+
+@router.post("/recordings")
+def upload_recording(
+    file: UploadFile = File(...),
+    meeting: str = Form("{}"),
+    tenant=Depends(current_tenant),
+):
+    """Queue an uploaded recording (WAV or FLAC) for processing.
+
+    `meeting` is the meeting info as JSON (title, start, attendees, ...).
+    """
+    try:
+        meeting_info = json.loads(meeting or "{}")
+    except json.JSONDecodeError:
+        return {"status": "error", "message": "meeting must be JSON"}
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    job_id = f"{timestamp}_{uuid.uuid4().hex[:8]}"
+    suffix = Path(file.filename or "").suffix.lower() or ".wav"
+    upload_path = os.path.join(tenant.uploads_dir, f"{job_id}{suffix}")
+    with open(upload_path, "wb") as f:
+        shutil.copyfileobj(file.file, f, length=1 << 20)
+
+    wav_path = os.path.join(tenant.uploads_dir, f"{job_id}.wav")
+    try:
+        if suffix == ".flac":
+            from services.audio_executor import get_audio_executor
+            from services.saved_store import decode_to_wav
+
+            get_audio_executor().run(decode_to_wav, upload_path, wav_path)
+            os.remove(upload_path)
+        elif suffix != ".wav":
+            raise ValueError(f"Unsupported audio format {suffix}")
+        with wave.open(wav_path, "rb") as wf:
+            duration = wf.getnframes() / wf.getframerate()
+    except Exception as e:
+        for path in (upload_path, wav_path):
+            if os.path.exists(path):
+                os.remove(path)
+        return {"status": "error", "message": f"Invalid recording: {e}"}
+
+    record = _submit(tenant, job_id, wav_path, meeting_info, timestamp)
+    print(
+        f"[Team] {tenant.user_id} uploaded {duration:.0f}s recording as job {job_id}"
+    )
+    return {"status": "queued", "job": _public(record)}
+
+
+@router.get("/jobs")
+def list_jobs(tenant=Depends(current_tenant)):
+    from services.worker_pool import get_worker_pool, load_job_records
+
+    pool = get_worker_pool()
+    jobs = []
+    for record in load_job_records(tenant.jobs_dir):
+        live = pool.get(record["id"])
+        jobs.append(_public(live or record))
+    return {"jobs": jobs}
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str, tenant=Depends(current_tenant)):
+    from services.worker_pool import get_worker_pool
+
+    record = get_worker_pool().get(job_id)
+    if record is None:
+        path = Path(tenant.jobs_dir) / f"{os.path.basename(job_id)}.json"
+        if not path.exists():
+            return {"status": "error", "message": "Job not found"}
+        record = json.loads(path.read_text())
+    if record["user_id"] != tenant.user_id:
+        return {"status": "error", "message": "Job not found"}
+    return {"job": _public(record)}
+
+
+@router.get("/jobs/{job_id}/trace")
+def get_job_trace(job_id: str, tenant=Depends(current_tenant)):
+    """The spans recorded for a job so far (all attempts, if it was retried)."""
+    from services.tracing import get_trace
+
+    path = Path(tenant.jobs_dir) / f"{os.path.basename(job_id)}.json"
+    if not path.exists():
+        return {"status": "error", "message": "Job not found"}
+    return {"job_id": job_id, "spans": get_trace(job_id)}
+
+
+@router.post("/jobs/{job_id}/retry")
+def retry_job(job_id: str, tenant=Depends(current_tenant)):
+    """Re-queue a failed job with the user's current settings."""
+    path = Path(tenant.jobs_dir) / f"{os.path.basename(job_id)}.json"
+    if not path.exists():
+        return {"status": "error", "message": "Job not found"}
+    record = json.loads(path.read_text())
+    if record.get("state") != "failed" or not os.path.exists(record["wav_path"]):
+        return {"status": "error", "message": "Only failed jobs can be retried"}
+    record = _submit(
+        tenant,
+        record["id"],
+        record["wav_path"],
+        record["meeting_info"],
+        record["timestamp"],
+    )
+    return {"status": "queued", "job": _public(record)}
+
+
+@router.get("/notes")
+def list_team_notes(tenant=Depends(current_tenant)):
+    files = sorted(Path(tenant.notes_dir).glob("*.md"), reverse=True)
+    return {"notes": [f.name for f in files]}
+
+
+@router.get("/notes/{filename}")
+def get_team_note(filename: str, tenant=Depends(current_tenant)):
+    path = Path(tenant.notes_dir) / os.path.basename(filename)
+    if not path.is_file():
+        return {"status": "error", "message": "Note not found"}
+    return {"filename": path.name, "content": path.read_text()}
+
+
+@router.get("/settings")
+def get_team_settings(tenant=Depends(current_tenant)):
+    from services.tenants import USER_SETTING_KEYS
+
+    values = {key: tenant.get(key) for key in USER_SETTING_KEYS}
+    if values.get("GEMINI_API_KEY"):
+        values["GEMINI_API_KEY"] = "••••" + values["GEMINI_API_KEY"][-4:]
+    return {"settings": values, "has_google_token": os.path.exists(tenant.token_path)}
+
+
+@router.put("/settings")
+def update_team_settings(values: dict[str, str], tenant=Depends(current_tenant)):
+    ignored = tenant.update_settings(values)
+    return {"status": "ok", "ignored": ignored}
+
+
+@router.post("/credentials")
+async def upload_google_token(
+    file: UploadFile = File(...), tenant=Depends(current_tenant)
+):
+    """Store the user's Google OAuth token.json for Drive uploads."""
+    content = await file.read()
+    try:
+        token = json.loads(content)
+        if "refresh_token" not in token:
+            raise ValueError("token has no refresh_token")
+    except (json.JSONDecodeError, ValueError) as e:
+        return {"status": "error", "message": f"Invalid token.json: {e}"}
+    Path(tenant.token_path).write_bytes(content)
+    return {"status": "ok"}
+
+
+@router.get("/status")
+def team_status(tenant=Depends(current_tenant)):
+    from services.worker_pool import get_worker_pool
+
+    return {"user": tenant.user_id, "workers": get_worker_pool().stats()}
@@ -0,0 +1,484 @@
+"""Transcription / text-generation backends.
+
+TranscriptionService and NoteFormatter talk to an AIProvider instead of a
+genai.Client directly:
+
+- GeminiProvider: the synchronous Gemini API (the default).
+- GeminiBatchProvider: Gemini batch mode, for submitting a backlog of
+  requests as one job and collecting the results later at lower cost.
+- FakeProvider: deterministic, offline responses for tests and benchmarks.
+
+Select one with AI_PROVIDER in .env ("gemini" or "fake").  All Gemini
+requests go through the shared RateGovernor, which also owns retries.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import wave
+
+from services import tracing
+from services.rate_governor import get_governor
+from services.settings_store import settings_store
+
+# 10-minute timeout for large audio files (default is 60s which is
+# too short for 1-hour+ recordings).
+GEMINI_TIMEOUT = 600_000  # 10 minutes in milliseconds (SDK uses ms)
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+BATCH_TERMINAL_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+
+class EmptyResponseError(RuntimeError):
+    """The model answered with no text (retried like a transient error)."""
+
+
+class AIProvider:
+    """Interface shared by the transcription and note-formatting services."""
+
+    name = "base"
+
+    def transcribe_audio(
+        self,
+        audio_path: str,
+        prompt: str,
+        on_status=None,
+        response_schema: dict | None = None,
+    ) -> str:
+        """Return the model's response to `prompt` about the audio file.
+
+        With `response_schema`, the response is JSON matching that schema.
+        """
+        raise NotImplementedError
+
+    def generate_text(
+        self,
+        prompt: str,
+        response_schema: dict | None = None,
+        cached_context: str | None = None,
+    ) -> str:
+        """Return the model's response to a text-only prompt.
+
+        With `response_schema`, the response is JSON matching that schema.
+        With `cached_context` (a name from create_cache()), the prompt is
+        answered against that cached content.
+        """
+        raise NotImplementedError
+
+    def create_cache(
+        self, contents: str, system_instruction: str, ttl_seconds: int, display_name: str
+    ) -> str:
+        """Store `contents` server-side for `ttl_seconds`; return the cache name."""
+        raise NotImplementedError
+
+    def delete_cache(self, name: str):
+        raise NotImplementedError
+
+
+class GeminiProvider(AIProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str = DEFAULT_MODEL):
+        # Imported here so the fake provider works without the SDK installed
+        from google import genai
+
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options={"timeout": GEMINI_TIMEOUT},
+        )
+        self.model = model
+
+    def _wait_for_file_active(self, uploaded_file, poll_interval: int = 2, max_wait: int = 300):
+        """Poll until an uploaded file reaches ACTIVE state.
+
+        Large files need server-side processing after upload before they
+        can be used in generate_content().
+        """
+        start = time.time()
+        with tracing.span("wait_active") as span:
+            polls = 0
+            while uploaded_file.state.name == "PROCESSING":
+                if time.time() - start > max_wait:
+                    raise TimeoutError(
+                        f"Uploaded file did not become active within {max_wait}s"
+                    )
+                time.sleep(poll_interval)
+                # Polls are requests too: they take a token and share the
+                # governor's 429 pause and retry policy
+                uploaded_file = get_governor().call(
+                    self.client.files.get, name=uploaded_file.name
+                )
+                polls += 1
+            span.set(polls=polls, state=uploaded_file.state.name)
+        if uploaded_file.state.name != "ACTIVE":
+            raise RuntimeError(
+                f"File upload failed with state: {uploaded_file.state.name}"
+            )
+        return uploaded_file
+
+    def upload_file(self, path: str, on_status=None):
+        """Upload a file to the Gemini Files API and wait until it's usable."""
+        if on_status:
+            on_status("Uploading audio to Gemini...")
+        with tracing.span("upload", bytes=os.path.getsize(path)):
+            uploaded_file = get_governor().call(
+                self.client.files.upload, file=path, rate_limited=False
+            )
+
+        if on_status:
+            on_status("Waiting for file processing...")
+        return self._wait_for_file_active(uploaded_file)
+
+    @staticmethod
+    def _json_config(
+        response_schema: dict | None, cached_context: str | None = None
+    ) -> dict | None:
+        config = {}
+        if response_schema is not None:
+            config["response_mime_type"] = "application/json"
+            config["response_schema"] = response_schema
+        if cached_context is not None:
+            config["cached_content"] = cached_context
+        return config or None
+
+    def transcribe_audio(
+        self,
+        audio_path: str,
+        prompt: str,
+        on_status=None,
+        response_schema: dict | None = None,
+    ) -> str:
+        def on_retry(attempt: int, delay: float, error: Exception):
+            if on_status:
+                on_status(
+                    f"Transcription failed (attempt {attempt}). "
+                    f"Retrying in {delay:.0f}s..."
+                )
+
+        def transcribe() -> str:
+            uploaded_file = self.upload_file(audio_path, on_status)
+
+            if on_status:
+                on_status("Transcribing audio (this may take a few minutes)...")
+            with tracing.span("generate", model=self.model, kind="transcribe") as span:
+                response = get_governor().call(
+                    self.client.models.generate_content,
+                    model=self.model,
+                    contents=[prompt, uploaded_file],
+                    config=self._json_config(response_schema),
+                    on_retry=on_retry,
+                )
+                span.set(response_chars=len(response.text or ""))
+            if not response.text:
+                raise EmptyResponseError("Gemini returned an empty transcription")
+            return response.text
+
+        # A file that never became ACTIVE, or an empty response, starts
+        # over from the upload
+        return get_governor().retry_operation(transcribe, on_retry=on_retry)
+
+    def generate_text(
+        self,
+        prompt: str,
+        response_schema: dict | None = None,
+        cached_context: str | None = None,
+    ) -> str:
+        def generate() -> str:
+            with tracing.span(
+                "generate",
+                model=self.model,
+                prompt_chars=len(prompt),
+                cached=cached_context is not None,
+            ) as span:
+                response = get_governor().call(
+                    self.client.models.generate_content,
+                    model=self.model,
+                    contents=prompt,
+                    config=self._json_config(response_schema, cached_context),
+                )
+                span.set(response_chars=len(response.text or ""))
+            if not response.text:
+                raise EmptyResponseError("Gemini returned an empty response")
+            return response.text
+
+        return get_governor().retry_operation(generate)
+
+    def create_cache(
+        self, contents: str, system_instruction: str, ttl_seconds: int, display_name: str
+    ) -> str:
+        cache = get_governor().call(
+            self.client.caches.create,
+            model=self.model,
+            config={
+                "contents": [contents],
+                "system_instruction": system_instruction,
+                "display_name": display_name,
+                "ttl": f"{int(ttl_seconds)}s",
+            },
+        )
+        return cache.name
+
+    def delete_cache(self, name: str):
+        get_governor().call(self.client.caches.delete, name=name, rate_limited=False)
+
+
+class GeminiBatchProvider(GeminiProvider):
+    """Gemini batch mode: many requests in one asynchronous job.
+
+    Each request is a list of parts — prompt strings and/or files returned
+    by `upload_file()`.  Results come back in request order.
+    """
+
+    name = "gemini-batch"
+
+    @staticmethod
+    def _part(part) -> dict:
+        if isinstance(part, str):
+            return {"text": part}
+        return {"file_data": {"file_uri": part.uri, "mime_type": part.mime_type}}
+
+    def submit_batch(
+        self,
+        requests: list[list],
+        display_name: str,
+        response_schema: dict | None = None,
+    ) -> str:
+        """Create a batch job and return its name.
+
+        `response_schema` applies structured JSON output to every request.
+        """
+        inlined = []
+        for parts in requests:
+            request = {
+                "contents": [{"role": "user", "parts": [self._part(p) for p in parts]}]
+            }
+            config = self._json_config(response_schema)
+            if config:
+                request["config"] = config
+            inlined.append(request)
+        job = get_governor().call(
+            self.client.batches.create,
+            model=self.model,
+            src=inlined,
+            config={"display_name": display_name},
+            rate_limited=False,
+        )
+        return job.name
+
+    def batch_state(self, job_name: str) -> str:
+        return self.client.batches.get(name=job_name).state.name
+
+    def batch_results(
+        self, job_name: str, count: int
+    ) -> list[tuple[str | None, str | None]]:
+        """Return (text, error) for each of the `count` requests of a finished job."""
+        job = self.client.batches.get(name=job_name)
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            return [(None, f"Batch job ended in state {job.state.name}")] * count
+        results = []
+        for item in job.dest.inlined_responses:
+            if item.error:
+                results.append((None, str(item.error)))
+            else:
+                results.append((item.response.text, None))
+        return results
+
+
+class FakeProviderError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeProvider(AIProvider):
+    """Deterministic offline provider for tests, benchmarks and load tests.
+
+    Responses depend only on the input, and `latency` seconds are slept per
+    call to stand in for network/model time, plus `token_latency` seconds
+    per 1000 input tokens.  Cached context is billed (and timed) at
+    CACHED_TOKEN_FACTOR of a regular input token, as Gemini does.
+    """
+
+    name = "fake"
+    CACHED_TOKEN_FACTOR = 0.25
+    CHARS_PER_TOKEN = 4
+
+    def __init__(
+        self,
+        api_key: str = "",
+        latency: float | None = None,
+        token_latency: float = 0.0,
+    ):
+        if latency is None:
+            latency = float(settings_store.get("FAKE_PROVIDER_LATENCY", "0") or 0)
+        self.latency = latency
+        self.token_latency = token_latency
+        self._lock = threading.Lock()
+        self._caches: dict[str, tuple[str, float]] = {}  # name → (contents, expiry)
+        self.calls = 0
+        self.prompt_chars = 0
+        self.cached_chars = 0
+        self.caches_created = 0
+
+    def _record_call(self, prompt: str, cached_chars: int = 0):
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+            self.cached_chars += cached_chars
+        tokens = (len(prompt) + cached_chars * self.CACHED_TOKEN_FACTOR) / (
+            self.CHARS_PER_TOKEN
+        )
+        delay = self.latency + self.token_latency * tokens / 1000
+        if delay:
+            time.sleep(delay)
+
+    def create_cache(
+        self, contents: str, system_instruction: str, ttl_seconds: int, display_name: str
+    ) -> str:
+        # Creating a cache processes the full content once
+        self._record_call(system_instruction + contents)
+        name = "cachedContents/" + hashlib.sha1(
+            f"{display_name}{time.monotonic()}".encode()
+        ).hexdigest()[:12]
+        with self._lock:
+            self._caches[name] = (
+                system_instruction + contents,
+                time.monotonic() + ttl_seconds,
+            )
+            self.caches_created += 1
+        return name
+
+    def delete_cache(self, name: str):
+        with self._lock:
+            self._caches.pop(name, None)
+
+    def _cached(self, name: str) -> str:
+        with self._lock:
+            contents, expires_at = self._caches.get(name, ("", 0.0))
+            if time.monotonic() >= expires_at:
+                self._caches.pop(name, None)
+                raise FakeProviderError(404, f"Cached content {name} not found")
+        return contents
+
+    def transcribe_audio(
+        self,
+        audio_path: str,
+        prompt: str,
+        on_status=None,
+        response_schema: dict | None = None,
+    ) -> str:
+        with tracing.span("generate", model=self.name, kind="transcribe"):
+            self._record_call(prompt)
+        digest = hashlib.sha1()
+        with open(audio_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        with wave.open(audio_path, "rb") as wf:
+            duration = wf.getnframes() / wf.getframerate()
+
+        segments = []
+        for i, second in enumerate(range(0, max(1, int(duration)), 30)):
+            segments.append(
+                {
+                    "start": float(second),
+                    "end": float(min(second + 30, max(duration, second))),
+                    "speaker": f"Speaker {i % 2 + 1}",
+                    "text": f"Segment {i + 1} of recording {digest.hexdigest()[:8]}.",
+                }
+            )
+        if response_schema is not None:
+            return json.dumps({"segments": segments})
+        lines = []
+        for seg in segments:
+            h, rest = divmod(int(seg["start"]), 3600)
+            m, s = divmod(rest, 60)
+            lines.append(f"[{h:02d}:{m:02d}:{s:02d}] {seg['speaker']}: {seg['text']}")
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def _fake_json(cls, schema: dict, digest: str, path: str = ""):
+        """A value matching `schema`, derived from the prompt digest."""
+        kind = schema.get("type")
+        if kind == "object":
+            return {
+                key: cls._fake_json(sub, digest, f"{path}.{key}".lstrip("."))
+                for key, sub in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            return [
+                cls._fake_json(schema["items"], digest, f"{path}[{i}]")
+                for i in range(2)
+            ]
+        if kind in ("number", "integer"):
+            return int(digest[:4], 16) % 100
+        if kind == "boolean":
+            return int(digest[0], 16) % 2 == 0
+        return f"Fake {path or 'value'} {digest}"
+
+    def generate_text(
+        self,
+        prompt: str,
+        response_schema: dict | None = None,
+        cached_context: str | None = None,
+    ) -> str:
+        context = self._cached(cached_context) if cached_context else ""
+        with tracing.span(
+            "generate",
+            model=self.name,
+            prompt_chars=len(prompt),
+            cached=cached_context is not None,
+        ):
+            self._record_call(prompt, cached_chars=len(context))
+        digest = hashlib.sha1((context + prompt).encode()).hexdigest()[:8]
+        if response_schema is not None:
+            return json.dumps(self._fake_json(response_schema, digest))
+        return (
+            f"## Fake notes {digest}\n\n"
+            "### Meeting Purpose\nGenerated by the fake provider.\n\n"
+            f"### Key Discussion Points\n- Prompt was {len(prompt)} characters\n"
+        )
+
+
+PROVIDERS = {
+    "gemini": GeminiProvider,
+    "fake": FakeProvider,
+}
+
+# Providers hold API clients; reuse them until the key or provider changes.
+_provider_cache: dict[tuple[str, str], AIProvider] = {}
+_provider_lock = threading.Lock()
+
+
+def get_provider(api_key: str, name: str | None = None) -> AIProvider:
+    """Return a (cached) provider for AI_PROVIDER or the given name."""
+    name = name or settings_store.get("AI_PROVIDER", "gemini")
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown AI_PROVIDER {name!r}")
+    key = (name, api_key)
+    with _provider_lock:
+        provider = _provider_cache.get(key)
+        if provider is None:
+            provider = PROVIDERS[name](api_key)
+            _provider_cache[key] = provider
+        return provider
+
+
+def get_batch_provider(api_key: str) -> GeminiBatchProvider:
+    return GeminiBatchProvider(api_key)
+
+
+def clear_provider_cache(_changed_keys=None):
+    with _provider_lock:
+        _provider_cache.clear()
+
+
+settings_store.subscribe(
+    clear_provider_cache, ["GEMINI_API_KEY", "AI_PROVIDER", "FAKE_PROVIDER_LATENCY"]
+)
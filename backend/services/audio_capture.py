@@ -1,19 +1,52 @@
+import json
 import os
 import subprocess
 import sys
 import threading
-import wave
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from shutil import which
 
-import numpy as np
 import pyaudio
 
+from services.audio_executor import get_audio_executor, mix_recording
+from services import tracing
+from services.audio_mixer import PcmSource
+from services.frame_store import FrameStore, read_stream_into
+from services.level_meter import LevelMeter
+from services.pcm_ring import PcmRingBuffer
+from services.resampler import StreamingResampler
+from services.spool import MIC_SPOOL_SUFFIX, SPOOL_META_SUFFIX, SYSTEM_SPOOL_SUFFIX
+
 CHUNK = 1024
 FORMAT = pyaudio.paInt16
 CHANNELS = 1
-RATE = 44100
+DEVICE_RATE = 44100  # rate the mic is opened at
+# Rate everything is stored at. Speech transcription gains nothing above
+# 16 kHz; override with CAPTURE_SAMPLE_RATE (44100 disables decimation).
+DEFAULT_SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # bytes per sample for paInt16
+
+# The mic is captured in PyAudio callback mode: PortAudio's thread copies
+# each buffer into a preallocated ring and a worker drains it.  The ring
+# holds this many seconds at DEVICE_RATE before chunks are dropped.
+MIC_RING_SECONDS = 5
+# The worker drains between these many bytes per pass, growing the batch
+# while it is behind and shrinking it again once it catches up.
+MIC_MIN_DRAIN_BYTES = CHUNK * SAMPLE_WIDTH
+MIC_MAX_DRAIN_BYTES = CHUNK * SAMPLE_WIDTH * 32
+
+# Only the tail of AudioTee's stderr is kept for diagnostics
+AUDIOTEE_STDERR_MAX_LINES = 200
+
+# "mixed" averages mic + system into one mono track; "multitrack" keeps them
+# as the left/right channels of a stereo WAV (mic = left = the local user).
+RECORDING_MODES = ("mixed", "multitrack")
+
+# Captured PCM is appended to spool files next to the output WAV and
+# fsync'ed every checkpoint interval, so a crash loses at most one interval.
+DEFAULT_CHECKPOINT_INTERVAL = 10  # seconds; override with RECORDING_CHECKPOINT_SECONDS
 
 
 def _find_audiotee_binary() -> str | None:
@@ -45,39 +78,214 @@ def _find_audiotee_binary() -> str | None:
     return None
 
 
+def write_recording_wav(
+    mic: PcmSource,
+    system: PcmSource,
+    output_path: str,
+    mode: str = "mixed",
+    rate: int = DEFAULT_SAMPLE_RATE,
+) -> str:
+    """Write the captured mic and system PCM streams to a 16-bit WAV.
+
+    Each stream is either the list of captured chunks or a raw PCM file.
+    In "mixed" mode the streams are averaged into a mono WAV; in
+    "multitrack" mode they become the channels of a stereo WAV.  Streams
+    on disk are mixed in the audio process pool (see
+    services.audio_executor); in-memory chunks are mixed here.
+    """
+    args = (mic, system, output_path, mode, rate)
+    if all(s is None or isinstance(s, str) for s in (mic, system)):
+        stats = get_audio_executor().run(mix_recording, *args)
+    else:
+        stats = mix_recording(*args)
+
+    if stats["has_system"]:
+        print(
+            f"[AudioRecorder] Peak amplitude — mic: {stats['mic_peak']}, "
+            f"system: {stats['system_peak']} (of 32767)"
+        )
+    else:
+        print("[AudioRecorder] No system audio frames — using mic only")
+
+    duration_s = stats["samples"] / rate
+    print(
+        f"[AudioRecorder] Final {mode} WAV: {duration_s:.1f}s, "
+        f"{stats['samples']} samples"
+    )
+    return output_path
+
+
+def _spool_base(output_path: str) -> str:
+    return os.path.splitext(output_path)[0]
+
+
+def _remove_spool(base: str):
+    for suffix in (SPOOL_META_SUFFIX, MIC_SPOOL_SUFFIX, SYSTEM_SPOOL_SUFFIX):
+        try:
+            os.remove(base + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def _spool_bytes(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def recover_spool(meta_path: str) -> dict | None:
+    """Rebuild the WAV for an interrupted recording from its spool files.
+
+    Returns the spool metadata (including ``wav_path``) or None if there was
+    no audio to recover.  The spool files are removed either way.
+    """
+    base = meta_path[: -len(SPOOL_META_SUFFIX)]
+    try:
+        meta = json.loads(Path(meta_path).read_text())
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"[AudioRecorder] Unreadable spool metadata {meta_path}: {e}")
+        meta = {"wav_path": base + ".wav", "meeting_info": {}}
+
+    mic_spool = base + MIC_SPOOL_SUFFIX
+    system_spool = base + SYSTEM_SPOOL_SUFFIX
+    # A crash mid-write can leave half a sample at the end; the mixer
+    # only reads whole samples.
+    if _spool_bytes(mic_spool) < SAMPLE_WIDTH and _spool_bytes(system_spool) < SAMPLE_WIDTH:
+        _remove_spool(base)
+        return None
+
+    wav_path = meta.get("wav_path") or base + ".wav"
+    print(f"[AudioRecorder] Recovering interrupted recording → {wav_path}")
+    mode = meta.get("mode", "mixed")
+    if _spool_bytes(system_spool) < SAMPLE_WIDTH:
+        mode = "mixed"
+    # Spools written before the rate was configurable are at 44.1 kHz
+    rate = meta.get("rate", DEVICE_RATE)
+    write_recording_wav(mic_spool, system_spool, wav_path, mode, rate)
+    _remove_spool(base)
+    meta["wav_path"] = wav_path
+    return meta
+
+
 class AudioRecorder:
-    def __init__(self, output_dir: str):
+    def __init__(
+        self,
+        output_dir: str,
+        checkpoint_interval: float | None = None,
+        mode: str | None = None,
+        sample_rate: int | None = None,
+    ):
         self.output_dir = output_dir
+        self.mode = mode or os.getenv("RECORDING_MODE", "") or "mixed"
+        if self.mode not in RECORDING_MODES:
+            print(
+                f"[AudioRecorder] Unknown RECORDING_MODE {self.mode!r} — "
+                "using mixed"
+            )
+            self.mode = "mixed"
+        self.sample_rate = sample_rate or int(
+            os.getenv("CAPTURE_SAMPLE_RATE", "") or DEFAULT_SAMPLE_RATE
+        )
         self.is_recording = False
         self.audio = pyaudio.PyAudio()
-        self.mic_frames: list[bytes] = []
-        self.system_frames: list[bytes] = []
+        self.mic_frames = FrameStore()
+        self.system_frames = FrameStore()
+        self.mic_meter = LevelMeter(self.sample_rate)
+        self.system_meter = LevelMeter(self.sample_rate)
         self.mic_thread: threading.Thread | None = None
         self.system_thread: threading.Thread | None = None
         self._stderr_thread: threading.Thread | None = None
-        self._audiotee_stderr_lines: list[str] = []
+        self._audiotee_stderr_lines: deque[str] = deque(
+            maxlen=AUDIOTEE_STDERR_MAX_LINES
+        )
         self.audiotee_proc: subprocess.Popen | None = None
         self.output_path: str | None = None
         self.start_time: datetime | None = None
         self._audiotee_binary = _find_audiotee_binary()
+        if checkpoint_interval is None:
+            checkpoint_interval = float(
+                os.getenv("RECORDING_CHECKPOINT_SECONDS", "")
+                or DEFAULT_CHECKPOINT_INTERVAL
+            )
+        self.checkpoint_interval = checkpoint_interval
+        self._checkpoint_thread: threading.Thread | None = None
+        self._checkpoint_stop = threading.Event()
+        self._spool_base: str | None = None
+        self._spooled_bytes = {"mic": 0, "system": 0}
+        self.capture_stats: dict | None = None
+        self._reset_mic_capture()
 
     # ---- Mic recording (PyAudio) ----
 
+    def _reset_mic_capture(self):
+        self._mic_ring = PcmRingBuffer(DEVICE_RATE * SAMPLE_WIDTH * MIC_RING_SECONDS)
+        self._mic_status = {"input_overflows": 0, "input_underflows": 0}
+        self._mic_drain_bytes = MIC_MIN_DRAIN_BYTES
+        self.capture_stats = None
+
+    def _on_mic_audio(self, in_data, frame_count, time_info, status_flags):
+        """PortAudio callback: stash the buffer and return immediately."""
+        if status_flags & pyaudio.paInputOverflow:
+            self._mic_status["input_overflows"] += 1
+        if status_flags & pyaudio.paInputUnderflow:
+            self._mic_status["input_underflows"] += 1
+        if in_data:
+            self._mic_ring.write(in_data)
+        return (None, pyaudio.paContinue)
+
+    def _drain_mic(self, resampler: StreamingResampler):
+        """Move whatever the callback has buffered into mic_frames."""
+        ring = self._mic_ring
+        backlog = ring.available
+        # Adapt the batch size to the backlog so a slow pass is followed by
+        # fewer, larger passes instead of falling further behind.
+        if backlog > self._mic_drain_bytes:
+            self._mic_drain_bytes = min(self._mic_drain_bytes * 2, MIC_MAX_DRAIN_BYTES)
+        elif backlog < self._mic_drain_bytes // 4:
+            self._mic_drain_bytes = max(self._mic_drain_bytes // 2, MIC_MIN_DRAIN_BYTES)
+
+        while ring.available >= SAMPLE_WIDTH:
+            data = resampler.process(ring.read(self._mic_drain_bytes))
+            if data:
+                self.mic_frames.append(data)
+                self.mic_meter.update(data)
+
     def _record_mic(self):
-        """Record from the default microphone via PyAudio."""
+        """Record from the default microphone via PyAudio.
+
+        The device is opened at DEVICE_RATE in callback mode and decimated
+        to the capture sample rate as it is drained, so only target-rate
+        audio is kept.
+        """
+        resampler = StreamingResampler(DEVICE_RATE, self.sample_rate)
+        ring = self._mic_ring
         stream = self.audio.open(
             format=FORMAT,
             channels=CHANNELS,
-            rate=RATE,
+            rate=DEVICE_RATE,
             input=True,
             input_device_index=None,  # default mic
             frames_per_buffer=CHUNK,
+            stream_callback=self._on_mic_audio,
         )
+        stream.start_stream()
         while self.is_recording:
-            data = stream.read(CHUNK, exception_on_overflow=False)
-            self.mic_frames.append(data)
+            ring.data_ready.wait(timeout=0.5)
+            ring.data_ready.clear()
+            self._drain_mic(resampler)
         stream.stop_stream()
         stream.close()
+        # Whatever arrived between the last pass and stop_stream()
+        self._drain_mic(resampler)
+
+    def get_capture_stats(self) -> dict:
+        """Mic capture health: PortAudio status flags and ring overflows."""
+        ring = self._mic_ring
+        return {
+            **self._mic_status,
+            "ring_overflows": ring.overflows,
+            "dropped_seconds": round(ring.dropped_bytes / SAMPLE_WIDTH / DEVICE_RATE, 3),
+            "ring_high_water": round(ring.high_water / ring.capacity, 3),
+            "drain_bytes": self._mic_drain_bytes,
+        }
 
     # ---- System audio recording (AudioTee subprocess) ----
 
@@ -85,42 +293,46 @@ class AudioRecorder:
         """Capture system audio via AudioTee subprocess.
 
         AudioTee streams raw PCM to stdout.  Using --sample-rate to
-        match our mic rate (44100) also gives us 16-bit signed int LE
-        output — the same format as PyAudio paInt16.
+        match our capture rate makes AudioTee do the conversion itself and
+        also gives us 16-bit signed int LE output — the same format as
+        PyAudio paInt16.
         """
         cmd = [
             self._audiotee_binary,
             "--sample-rate",
-            str(RATE),
+            str(self.sample_rate),
         ]
         print(f"[AudioRecorder] Launching AudioTee: {' '.join(cmd)}")
+        # bufsize=0 gives a raw pipe: each readinto() is one read() syscall
+        # returning whatever is ready, with no intermediate buffer copy.
         self.audiotee_proc = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
+            bufsize=0,
         )
 
         # Drain stderr in background so the pipe doesn't fill and block
-        self._audiotee_stderr_lines = []
+        self._audiotee_stderr_lines = deque(maxlen=AUDIOTEE_STDERR_MAX_LINES)
         self._stderr_thread = threading.Thread(
             target=self._drain_stderr,
             daemon=True,
         )
         self._stderr_thread.start()
 
-        # Read fixed-size chunks that match our PyAudio config.
-        # 16-bit mono → 2 bytes per sample → CHUNK * 2 bytes per read.
-        bytes_per_read = CHUNK * 2
-
-        while self.is_recording:
-            data = self.audiotee_proc.stdout.read(bytes_per_read)
-            if not data:
-                print(
-                    "[AudioRecorder] AudioTee stdout closed "
-                    f"(collected {len(self.system_frames)} frames so far)"
-                )
-                break
-            self.system_frames.append(data)
+        # PCM is read straight into the frame store's preallocated blocks
+        read_stream_into(
+            self.audiotee_proc.stdout,
+            self.system_frames,
+            keep_going=lambda: self.is_recording,
+            on_data=self.system_meter.update,
+            sample_width=SAMPLE_WIDTH,
+        )
+        if self.is_recording:
+            print(
+                "[AudioRecorder] AudioTee stdout closed "
+                f"(collected {self.system_frames.nbytes} bytes so far)"
+            )
 
     def _drain_stderr(self):
         """Read AudioTee stderr to prevent pipe buffer from filling up."""
@@ -131,6 +343,52 @@ class AudioRecorder:
         except (ValueError, OSError):
             pass
 
+    # ---- Checkpointing ----
+
+    def _write_spool_meta(self, timestamp: str, meeting_info: dict):
+        meta = {
+            "wav_path": self.output_path,
+            "timestamp": timestamp,
+            "rate": self.sample_rate,
+            "channels": CHANNELS,
+            "sample_width": SAMPLE_WIDTH,
+            "mode": self.mode,
+            "meeting_info": meeting_info,
+            "started_at": self.start_time.isoformat(),
+        }
+        meta_path = self._spool_base + SPOOL_META_SUFFIX
+        with open(meta_path, "w") as f:
+            json.dump(meta, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _checkpoint(self):
+        """Append audio captured since the last checkpoint and fsync it.
+
+        Runs on its own thread; the capture threads only ever append to the
+        frame stores, so they never wait on disk I/O.
+        """
+        for name, frames, suffix in (
+            ("mic", self.mic_frames, MIC_SPOOL_SUFFIX),
+            ("system", self.system_frames, SYSTEM_SPOOL_SUFFIX),
+        ):
+            start = self._spooled_bytes[name]
+            end = frames.nbytes
+            if end == start:
+                continue
+            with open(self._spool_base + suffix, "ab") as f:
+                frames.write_range(f, start, end)
+                f.flush()
+                os.fsync(f.fileno())
+            self._spooled_bytes[name] = end
+
+    def _checkpoint_loop(self):
+        while not self._checkpoint_stop.wait(self.checkpoint_interval):
+            try:
+                self._checkpoint()
+            except OSError as e:
+                print(f"[AudioRecorder] Checkpoint failed: {e}")
+
     # ---- Public API ----
 
     def get_available_devices(self) -> list[dict]:
@@ -148,8 +406,12 @@ class AudioRecorder:
                 )
         return devices
 
-    def start(self, meeting_title: str = "untitled"):
-        """Start recording from mic + system audio."""
+    def start(self, meeting_title: str = "untitled", meeting_info: dict | None = None):
+        """Start recording from mic + system audio.
+
+        `meeting_info` is stored with the spool so an interrupted recording
+        can be processed with the right metadata after a crash.
+        """
         os.makedirs(self.output_dir, exist_ok=True)
 
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -158,11 +420,26 @@ class AudioRecorder:
             self.output_dir, f"{timestamp}_{safe_title}.wav"
         )
 
-        self.mic_frames = []
-        self.system_frames = []
+        self.mic_frames = FrameStore()
+        self.system_frames = FrameStore()
+        self.mic_meter = LevelMeter(self.sample_rate)
+        self.system_meter = LevelMeter(self.sample_rate)
+        self._reset_mic_capture()
         self.is_recording = True
         self.start_time = datetime.now()
 
+        self._spool_base = _spool_base(self.output_path)
+        self._spooled_bytes = {"mic": 0, "system": 0}
+        self._write_spool_meta(timestamp, meeting_info or {"title": meeting_title})
+        self._checkpoint_stop.clear()
+        self._checkpoint_thread = threading.Thread(
+            target=self._checkpoint_loop,
+            daemon=True,
+        )
+        self._checkpoint_thread.start()
+        # So stop() doesn't wait for the worker processes to start
+        get_audio_executor().warm_up()
+
         # Mic thread (always runs)
         self.mic_thread = threading.Thread(
             target=self._record_mic,
@@ -187,7 +464,11 @@ class AudioRecorder:
             self.system_thread.start()
 
     def stop(self) -> str:
-        """Stop recording and mix streams into a single WAV file."""
+        """Stop recording and write the streams to a single WAV file."""
+        with tracing.span("stop", mode=self.mode, rate=self.sample_rate):
+            return self._stop()
+
+    def _stop(self) -> str:
         self.is_recording = False
 
         # Stop AudioTee subprocess gracefully
@@ -206,54 +487,62 @@ class AudioRecorder:
         if self.system_thread:
             self.system_thread.join(timeout=5)
 
+        # Persist the tail so the spool stays complete until the WAV exists
+        self._checkpoint_stop.set()
+        if self._checkpoint_thread:
+            self._checkpoint_thread.join(timeout=5)
+        with tracing.span("checkpoint") as span:
+            try:
+                self._checkpoint()
+                # The spools now hold every captured byte: mix from them in
+                # the audio process pool instead of from memory here
+                mic_source, system_source = (
+                    self._spool_base + MIC_SPOOL_SUFFIX,
+                    self._spool_base + SYSTEM_SPOOL_SUFFIX,
+                )
+            except OSError as e:
+                print(f"[AudioRecorder] Final checkpoint failed: {e}")
+                span.fail(e)
+                mic_source, system_source = self.mic_frames, self.system_frames
+            span.set(
+                mic_bytes=self.mic_frames.nbytes,
+                system_bytes=self.system_frames.nbytes,
+            )
+
         # --- Diagnostics ---
-        mic_bytes = len(self.mic_frames)
-        sys_bytes = len(self.system_frames)
-        print(f"[AudioRecorder] Mic frames collected: {mic_bytes}")
-        print(f"[AudioRecorder] System frames collected: {sys_bytes}")
+        print(f"[AudioRecorder] Mic bytes collected: {self.mic_frames.nbytes}")
+        print(f"[AudioRecorder] System bytes collected: {self.system_frames.nbytes}")
+        self.capture_stats = self.get_capture_stats()
+        print(f"[AudioRecorder] Mic capture stats: {self.capture_stats}")
 
         if self._audiotee_stderr_lines:
-            for line in self._audiotee_stderr_lines[-5:]:
+            for line in list(self._audiotee_stderr_lines)[-5:]:
                 print(f"[AudioTee] {line}")
 
-        # Convert captured bytes to numpy arrays
-        mic_audio = np.frombuffer(b"".join(self.mic_frames), dtype=np.int16).astype(
-            np.float32
-        )
-
-        if self.system_frames:
-            sys_audio = np.frombuffer(
-                b"".join(self.system_frames), dtype=np.int16
-            ).astype(np.float32)
-
-            mic_peak = int(np.max(np.abs(mic_audio))) if len(mic_audio) > 0 else 0
-            sys_peak = int(np.max(np.abs(sys_audio))) if len(sys_audio) > 0 else 0
-            print(
-                f"[AudioRecorder] Peak amplitude — mic: {mic_peak}, "
-                f"system: {sys_peak} (of 32767)"
+        # Multitrack only makes sense with a second stream to keep apart
+        mode = self.mode if self.system_frames.nbytes else "mixed"
+        with tracing.span(
+            "mix", mode=mode, from_spool=isinstance(mic_source, str)
+        ) as span:
+            write_recording_wav(
+                mic_source,
+                system_source,
+                self.output_path,
+                mode,
+                self.sample_rate,
             )
-
-            # Pad the shorter array to match lengths
-            max_len = max(len(mic_audio), len(sys_audio))
-            mic_audio = np.pad(mic_audio, (0, max_len - len(mic_audio)))
-            sys_audio = np.pad(sys_audio, (0, max_len - len(sys_audio)))
-
-            mixed = ((mic_audio + sys_audio) / 2).clip(-32768, 32767).astype(np.int16)
-        else:
-            print("[AudioRecorder] No system audio frames — using mic only")
-            mixed = mic_audio.clip(-32768, 32767).astype(np.int16)
-
-        duration_s = len(mixed) / RATE
-        print(f"[AudioRecorder] Final WAV: {duration_s:.1f}s, {len(mixed)} samples")
-
-        with wave.open(self.output_path, "wb") as wf:
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(self.audio.get_sample_size(FORMAT))
-            wf.setframerate(RATE)
-            wf.writeframes(mixed.tobytes())
+            span.set(wav_bytes=os.path.getsize(self.output_path))
+        _remove_spool(self._spool_base)
 
         return self.output_path
 
+    def get_levels(self) -> dict:
+        """Current rolling RMS/peak levels for each captured stream."""
+        return {
+            "mic": self.mic_meter.snapshot(),
+            "system": self.system_meter.snapshot() if self.system_thread else None,
+        }
+
     def get_elapsed_seconds(self) -> int:
         """Get seconds since recording started."""
         if self.start_time and self.is_recording:
@@ -0,0 +1,136 @@
+"""Process pool for CPU-heavy audio work (mixing, FLAC encoding/decoding).
+
+Finalizing a recording (mixing both streams, peak detection, padding and
+the WAV write) is NumPy work that holds the GIL for long stretches.  In the
+API process it delays the capture threads of a meeting that has already
+started, and the event loop.  Jobs submitted here run in separate worker
+processes.  PCM never crosses the process boundary as pickled bytes: jobs
+take file paths (the recording's spool files, a WAV, a FLAC) and write
+their output to a file, so only paths and a small stats dict are pickled.
+
+The pool is spawned on first use (AudioRecorder.start() warms it up, so
+stopping a recording doesn't wait for worker start-up).  With
+AUDIO_PROCESS_POOL=0, or inside a daemon process that can't have children,
+jobs run inline in the calling thread.  The PyInstaller build keeps the
+pool: main.py calls multiprocessing.freeze_support() for its workers.
+"""
+
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from services.audio_mixer import PcmSource, interleave_to_wav, mix_to_wav
+from services.settings_store import settings_store
+
+# Enough to finalize one meeting while another is recovered or compressed
+AUDIO_POOL_WORKERS = 2
+
+
+def mix_recording(
+    mic: PcmSource, system: PcmSource, output_path: str, mode: str, rate: int
+) -> dict:
+    """Mix (or interleave, for "multitrack") two PCM streams into a WAV.
+
+    Returns the mixer's stats: samples, has_system and the peak levels.
+    """
+    if mode == "multitrack":
+        return interleave_to_wav(mic, system, output_path, rate)
+    return mix_to_wav(mic, system, output_path, rate)
+
+
+def _noop():
+    return None
+
+
+def pool_enabled() -> bool:
+    if settings_store.get("AUDIO_PROCESS_POOL", "1") == "0":
+        return False
+    return not multiprocessing.current_process().daemon
+
+
+class AudioExecutor:
+    def __init__(self, max_workers: int = AUDIO_POOL_WORKERS):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _get_pool(self) -> ProcessPoolExecutor | None:
+        if not pool_enabled():
+            return None
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def warm_up(self):
+        """Start the worker processes now rather than on the first job."""
+        pool = self._get_pool()
+        if pool is not None:
+            for _ in range(self.max_workers):
+                pool.submit(_noop)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Run a module-level function in the pool.
+
+        `fn` and its arguments must be picklable; pass paths, not PCM.
+        """
+        pool = self._get_pool()
+        if pool is not None:
+            try:
+                return pool.submit(fn, *args)
+            except BrokenProcessPool:
+                self._discard(pool)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def run(self, fn: Callable, *args):
+        """submit() and wait. A worker that died is retried once inline."""
+        future = self.submit(fn, *args)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            print(f"[AudioExecutor] Worker died running {fn.__name__}; retrying inline")
+            self._discard(self._pool)
+            return fn(*args)
+
+    def _discard(self, pool: ProcessPoolExecutor | None):
+        with self._lock:
+            if pool is not None and self._pool is pool:
+                self._pool = None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+_executor: AudioExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_audio_executor() -> AudioExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = AudioExecutor()
+        return _executor
+
+
+def shutdown_audio_executor():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
@@ -0,0 +1,588 @@
+"""Batch import of existing audio files (phone recordings, other tools).
+
+Each file goes through the same pipeline as a live recording:
+
+    decode + normalize → match a calendar event → transcribe → notes
+
+Decoding is streamed block by block into a mono 16-bit WAV at the capture
+sample rate: WAV/FLAC/OGG with soundfile (16-bit WAV also without it),
+anything else (m4a, mp3, ...) through ffmpeg (FFMPEG_PATH, or on $PATH).
+It runs in the audio process pool (see services.audio_executor).
+
+A file's start time comes from a timestamp in its name (as phone
+recorders write them) or else its modification time minus its duration.
+It is matched to the calendar event it overlaps most, or one starting
+within MATCH_TOLERANCE_SECONDS, and processed with that event's title
+and attendees.
+
+Up to IMPORT_MAX_WORKERS files are processed at once.  A manifest keyed by
+each file's content hash records finished files, so re-running an import
+(or resuming one after a restart) skips them, even if they were moved.
+Import jobs are persisted like batch jobs, with per-file progress.
+
+From the command line (from the backend directory):
+
+    python -m services.audio_import ~/Recordings/phone/ meeting.m4a
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import soundfile
+except ImportError:  # optional: 16-bit WAV is still read with `wave`
+    soundfile = None
+
+from services import tracing
+from services.interval_index import IntervalIndex
+from services.resampler import StreamingResampler
+from services.settings_store import settings_store
+
+AUDIO_EXTENSIONS = {
+    ".wav", ".flac", ".ogg", ".mp3", ".m4a", ".aac", ".opus", ".webm",
+    ".mp4", ".wma", ".amr", ".3gp", ".caf", ".aiff",
+}
+# Read with soundfile (libsndfile); the rest need ffmpeg
+SOUNDFILE_EXTENSIONS = {".wav", ".flac", ".ogg", ".aiff"}
+# Same default as AudioRecorder (CAPTURE_SAMPLE_RATE)
+DEFAULT_SAMPLE_RATE = 16000
+DECODE_BLOCK_FRAMES = 1 << 16
+DEFAULT_IMPORT_WORKERS = 2
+# A recording that overlaps no event may still start this close to one
+MATCH_TOLERANCE_SECONDS = 15 * 60
+
+DEFAULT_IMPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "imports")
+SCRATCH_DIR = os.path.join(tempfile.gettempdir(), "meeting-imports")
+
+# 2024-03-05 10.30.00, 20240305_103000, Recording_2024-03-05-10-30-00, ...
+_FILENAME_TIME_RE = re.compile(
+    r"(\d{4})[-_.]?(\d{2})[-_.]?(\d{2})[ _T.-]?(\d{2})[-_.:h]?(\d{2})(?:[-_.:m]?(\d{2}))?"
+)
+
+
+# ---- Files ----
+
+
+def find_audio_files(paths: list[str], recursive: bool = True) -> list[str]:
+    """Audio files among `paths`, expanding directories; sorted, deduplicated."""
+    found = set()
+    for path in paths:
+        path = os.path.abspath(os.path.expanduser(path))
+        if os.path.isdir(path):
+            pattern = "**/*" if recursive else "*"
+            for p in Path(path).glob(pattern):
+                if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS:
+                    found.add(str(p))
+        elif os.path.isfile(path) and Path(path).suffix.lower() in AUDIO_EXTENSIONS:
+            found.add(path)
+    return sorted(found)
+
+
+def fingerprint(path: str) -> str:
+    """Content hash of a file, so renamed or moved files are recognized."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:32]
+
+
+def time_from_filename(path: str) -> datetime | None:
+    match = _FILENAME_TIME_RE.search(Path(path).stem)
+    if not match:
+        return None
+    parts = [int(g) for g in match.groups(default="0")]
+    try:
+        return datetime(*parts)
+    except ValueError:
+        return None
+
+
+def recording_start(path: str, duration: float = 0.0) -> datetime:
+    """When a recording started: from its name, else mtime minus duration."""
+    named = time_from_filename(path)
+    if named is not None:
+        return named
+    return datetime.fromtimestamp(os.path.getmtime(path)) - timedelta(seconds=duration)
+
+
+# ---- Decoding ----
+
+
+def _ffmpeg_path() -> str:
+    ffmpeg = settings_store.get("FFMPEG_PATH") or shutil.which("ffmpeg")
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg is required to import this format (set FFMPEG_PATH)")
+    return ffmpeg
+
+
+def normalize_audio(src: str, dest: str, rate: int) -> dict:
+    """Decode `src` into a mono 16-bit WAV at `rate`, streaming.
+
+    Returns {"duration_seconds", "source_rate", "source_channels", "decoder"}.
+    """
+    ext = Path(src).suffix.lower()
+    with wave.open(dest, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+
+        if soundfile is not None and ext in SOUNDFILE_EXTENSIONS:
+            with soundfile.SoundFile(src) as f:
+                info = {"source_rate": f.samplerate, "source_channels": f.channels}
+                blocks = f.blocks(
+                    blocksize=DECODE_BLOCK_FRAMES, dtype="int16", always_2d=True
+                )
+                _write_blocks(out, blocks, f.samplerate, rate)
+            info["decoder"] = "soundfile"
+        elif ext == ".wav":
+            with wave.open(src, "rb") as wf:
+                if wf.getsampwidth() != 2:
+                    raise ValueError("Only 16-bit WAV can be read without soundfile")
+                channels = wf.getnchannels()
+                info = {"source_rate": wf.getframerate(), "source_channels": channels}
+                blocks = (
+                    np.frombuffer(frames, dtype=np.int16).reshape(-1, channels)
+                    for frames in iter(lambda: wf.readframes(DECODE_BLOCK_FRAMES), b"")
+                )
+                _write_blocks(out, blocks, wf.getframerate(), rate)
+            info["decoder"] = "wave"
+        else:
+            # ffmpeg decodes, downmixes and resamples; we only stream its
+            # output.  stderr goes to a file: a pipe nobody reads while we
+            # drain stdout would fill up with warnings and block ffmpeg.
+            with tempfile.TemporaryFile() as errors:
+                proc = subprocess.Popen(
+                    [_ffmpeg_path(), "-nostdin", "-loglevel", "error", "-i", src,
+                     "-f", "s16le", "-ac", "1", "-ar", str(rate), "-"],
+                    stdout=subprocess.PIPE,
+                    stderr=errors,
+                )
+                with proc.stdout:
+                    for chunk in iter(lambda: proc.stdout.read(DECODE_BLOCK_FRAMES * 2), b""):
+                        out.writeframes(chunk)
+                returncode = proc.wait()
+                errors.seek(0)
+                stderr = errors.read().decode(errors="replace").strip()
+            if returncode != 0:
+                raise RuntimeError(f"ffmpeg failed: {stderr[-500:]}")
+            info = {"source_rate": None, "source_channels": None, "decoder": "ffmpeg"}
+        frames = out.tell()
+
+    info["duration_seconds"] = round(frames / rate, 1)
+    if not frames:
+        raise ValueError("No audio decoded")
+    return info
+
+
+def _write_blocks(out: wave.Wave_write, blocks, in_rate: int, rate: int):
+    """Downmix (n, channels) int16 blocks to mono, resample, write."""
+    resampler = StreamingResampler(in_rate, rate)
+    for block in blocks:
+        if block.shape[1] > 1:
+            block = (block.astype(np.int32).sum(axis=1) // block.shape[1]).astype(
+                np.int16
+            )
+        else:
+            block = block[:, 0]
+        out.writeframes(resampler.process(np.ascontiguousarray(block).tobytes()))
+
+
+# ---- Calendar matching ----
+
+
+def index_events(events: list[dict]) -> IntervalIndex:
+    return IntervalIndex(
+        (
+            datetime.fromisoformat(e["start"]).timestamp(),
+            datetime.fromisoformat(e["end"]).timestamp(),
+            e,
+        )
+        for e in events
+    )
+
+
+def match_event(start: datetime, duration: float, events: IntervalIndex) -> dict | None:
+    """The event a recording most overlaps, or one starting close to it."""
+    t0 = start.timestamp()
+    t1 = t0 + max(duration, 1.0)
+
+    def bounds(event: dict) -> tuple[float, float]:
+        return (
+            datetime.fromisoformat(event["start"]).timestamp(),
+            datetime.fromisoformat(event["end"]).timestamp(),
+        )
+
+    overlapping = events.overlapping(t0, t1)
+    if overlapping:
+        return max(
+            overlapping, key=lambda e: min(t1, bounds(e)[1]) - max(t0, bounds(e)[0])
+        )
+    nearby = [
+        e
+        for e in events.overlapping(t0 - MATCH_TOLERANCE_SECONDS, t0 + MATCH_TOLERANCE_SECONDS)
+        if abs(bounds(e)[0] - t0) <= MATCH_TOLERANCE_SECONDS
+    ]
+    return min(nearby, key=lambda e: abs(bounds(e)[0] - t0), default=None)
+
+
+def fetch_events(starts: list[datetime]) -> list[dict]:
+    """Calendar events around the given start times (one query), or []."""
+    if not starts:
+        return []
+    try:
+        from services.calendar_service import CalendarService
+        from services.google_auth import get_cached_credentials
+
+        creds_path = settings_store.resolve_path("GOOGLE_CREDENTIALS_PATH", "./credentials.json")
+        if not os.path.exists(creds_path):
+            return []
+        creds = get_cached_credentials(
+            creds_path, settings_store.resolve_path("GOOGLE_TOKEN_PATH", "./token.json")
+        )
+        margin = timedelta(days=1)
+        return CalendarService(creds).get_meetings_between(
+            (min(starts) - margin).astimezone(), (max(starts) + margin).astimezone()
+        )
+    except Exception as e:
+        print(f"[Import] Calendar lookup failed, importing without events: {e}")
+        return []
+
+
+def meeting_info_for(path: str, start: datetime, duration: float, event: dict | None):
+    if event is not None:
+        return dict(event)
+    title = _FILENAME_TIME_RE.sub("", Path(path).stem).strip(" _-.") or "Imported recording"
+    return {
+        "title": title.replace("_", " "),
+        "start": start.isoformat(),
+        "end": (start + timedelta(seconds=duration)).isoformat(),
+        "attendees": [],
+        "description": f"Imported from {os.path.basename(path)}",
+        "meeting_link": "",
+    }
+
+
+# ---- Manifest ----
+
+
+class ImportManifest:
+    """fingerprint → outcome of every file imported so far."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            self.entries: dict[str, dict] = json.loads(Path(path).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def get(self, fp: str) -> dict | None:
+        with self._lock:
+            entry = self.entries.get(fp)
+            return dict(entry) if entry else None
+
+    def update(self, fp: str, **fields):
+        with self._lock:
+            self.entries.setdefault(fp, {}).update(fields)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".manifest.", dir=os.path.dirname(self.path))
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+# ---- Jobs ----
+
+
+class ImportManager:
+    def __init__(self, import_dir: str):
+        self.import_dir = import_dir
+        self.manifest = ImportManifest(os.path.join(import_dir, "manifest.json"))
+        self._lock = threading.Lock()
+        self._jobs: dict[str, dict] = {}
+        self._active: set[str] = set()  # fingerprints being imported right now
+
+    # ---- Records ----
+
+    def _record_path(self, job_id: str) -> str:
+        return os.path.join(self.import_dir, f"{job_id}.json")
+
+    def _save(self, job: dict):
+        """Write the job record atomically (progress() saves from many threads)."""
+        with self._lock:
+            os.makedirs(self.import_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".job.", dir=self.import_dir)
+            with os.fdopen(fd, "w") as f:
+                json.dump(job, f, indent=2)
+            os.replace(tmp_path, self._record_path(job["id"]))
+
+    def get_job(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return json.loads(json.dumps(job))
+        try:
+            return json.loads(Path(self._record_path(os.path.basename(job_id))).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def list_jobs(self) -> list[dict]:
+        """Job summaries (without the per-file list), newest first."""
+        if not os.path.isdir(self.import_dir):
+            return []
+        jobs = []
+        for path in sorted(Path(self.import_dir).glob("*.json"), reverse=True):
+            if path.name == "manifest.json":
+                continue
+            job = self.get_job(path.stem)
+            if job:
+                job.pop("files", None)
+                jobs.append(job)
+        return jobs
+
+    def resume(self):
+        """Restart import jobs that were running when the server stopped.
+
+        Files finished before the restart are skipped via the manifest.
+        """
+        for summary in self.list_jobs():
+            if summary["state"] == "running":
+                job = self.get_job(summary["id"])
+                print(f"[Import] Resuming import {job['id']}")
+                self._start(job)
+
+    # ---- Running ----
+
+    def start_import(
+        self,
+        paths: list[str],
+        recursive: bool = True,
+        match_calendar: bool = True,
+        max_workers: int | None = None,
+        on_progress=None,
+        background: bool = True,
+    ) -> dict:
+        """Import the audio files in `paths` (files or folders).
+
+        Returns the job record; with background=False, once it has finished.
+        """
+        if max_workers is None:
+            max_workers = max(
+                1, int(settings_store.get("IMPORT_MAX_WORKERS") or DEFAULT_IMPORT_WORKERS)
+            )
+        elif max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        files = find_audio_files(paths, recursive)
+        job = {
+            "id": datetime.now().strftime("%Y-%m-%d_%H-%M-%S_") + uuid.uuid4().hex[:6],
+            "state": "running",
+            "created_at": datetime.now().isoformat(),
+            "paths": paths,
+            "match_calendar": match_calendar,
+            "max_workers": max_workers,
+            "counts": {},
+            "files": [{"path": p, "state": "pending", "step": ""} for p in files],
+        }
+        return self._start(job, on_progress, background)
+
+    def _start(self, job: dict, on_progress=None, background: bool = True) -> dict:
+        with self._lock:
+            self._jobs[job["id"]] = job
+        self._save(job)
+        if background:
+            threading.Thread(target=self._run, args=(job, on_progress), daemon=True).start()
+        else:
+            self._run(job, on_progress)
+        return self.get_job(job["id"])
+
+    def _run(self, job: dict, on_progress=None):
+        try:
+            self._run_files(job, on_progress)
+            state, error = "done", None
+        except Exception as e:
+            # Don't leave the record "running" (it would be resumed forever)
+            state, error = "failed", str(e)
+        with self._lock:
+            job["state"] = state
+            job["error"] = error
+            job["finished_at"] = datetime.now().isoformat()
+        self._save(job)
+        with self._lock:
+            self._jobs.pop(job["id"], None)
+        print(f"[Import] Import {job['id']} {state}: {error or job['counts']}")
+
+    def _run_files(self, job: dict, on_progress=None):
+        from services.pipeline import config_from_settings
+
+        config = config_from_settings(settings_store)
+        rate = int(settings_store.get("CAPTURE_SAMPLE_RATE") or DEFAULT_SAMPLE_RATE)
+        events = []
+        if job["match_calendar"]:
+            # One calendar query for the whole batch, from rough start times
+            events = fetch_events([recording_start(f["path"]) for f in job["files"]
+                                   if os.path.exists(f["path"])])
+        events = index_events(events)
+
+        def progress(entry: dict, **fields):
+            with self._lock:
+                entry.update(fields)
+                counts: dict[str, int] = {}
+                for f in job["files"]:
+                    counts[f["state"]] = counts.get(f["state"], 0) + 1
+                job["counts"] = counts
+            if "state" in fields:
+                self._save(job)
+            if on_progress:
+                on_progress(entry)
+
+        def import_file(entry: dict):
+            try:
+                self._import_file(entry, config, rate, events, progress)
+            except Exception as e:
+                progress(entry, state="failed", step="", error=str(e))
+
+        with ThreadPoolExecutor(max_workers=max(1, job["max_workers"])) as pool:
+            list(pool.map(import_file, job["files"]))
+
+    def _import_file(self, entry: dict, config: dict, rate: int, events, progress):
+        from services.audio_executor import get_audio_executor
+        from services.pipeline import run_pipeline
+
+        path = entry["path"]
+        if not os.path.exists(path):
+            progress(entry, state="failed", error="File not found")
+            return
+        progress(entry, step="Hashing...")
+        fp = fingerprint(path)
+        previous = self.manifest.get(fp)
+        if previous and previous.get("state") == "done":
+            progress(
+                entry,
+                state="skipped",
+                step="Already imported",
+                notes_filename=previous.get("notes_filename"),
+            )
+            return
+        with self._lock:
+            busy = fp in self._active
+            self._active.add(fp)
+        if busy:
+            progress(entry, state="skipped", step="Being imported by another job")
+            return
+
+        os.makedirs(SCRATCH_DIR, exist_ok=True)
+        wav_path = os.path.join(SCRATCH_DIR, f"{fp}.wav")
+        trace = tracing.new_trace("import", path=path)
+        error = None
+        try:
+            with tracing.activate(trace):
+                progress(entry, state="decoding", step="Decoding...", trace_id=trace.trace_id)
+                with tracing.span("decode", bytes=os.path.getsize(path)) as span:
+                    audio = get_audio_executor().run(normalize_audio, path, wav_path, rate)
+                    span.set(**audio)
+
+                start = recording_start(path, audio["duration_seconds"])
+                event = match_event(start, audio["duration_seconds"], events)
+                meeting_info = meeting_info_for(
+                    path, start, audio["duration_seconds"], event
+                )
+                trace.set(title=meeting_info["title"], matched=event is not None)
+                progress(
+                    entry,
+                    state="processing",
+                    title=meeting_info["title"],
+                    event_id=event["id"] if event else None,
+                    duration_seconds=audio["duration_seconds"],
+                )
+                result = run_pipeline(
+                    wav_path,
+                    meeting_info,
+                    start.strftime("%Y-%m-%d_%H-%M-%S"),
+                    config,
+                    on_status=lambda msg: progress(entry, step=msg),
+                )
+            self.manifest.update(
+                fp,
+                state="done",
+                path=path,
+                title=meeting_info["title"],
+                transcript_filename=result["transcript_filename"],
+                notes_filename=result["notes_filename"],
+                imported_at=datetime.now().isoformat(),
+            )
+            progress(
+                entry,
+                state="done",
+                step="Done!",
+                notes_filename=result["notes_filename"],
+            )
+        except Exception as e:
+            error = e
+            self.manifest.update(fp, state="failed", path=path, error=str(e))
+            progress(entry, state="failed", step="", error=str(e))
+        finally:
+            trace.end(error)
+            with self._lock:
+                self._active.discard(fp)
+            if os.path.exists(wav_path):
+                os.remove(wav_path)
+
+
+_manager: ImportManager | None = None
+
+
+def get_import_manager() -> ImportManager:
+    global _manager
+    if _manager is None:
+        _manager = ImportManager(
+            settings_store.resolve_path("IMPORT_DIR", DEFAULT_IMPORT_DIR)
+        )
+    return _manager
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import audio files or folders as transcripts and notes"
+    )
+    parser.add_argument("paths", nargs="+", help="Audio files and/or folders")
+    parser.add_argument("--no-recursive", action="store_true")
+    parser.add_argument("--no-calendar", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    def on_progress(entry: dict):
+        if entry["state"] in ("done", "failed", "skipped"):
+            detail = entry.get("error") or entry.get("notes_filename") or entry["step"]
+            print(f"[{entry['state']:>7}] {entry['path']}: {detail}")
+
+    job = get_import_manager().start_import(
+        args.paths,
+        recursive=not args.no_recursive,
+        match_calendar=not args.no_calendar,
+        max_workers=args.workers,
+        on_progress=on_progress,
+        background=False,
+    )
+    print(f"Import {job['id']}: {job['counts']}")
+    from services.audio_executor import shutdown_audio_executor
+
+    shutdown_audio_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Block-wise PCM mixing into a memory-mapped WAV file.
+
+The mixer never materializes a full-length copy of either stream: samples
+are pulled one fixed-size block at a time into preallocated buffers, mixed
+in an int32 accumulator in place, and written straight into the output
+file through a memory map.  Peak memory is bounded by the block size no
+matter how long the meeting was.
+
+The result is bit-identical to the original float32 implementation, which
+computed ``((mic + system) / 2).astype(int16)`` (i.e. truncation toward
+zero of the average).
+"""
+
+import os
+import struct
+from collections.abc import Sequence
+
+import numpy as np
+
+SAMPLE_WIDTH = 2  # 16-bit PCM
+MIX_BLOCK_SAMPLES = 1 << 16  # 64k samples per block (~1.5s at 44.1 kHz)
+
+# A stream is either the list of captured byte chunks or a raw PCM file path
+PcmSource = Sequence[bytes] | str | None
+
+
+class PcmReader:
+    """Read a raw 16-bit PCM stream in fixed-size blocks.
+
+    Blocks are returned as int16 views of a single reusable buffer, so each
+    block is only valid until the next call to `read_block()`.
+    """
+
+    def __init__(self, source: PcmSource, block_samples: int = MIX_BLOCK_SAMPLES):
+        self._buf = bytearray(block_samples * SAMPLE_WIDTH)
+        self._view = memoryview(self._buf)
+        self._file = None
+        self._chunks: Sequence[bytes] = ()
+        self._chunk_idx = 0
+        self._chunk_off = 0
+
+        if isinstance(source, str):
+            nbytes = os.path.getsize(source) if os.path.exists(source) else 0
+            if nbytes:
+                self._file = open(source, "rb")
+        else:
+            self._chunks = source or ()
+            nbytes = sum(len(c) for c in self._chunks)
+
+        self.samples = nbytes // SAMPLE_WIDTH
+        self._remaining = self.samples * SAMPLE_WIDTH
+
+    def read_block(self) -> np.ndarray:
+        want = min(len(self._buf), self._remaining)
+        filled = 0
+        if self._file:
+            while filled < want:
+                n = self._file.readinto(self._view[filled:want])
+                if not n:
+                    break
+                filled += n
+        else:
+            while filled < want and self._chunk_idx < len(self._chunks):
+                chunk = self._chunks[self._chunk_idx]
+                take = min(len(chunk) - self._chunk_off, want - filled)
+                if take == len(chunk):
+                    self._view[filled : filled + take] = chunk
+                else:
+                    self._view[filled : filled + take] = memoryview(chunk)[
+                        self._chunk_off : self._chunk_off + take
+                    ]
+                filled += take
+                self._chunk_off += take
+                if self._chunk_off == len(chunk):
+                    self._chunk_idx += 1
+                    self._chunk_off = 0
+        self._remaining -= filled
+        return np.frombuffer(self._buf, dtype=np.int16, count=filled // SAMPLE_WIDTH)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def _wav_header(nframes: int, channels: int, rate: int) -> bytes:
+    """Canonical 44-byte PCM WAV header (same bytes the `wave` module writes)."""
+    block_align = channels * SAMPLE_WIDTH
+    data_len = nframes * block_align
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_len,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        channels,
+        rate,
+        rate * block_align,
+        block_align,
+        SAMPLE_WIDTH * 8,
+        b"data",
+        data_len,
+    )
+
+
+def open_wav_memmap(output_path: str, nframes: int, channels: int, rate: int):
+    """Create a WAV file of the final size and map its sample data.
+
+    Returns an int16 memmap of shape (nframes * channels,), or None when the
+    file has no samples (a zero-length file cannot be mapped).
+    """
+    with open(output_path, "wb") as f:
+        f.write(_wav_header(nframes, channels, rate))
+        f.truncate(44 + nframes * channels * SAMPLE_WIDTH)
+    if nframes == 0:
+        return None
+    return np.memmap(
+        output_path,
+        dtype="<i2",
+        mode="r+",
+        offset=44,
+        shape=(nframes * channels,),
+    )
+
+
+def _peak(block: np.ndarray) -> int:
+    if not len(block):
+        return 0
+    return max(int(block.max()), -int(block.min()))
+
+
+def mix_to_wav(
+    mic: PcmSource,
+    system: PcmSource,
+    output_path: str,
+    rate: int,
+    block_samples: int = MIX_BLOCK_SAMPLES,
+) -> dict:
+    """Average the mic and system streams into a mono 16-bit WAV.
+
+    The shorter stream is treated as zero-padded.  With no system audio the
+    mic stream is written unchanged.  Returns sample count and peak levels.
+    """
+    mic_reader = PcmReader(mic, block_samples)
+    sys_reader = PcmReader(system, block_samples)
+    has_system = sys_reader.samples > 0
+    total = max(mic_reader.samples, sys_reader.samples)
+
+    acc = np.empty(block_samples, dtype=np.int32)
+    negative = np.empty(block_samples, dtype=np.bool_)
+    mic_peak = sys_peak = 0
+
+    out = open_wav_memmap(output_path, total, 1, rate)
+    try:
+        pos = 0
+        while pos < total:
+            n = min(block_samples, total - pos)
+            mic_block = mic_reader.read_block()
+            mic_peak = max(mic_peak, _peak(mic_block))
+            dest = out[pos : pos + n]
+
+            if not has_system:
+                dest[: len(mic_block)] = mic_block
+                dest[len(mic_block) :] = 0
+                pos += n
+                continue
+
+            sys_block = sys_reader.read_block()
+            sys_peak = max(sys_peak, _peak(sys_block))
+
+            block = acc[:n]
+            block[: len(mic_block)] = mic_block
+            block[len(mic_block) :] = 0
+            np.add(
+                block[: len(sys_block)], sys_block, out=block[: len(sys_block)]
+            )
+            # Halve with truncation toward zero: (s + (s < 0)) >> 1
+            neg = negative[:n]
+            np.less(block, 0, out=neg)
+            np.add(block, neg, out=block)
+            np.right_shift(block, 1, out=block)
+            np.copyto(dest, block, casting="unsafe")
+            pos += n
+
+        if out is not None:
+            out.flush()
+    finally:
+        del out
+        mic_reader.close()
+        sys_reader.close()
+
+    return {
+        "samples": total,
+        "has_system": has_system,
+        "mic_peak": mic_peak,
+        "system_peak": sys_peak,
+    }
+
+
+def interleave_to_wav(
+    mic: PcmSource,
+    system: PcmSource,
+    output_path: str,
+    rate: int,
+    block_samples: int = MIX_BLOCK_SAMPLES,
+) -> dict:
+    """Write the mic (left) and system (right) streams as a stereo WAV.
+
+    No arithmetic is done on the samples; the shorter stream is padded
+    with silence.  Returns frame count and peak levels.
+    """
+    mic_reader = PcmReader(mic, block_samples)
+    sys_reader = PcmReader(system, block_samples)
+    total = max(mic_reader.samples, sys_reader.samples)
+    mic_peak = sys_peak = 0
+
+    out = open_wav_memmap(output_path, total, 2, rate)
+    try:
+        frames = out.reshape(-1, 2) if out is not None else None
+        pos = 0
+        while pos < total:
+            n = min(block_samples, total - pos)
+            dest = frames[pos : pos + n]
+            for channel, reader in ((0, mic_reader), (1, sys_reader)):
+                block = reader.read_block()
+                dest[: len(block), channel] = block
+                dest[len(block) :, channel] = 0
+                if channel == 0:
+                    mic_peak = max(mic_peak, _peak(block))
+                else:
+                    sys_peak = max(sys_peak, _peak(block))
+            pos += n
+
+        if out is not None:
+            out.flush()
+    finally:
+        del out
+        mic_reader.close()
+        sys_reader.close()
+
+    return {
+        "samples": total,
+        "has_system": sys_reader.samples > 0,
+        "mic_peak": mic_peak,
+        "system_peak": sys_peak,
+    }
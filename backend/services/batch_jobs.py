@@ -0,0 +1,282 @@
+"""Gemini batch-mode processing for backlogs.
+
+Saved recordings (and transcripts that need their notes re-generated) can
+be submitted as one batch job instead of one synchronous request each.
+Batch jobs are cheaper and not rate-limited like interactive calls, but
+finish asynchronously, so each job is persisted as a JSON record and
+polled on a background thread until done:
+
+    saved recordings → "transcribe" batch → transcripts saved
+                     → "format" batch     → notes saved → on_notes_saved()
+
+Records survive restarts; call `resume()` at startup to pick them up again.
+A record gets `finished_at` only once its results are handled, and items
+are saved as they are handled, so a restart mid-handling resumes there.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from services.ai_provider import BATCH_TERMINAL_STATES, get_batch_provider
+from services.note_formatter import NoteFormatter
+from services.structured_notes import NOTES_SCHEMA
+from services.settings_store import settings_store
+from services.transcript_index import (
+    TRANSCRIPT_SCHEMA,
+    parse_segments,
+    segments_to_text,
+)
+from services.transcription import TRANSCRIBE_PROMPT, TranscriptionService
+
+BATCH_POLL_INTERVAL = 60  # seconds
+
+# Called with (item, notes_filename) once an item's notes are saved
+NotesSavedCallback = Callable[[dict, str], None]
+
+
+class BatchJobManager:
+    def __init__(self, batch_dir: str, on_notes_saved: NotesSavedCallback):
+        self.batch_dir = batch_dir
+        self.on_notes_saved = on_notes_saved
+        self._lock = threading.Lock()
+        self._polling: set[str] = set()
+
+    # ---- Records ----
+
+    def _record_path(self, record_id: str) -> str:
+        return os.path.join(self.batch_dir, f"{record_id}.json")
+
+    def _save(self, record: dict):
+        os.makedirs(self.batch_dir, exist_ok=True)
+        Path(self._record_path(record["id"])).write_text(json.dumps(record, indent=2))
+
+    def list_jobs(self) -> list[dict]:
+        if not os.path.isdir(self.batch_dir):
+            return []
+        records = []
+        for path in sorted(Path(self.batch_dir).glob("*.json"), reverse=True):
+            try:
+                records.append(json.loads(path.read_text()))
+            except json.JSONDecodeError:
+                continue
+        return records
+
+    def is_item_pending(self, record_id: str, timestamp: str, title: str) -> bool:
+        """Whether an item of batch `record_id` is still being worked on.
+
+        Follows a transcribe batch into its format follow-up.  The item is
+        done once its notes are saved or it failed.
+        """
+        records = {r["id"]: r for r in self.list_jobs()}
+        record = records.get(record_id)
+        while record is not None:
+            item = next(
+                (
+                    i
+                    for i in record["items"]
+                    if i["timestamp"] == timestamp
+                    and i["meeting_info"].get("title", "untitled") == title
+                ),
+                None,
+            )
+            if item is None or "error" in item or "notes_filename" in item:
+                return False
+            if "finished_at" not in record:
+                return True
+            record = records.get(record.get("follow_up"))
+        return False
+
+    def resume(self):
+        """Restart jobs that hadn't finished, or whose results weren't handled."""
+        for record in self.list_jobs():
+            if "finished_at" not in record:
+                self._start_polling(record)
+
+    # ---- Submission ----
+
+    def _new_record(self, kind: str, job_name: str, items: list[dict]) -> dict:
+        record = {
+            "id": f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{kind}_{uuid.uuid4().hex[:6]}",
+            "kind": kind,
+            "job_name": job_name,
+            "state": "JOB_STATE_PENDING",
+            "items": items,
+            "created_at": datetime.now().isoformat(),
+        }
+        self._save(record)
+        self._start_polling(record)
+        return record
+
+    def submit_recordings(self, recordings: list[dict]) -> dict:
+        """Submit saved recordings for transcription as one batch.
+
+        Each recording dict needs wav_path, meeting_info and timestamp; any
+        other keys (e.g. meta_path) are carried through to on_notes_saved.
+        """
+        provider = get_batch_provider(settings_store.get("GEMINI_API_KEY"))
+        requests = []
+        for rec in recordings:
+            uploaded = provider.upload_file(rec["wav_path"])
+            requests.append([TRANSCRIBE_PROMPT, uploaded])
+        job_name = provider.submit_batch(
+            requests,
+            display_name=f"transcribe-{len(recordings)}-recordings",
+            response_schema=TRANSCRIPT_SCHEMA,
+        )
+        print(f"[Batch] Submitted {len(recordings)} recording(s) as {job_name}")
+        return self._new_record("transcribe", job_name, recordings)
+
+    def submit_reformat(self, items: list[dict]) -> dict | None:
+        """Submit note generation for existing transcripts as one batch.
+
+        Each item needs transcript_filename, meeting_info and timestamp.
+        Transcripts too long for a single request are formatted
+        synchronously (chunked) instead of going into the batch.
+        """
+        api_key = settings_store.get("GEMINI_API_KEY")
+        provider = get_batch_provider(api_key)
+        formatter = NoteFormatter(api_key, provider=provider)
+        transcript_dir = settings_store.get("TRANSCRIPT_DIR")
+
+        batch_items, requests = [], []
+        for item in items:
+            transcript = Path(
+                os.path.join(transcript_dir, item["transcript_filename"])
+            ).read_text()
+            prompt = formatter.single_shot_prompt(
+                transcript, item["meeting_info"], item["transcript_filename"]
+            )
+            if prompt is None:
+                notes = formatter.format_notes(
+                    transcript, item["meeting_info"], item["transcript_filename"]
+                )
+                self._finish_item(formatter, item, notes)
+                continue
+            batch_items.append(item)
+            requests.append([prompt])
+
+        if not requests:
+            return None
+        job_name = provider.submit_batch(
+            requests,
+            display_name=f"format-{len(requests)}-transcripts",
+            response_schema=NOTES_SCHEMA,
+        )
+        print(f"[Batch] Submitted {len(requests)} transcript(s) as {job_name}")
+        return self._new_record("format", job_name, batch_items)
+
+    # ---- Polling ----
+
+    def _start_polling(self, record: dict):
+        with self._lock:
+            if record["id"] in self._polling:
+                return
+            self._polling.add(record["id"])
+        threading.Thread(target=self._poll, args=(record,), daemon=True).start()
+
+    def _poll(self, record: dict):
+        provider = get_batch_provider(settings_store.get("GEMINI_API_KEY"))
+        try:
+            while True:
+                try:
+                    state = provider.batch_state(record["job_name"])
+                except Exception as e:
+                    print(f"[Batch] Polling {record['job_name']} failed: {e}")
+                    state = record["state"]
+                if state != record["state"]:
+                    record["state"] = state
+                    self._save(record)
+                if state in BATCH_TERMINAL_STATES:
+                    break
+                time.sleep(BATCH_POLL_INTERVAL)
+
+            results = provider.batch_results(record["job_name"], len(record["items"]))
+            if record["kind"] == "transcribe":
+                self._handle_transcripts(record, results, provider)
+            else:
+                self._handle_notes(record, results, provider)
+            record["finished_at"] = datetime.now().isoformat()
+            self._save(record)
+        finally:
+            with self._lock:
+                self._polling.discard(record["id"])
+
+    def _handle_transcripts(self, record: dict, results: list, provider):
+        transcriber = TranscriptionService("", provider=provider)
+        transcript_dir = settings_store.get("TRANSCRIPT_DIR")
+        done = []
+        for item, (text, error) in zip(record["items"], results):
+            if "transcript_filename" in item:
+                done.append(item)  # handled before a restart
+                continue
+            if error:
+                item["error"] = error
+                continue
+            title = item["meeting_info"].get("title", "untitled")
+            segments, truncated = parse_segments(text)
+            if truncated or not segments:
+                # The saved recording stays for a retry
+                item["error"] = (
+                    "Transcription was cut off (model output limit)"
+                    if truncated
+                    else "Transcription came back empty"
+                )
+                continue
+            item["transcript_filename"] = transcriber.save_transcript(
+                segments_to_text(segments),
+                title,
+                transcript_dir,
+                item["timestamp"],
+                segments=segments,
+            )
+            self._save(record)
+            done.append(item)
+        print(
+            f"[Batch] {record['job_name']}: {len(done)}/{len(record['items'])} "
+            "transcribed"
+        )
+        # Formatted synchronously before a restart
+        done = [item for item in done if "notes_filename" not in item]
+        if done and "follow_up" not in record:
+            follow_up = self.submit_reformat(done)
+            record["follow_up"] = follow_up["id"] if follow_up else None
+            self._save(record)
+
+    def _handle_notes(self, record: dict, results: list, provider):
+        formatter = NoteFormatter("", provider=provider)
+        transcript_dir = settings_store.get("TRANSCRIPT_DIR")
+        for item, (text, error) in zip(record["items"], results):
+            if "notes_filename" in item:
+                continue  # handled before a restart
+            if error:
+                item["error"] = error
+                continue
+            try:
+                transcript = Path(
+                    os.path.join(transcript_dir, item["transcript_filename"])
+                ).read_text()
+                notes = formatter.notes_from_response(
+                    text, transcript, item["meeting_info"], item["transcript_filename"]
+                )
+            except Exception as e:
+                item["error"] = f"Rendering notes failed: {e}"
+                continue
+            self._finish_item(formatter, item, notes)
+            self._save(record)
+
+    def _finish_item(self, formatter: NoteFormatter, item: dict, notes: str):
+        title = item["meeting_info"].get("title", "untitled")
+        notes_filename = formatter.save_notes(
+            notes, title, settings_store.get("NOTES_DIR"), item["timestamp"]
+        )
+        item["notes_filename"] = notes_filename
+        try:
+            self.on_notes_saved(item, notes_filename)
+        except Exception as e:
+            print(f"[Batch] Post-processing {notes_filename} failed: {e}")
@@ -48,6 +48,33 @@ class CalendarService:
         events = events_result.get("items", [])
         return [self._parse_event(e) for e in events]
 
+    def get_meetings_between(self, start: datetime, end: datetime) -> list[dict]:
+        """Get all timed (not all-day) meetings overlapping [start, end]."""
+        meetings = []
+        page_token = None
+        while True:
+            events_result = (
+                self.service.events()
+                .list(
+                    calendarId="primary",
+                    timeMin=start.isoformat(),
+                    timeMax=end.isoformat(),
+                    singleEvents=True,
+                    orderBy="startTime",
+                    maxResults=2500,
+                    pageToken=page_token,
+                )
+                .execute()
+            )
+            meetings.extend(
+                self._parse_event(e)
+                for e in events_result.get("items", [])
+                if "dateTime" in e.get("start", {})
+            )
+            page_token = events_result.get("nextPageToken")
+            if not page_token:
+                return meetings
+
     def get_current_meeting(self) -> dict | None:
         """Get the best auto-detected meeting (must have 2+ attendees)."""
         meetings = self.get_upcoming_meetings()
@@ -4,9 +4,16 @@ from googleapiclient.http import MediaFileUpload
 
 
 class DriveService:
-    def __init__(self, creds: Credentials):
+    def __init__(self, creds: Credentials, folder_id: str | None = None):
         self.service = build("drive", "v3", credentials=creds)
-        self._folder_id: str | None = None
+        # Pass a known folder ID to skip the lookup (e.g. one per thread)
+        self._folder_id: str | None = folder_id
+
+    def ensure_folder(self, folder_name: str) -> str:
+        """Return the target folder's ID, creating the folder if needed."""
+        if not self._folder_id:
+            self._folder_id = self._get_or_create_folder(folder_name)
+        return self._folder_id
 
     def _get_or_create_folder(self, folder_name: str) -> str:
         """Find or create the target folder in Google Drive."""
@@ -28,20 +35,17 @@ class DriveService:
         folder = self.service.files().create(body=file_metadata, fields="id").execute()
         return folder["id"]
 
-    def upload_notes_as_doc(
+    def create_doc(
         self,
         notes_filepath: str,
         doc_title: str,
         folder_name: str = "notes",
-    ) -> str:
-        """Upload a markdown file as a Google Doc. Returns the Google Doc URL."""
-        if not self._folder_id:
-            self._folder_id = self._get_or_create_folder(folder_name)
-
+    ) -> dict:
+        """Upload a markdown file as a new Google Doc. Returns {id, webViewLink}."""
         file_metadata = {
             "name": doc_title,
             "mimeType": "application/vnd.google-apps.document",
-            "parents": [self._folder_id],
+            "parents": [self.ensure_folder(folder_name)],
         }
 
         media = MediaFileUpload(
@@ -50,7 +54,7 @@ class DriveService:
             resumable=True,
         )
 
-        file = (
+        return (
             self.service.files()
             .create(
                 body=file_metadata,
@@ -60,4 +64,33 @@ class DriveService:
             .execute()
         )
 
+    def update_doc(self, file_id: str, notes_filepath: str, doc_title: str) -> dict:
+        """Replace an existing Google Doc's content in place.
+
+        Returns {id, webViewLink}.
+        """
+        media = MediaFileUpload(
+            notes_filepath,
+            mimetype="text/markdown",
+            resumable=True,
+        )
+        return (
+            self.service.files()
+            .update(
+                fileId=file_id,
+                body={"name": doc_title},
+                media_body=media,
+                fields="id, webViewLink",
+            )
+            .execute()
+        )
+
+    def upload_notes_as_doc(
+        self,
+        notes_filepath: str,
+        doc_title: str,
+        folder_name: str = "notes",
+    ) -> str:
+        """Upload a markdown file as a Google Doc. Returns the Google Doc URL."""
+        file = self.create_doc(notes_filepath, doc_title, folder_name)
         return file.get("webViewLink", "")
@@ -0,0 +1,238 @@
+"""Idempotent sync of notes files to Google Docs.
+
+A local state file maps each notes file to the Google Doc it was uploaded
+as, together with the SHA-256 of the content that was sent.  Syncing a
+file then either does nothing (content unchanged), updates the existing
+Doc in place (content changed), or creates a Doc (never uploaded, or the
+Doc was deleted in Drive) — so reprocessing or retrying a meeting no
+longer produces duplicate Docs.
+
+File size and mtime are stored too, so a folder sync only hashes files
+that look like they changed.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.errors import HttpError
+
+from services.drive_service import DriveService
+
+DRIVE_SYNC_STATE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "drive-sync.json"
+)
+# Drive API clients are not thread-safe; each worker builds its own
+DRIVE_SYNC_MAX_WORKERS = 4
+
+# Serializes state-file writes between DriveSync instances in this process
+_state_file_lock = threading.Lock()
+
+# Resolved folder IDs, shared by DriveSync instances so each upload doesn't
+# look the folder up again; re-checked after FOLDER_ID_TTL_SECONDS in case
+# the folder was deleted or renamed
+FOLDER_ID_TTL_SECONDS = 3600
+_folder_ids: dict[tuple[str, str | None], tuple[str, float]] = {}
+
+UNCHANGED = "unchanged"
+UPDATED = "updated"
+CREATED = "created"
+FAILED = "failed"
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def doc_title_for(notes_filename: str) -> str:
+    """Doc title for a `{timestamp}_{title}_notes.md` file: "title - timestamp"."""
+    stem = notes_filename.rsplit("_notes", 1)[0]
+    timestamp_end = 19  # len("YYYY-MM-DD_HH-MM-SS")
+    if len(stem) > timestamp_end:
+        return f"{stem[timestamp_end + 1:].replace('_', ' ')} - {stem[:timestamp_end]}"
+    return stem
+
+
+class DriveSync:
+    def __init__(
+        self,
+        creds: Credentials,
+        folder_name: str = "notes",
+        state_path: str = DRIVE_SYNC_STATE_PATH,
+    ):
+        self.creds = creds
+        self.folder_name = folder_name
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._folder_lock = threading.Lock()
+        self._state = self._load_state()
+        self._dirty: set[str] = set()
+        self._folder_key = (folder_name, getattr(creds, "refresh_token", None))
+        cached = _folder_ids.get(self._folder_key)
+        fresh = cached and time.monotonic() - cached[1] < FOLDER_ID_TTL_SECONDS
+        self._folder_id: str | None = cached[0] if fresh else None
+        self._local = threading.local()
+
+    # ---- State ----
+
+    def _load_state(self) -> dict[str, dict]:
+        try:
+            return json.loads(Path(self.state_path).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self):
+        """Merge our changed entries into the state file atomically.
+
+        Re-reading first keeps entries another DriveSync (e.g. a folder
+        sync running alongside a recording upload) wrote in the meantime.
+        """
+        with _state_file_lock:
+            state = self._load_state()
+            with self._lock:
+                for key in self._dirty:
+                    state[key] = self._state[key]
+                self._dirty.clear()
+                self._state = state
+                content = json.dumps(state, indent=2)
+            state_dir = os.path.dirname(self.state_path) or "."
+            fd, tmp_path = tempfile.mkstemp(prefix=".drive-sync.", dir=state_dir)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(content)
+                os.replace(tmp_path, self.state_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    # ---- Drive clients ----
+
+    def _service(self) -> DriveService:
+        """This thread's DriveService, sharing one resolved folder ID."""
+        svc = getattr(self._local, "service", None)
+        if svc is None:
+            # The first worker looks the folder up; the rest reuse its ID
+            with self._folder_lock:
+                svc = DriveService(self.creds, folder_id=self._folder_id)
+                if self._folder_id is None:
+                    self._folder_id = svc.ensure_folder(self.folder_name)
+                    _folder_ids[self._folder_key] = (self._folder_id, time.monotonic())
+            self._local.service = svc
+        return svc
+
+    def warm_up(self):
+        """Build a Drive client and resolve the folder ahead of the first upload."""
+        self._service()
+
+    # ---- Sync ----
+
+    def sync_file(self, notes_filepath: str, doc_title: str, save: bool = True) -> dict:
+        """Make the Doc for `notes_filepath` match its current content.
+
+        Returns {"status", "file_id", "url"}; status is one of UNCHANGED,
+        UPDATED or CREATED.
+        """
+        key = os.path.abspath(notes_filepath)
+        st = os.stat(key)
+        with self._lock:
+            entry = dict(self._state.get(key) or {})
+
+        if entry.get("folder") != self.folder_name:
+            entry = {}
+        # Cheap check first; only hash when size/mtime moved
+        if entry and (entry.get("size"), entry.get("mtime_ns")) == (
+            st.st_size,
+            st.st_mtime_ns,
+        ):
+            return {
+                "status": UNCHANGED,
+                "file_id": entry["file_id"],
+                "url": entry.get("url", ""),
+            }
+        sha256 = _sha256(key)
+        if entry and entry.get("sha256") == sha256:
+            status = UNCHANGED
+            result = {"id": entry["file_id"], "webViewLink": entry.get("url", "")}
+        else:
+            svc = self._service()
+            result = None
+            if entry:
+                try:
+                    result = svc.update_doc(entry["file_id"], key, doc_title)
+                    status = UPDATED
+                except HttpError as e:
+                    # Deleted or no longer accessible: upload a fresh Doc
+                    if e.resp.status not in (403, 404):
+                        raise
+            if result is None:
+                try:
+                    result = svc.create_doc(key, doc_title, self.folder_name)
+                except HttpError as e:
+                    if e.resp.status == 404:
+                        # The cached folder may be gone: look it up next time
+                        _folder_ids.pop(self._folder_key, None)
+                    raise
+                status = CREATED
+
+        with self._lock:
+            self._state[key] = {
+                "file_id": result["id"],
+                "url": result.get("webViewLink", ""),
+                "sha256": sha256,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "folder": self.folder_name,
+            }
+            self._dirty.add(key)
+        if save:
+            self._save_state()
+        print(f"[DriveSync] {status}: {os.path.basename(key)}")
+        return {
+            "status": status,
+            "file_id": result["id"],
+            "url": result.get("webViewLink", ""),
+        }
+
+    def sync_folder(
+        self,
+        notes_dir: str,
+        pattern: str = "*_notes.md",
+        max_workers: int = DRIVE_SYNC_MAX_WORKERS,
+    ) -> dict:
+        """Sync every notes file in `notes_dir`, uploading only what changed.
+
+        State is saved after each created or updated Doc, so an interrupted
+        sync doesn't forget them and create duplicates on the next run.
+        """
+        paths = sorted(str(p) for p in Path(notes_dir).glob(pattern))
+        counts = {UNCHANGED: 0, UPDATED: 0, CREATED: 0, FAILED: 0}
+        errors: dict[str, str] = {}
+
+        def sync_one(path: str) -> str:
+            try:
+                title = doc_title_for(os.path.basename(path))
+                status = self.sync_file(path, title, save=False)["status"]
+            except Exception as e:
+                errors[os.path.basename(path)] = str(e)
+                return FAILED
+            if status != UNCHANGED:
+                self._save_state()
+            return status
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for status in pool.map(sync_one, paths):
+                counts[status] += 1
+        self._save_state()  # refreshed size/mtime of unchanged files
+        print(f"[DriveSync] Folder sync of {len(paths)} files: {counts}")
+        return {**counts, "errors": errors}
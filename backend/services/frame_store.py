@@ -0,0 +1,113 @@
+"""Append-only PCM storage for captured audio.
+
+Captured audio used to be kept as a list of small `bytes` chunks, one per
+read.  FrameStore instead packs it into large preallocated blocks and lets
+a reader `readinto()` the free tail of the current block directly, so a
+pipe read needs neither a new bytes object nor a second copy.
+
+A store is also a Sequence of memoryviews (one per block), so it can be
+passed anywhere a list of captured chunks is accepted (see PcmSource).
+"""
+
+import time
+from collections.abc import Callable
+
+FRAME_BLOCK_BYTES = 1 << 20  # 1 MiB (~33 s of 16 kHz mono)
+READ_BYTES = 1 << 16  # largest single pipe read
+# Between reads the pipe buffers the audio (≥16 KB, ~0.5 s at 16 kHz), so
+# pausing briefly turns ~100 tiny reads per second into a few larger ones.
+READ_INTERVAL = 0.05  # seconds
+
+
+class FrameStore:
+    def __init__(self, block_bytes: int = FRAME_BLOCK_BYTES):
+        self.block_bytes = block_bytes
+        self._blocks: list[bytearray] = []
+        self.nbytes = 0
+
+    def reserve(self, max_bytes: int) -> memoryview:
+        """Writable view of up to `max_bytes` free bytes at the end.
+
+        Fill it, then call `commit()` with the number of bytes written.
+        The view never spans blocks, so it may be shorter than asked for.
+        """
+        offset = self.nbytes % self.block_bytes
+        if self.nbytes == len(self._blocks) * self.block_bytes:
+            self._blocks.append(bytearray(self.block_bytes))
+            offset = 0
+        end = min(self.block_bytes, offset + max_bytes)
+        return memoryview(self._blocks[-1])[offset:end]
+
+    def commit(self, n: int):
+        self.nbytes += n
+
+    def append(self, data):
+        """Copy a bytes-like chunk onto the end."""
+        src = memoryview(data).cast("B")
+        while len(src):
+            view = self.reserve(len(src))
+            n = len(view)
+            view[:] = src[:n]
+            self.commit(n)
+            src = src[n:]
+
+    def __len__(self) -> int:
+        return -(-self.nbytes // self.block_bytes)
+
+    def __getitem__(self, i: int) -> memoryview:
+        if i < 0:
+            i += len(self)
+        start = i * self.block_bytes
+        if not 0 <= start < self.nbytes:
+            raise IndexError("FrameStore index out of range")
+        end = min(start + self.block_bytes, self.nbytes)
+        return memoryview(self._blocks[i])[: end - start]
+
+    def write_range(self, f, start: int, end: int):
+        """Write bytes [start, end) to the binary file `f`."""
+        while start < end:
+            block, offset = divmod(start, self.block_bytes)
+            n = min(self.block_bytes - offset, end - start)
+            f.write(memoryview(self._blocks[block])[offset : offset + n])
+            start += n
+
+
+def read_stream_into(
+    stream,
+    store: FrameStore,
+    keep_going: Callable[[], bool],
+    on_data: Callable[[memoryview], None] | None = None,
+    sample_width: int = 2,
+    max_read: int = READ_BYTES,
+    read_interval: float = READ_INTERVAL,
+) -> int:
+    """Read a raw (unbuffered) PCM stream straight into `store` until EOF.
+
+    Each `readinto()` returns whatever the pipe has ready, up to `max_read`
+    bytes.  After a read that drained the pipe, the reader sleeps for
+    `read_interval` so the next read picks up a larger batch instead of
+    waking for every small write.  A read that ends mid-sample is topped up
+    before committing, so `on_data` (e.g. a level meter) only ever sees
+    whole samples.  Returns the number of bytes read.
+    """
+    total = 0
+    while keep_going():
+        # Commits are whole samples and blocks and reads are multiples of
+        # the sample width, so the view has room to complete a split sample.
+        view = store.reserve(max_read - max_read % sample_width)
+        n = stream.readinto(view)
+        if not n:
+            break
+        while n % sample_width:
+            extra = stream.readinto(view[n : n + sample_width - n % sample_width])
+            if not extra:
+                break
+            n += extra
+        n -= n % sample_width
+        store.commit(n)
+        total += n
+        if on_data:
+            on_data(view[:n])
+        if read_interval and n < len(view):
+            time.sleep(read_interval)
+    return total
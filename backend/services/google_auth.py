@@ -1,8 +1,13 @@
 import os
+import threading
+from datetime import datetime, timedelta, timezone
+
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 
+from services.settings_store import settings_store
+
 SCOPES = [
     "https://www.googleapis.com/auth/calendar.readonly",
     "https://www.googleapis.com/auth/drive.file",
@@ -26,3 +31,57 @@ def get_credentials(credentials_path: str, token_path: str) -> Credentials:
             token_file.write(creds.to_json())
 
     return creds
+
+
+# Credentials are cached per (credentials_path, token_path) and refreshed in
+# place when they expire, instead of re-reading token.json on every call.
+_credentials_cache: dict[tuple[str, str], Credentials] = {}
+_credentials_lock = threading.Lock()
+
+
+def get_cached_credentials(credentials_path: str, token_path: str) -> Credentials:
+    """Like get_credentials(), but reuses credentials between calls."""
+    key = (credentials_path, token_path)
+    with _credentials_lock:
+        creds = _credentials_cache.get(key)
+        if creds and creds.valid:
+            return creds
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+            with open(token_path, "w") as token_file:
+                token_file.write(creds.to_json())
+            return creds
+        creds = get_credentials(credentials_path, token_path)
+        _credentials_cache[key] = creds
+        return creds
+
+
+def refresh_if_expiring(
+    credentials_path: str, token_path: str, within_seconds: float
+) -> Credentials:
+    """Cached credentials, refreshed now if they expire within `within_seconds`.
+
+    Lets a refresh happen ahead of time instead of in the middle of a job.
+    """
+    creds = get_cached_credentials(credentials_path, token_path)
+    with _credentials_lock:
+        # Credentials.expiry is a naive UTC datetime
+        deadline = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(
+            seconds=within_seconds
+        )
+        if creds.expiry and creds.expiry < deadline and creds.refresh_token:
+            creds.refresh(Request())
+            with open(token_path, "w") as token_file:
+                token_file.write(creds.to_json())
+    return creds
+
+
+def invalidate_credentials(_changed_keys=None):
+    """Forget cached credentials (e.g. after credentials.json is replaced)."""
+    with _credentials_lock:
+        _credentials_cache.clear()
+
+
+settings_store.subscribe(
+    invalidate_credentials, ["GOOGLE_CREDENTIALS_PATH", "GOOGLE_TOKEN_PATH"]
+)
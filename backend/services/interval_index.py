@@ -0,0 +1,83 @@
+"""Static interval index (centered interval tree) over time ranges.
+
+Built once from (start, end, item) triples with numeric bounds (e.g.
+timestamps) and then queried for the items overlapping a point or range
+in O(log n + k).  Intervals are half-open: [start, end).  Rebuild it when
+the intervals change; it is never modified in place.
+"""
+
+
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, intervals: list[tuple]):
+        endpoints = sorted(x for start, end, _ in intervals for x in (start, end))
+        self.center = endpoints[len(endpoints) // 2]
+        left, right, here = [], [], []
+        for interval in intervals:
+            start, end, _ = interval
+            if end <= self.center:
+                left.append(interval)
+            elif start > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        if not here and (not left or not right):
+            # Degenerate split (many equal endpoints): keep them all here
+            here, left, right = intervals, [], []
+        # Intervals containing the center, by start (ascending) and end (descending)
+        self.by_start = sorted(here, key=lambda i: i[0])
+        self.by_end = sorted(here, key=lambda i: i[1], reverse=True)
+        self.left = _Node(left) if left else None
+        self.right = _Node(right) if right else None
+
+
+class IntervalIndex:
+    def __init__(self, intervals=()):
+        """`intervals`: (start, end, item); empty ranges count as 1 unit long."""
+        items = [(start, max(end, start + 1), item) for start, end, item in intervals]
+        self._root = _Node(items) if items else None
+        self._len = len(items)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def overlapping(self, start, end=None) -> list:
+        """Items whose interval overlaps [start, end), or contains `start`.
+
+        Results are in no particular order.
+        """
+        if end is None or end <= start:
+            end = start
+        exclusive = end != start  # a range excludes items starting at its end
+        found = []
+        stack = [self._root] if self._root else []
+        while stack:
+            node = stack.pop()
+            if end < node.center or (exclusive and end == node.center):
+                # Everything here ends after the query; check starts
+                for s, _, item in node.by_start:
+                    if s > end or (exclusive and s == end):
+                        break
+                    found.append(item)
+                if node.left:
+                    stack.append(node.left)
+            elif start >= node.center:
+                # Everything here starts before the query; check ends
+                for _, e, item in node.by_end:
+                    if e <= start:
+                        break
+                    found.append(item)
+                if node.right:
+                    stack.append(node.right)
+            else:
+                found.extend(item for _, _, item in node.by_start)
+                if node.left:
+                    stack.append(node.left)
+                if node.right:
+                    stack.append(node.right)
+        return found
+
+    def at(self, t) -> list:
+        """Items whose interval contains `t`."""
+        return self.overlapping(t)
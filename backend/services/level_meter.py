@@ -0,0 +1,79 @@
+"""Rolling RMS / peak meters updated from the capture threads.
+
+Each update works on a zero-copy int16 view of the chunk just captured and
+a preallocated float32 scratch buffer, so metering never touches the
+accumulated recording and allocates nothing per chunk.  State is a handful
+of floats (exponential moving average), i.e. O(1) memory.
+"""
+
+import math
+import time
+
+import numpy as np
+
+FULL_SCALE = 32768.0
+
+# Below this level a stream is reported as silent (muted mic, idle tap)
+SILENCE_DBFS = -60.0
+
+
+def to_dbfs(level: float) -> float:
+    """Convert a linear level (0..32768) to dBFS, floored at -120."""
+    if level <= 0:
+        return -120.0
+    return max(-120.0, 20 * math.log10(level / FULL_SCALE))
+
+
+class LevelMeter:
+    def __init__(
+        self,
+        rate: int,
+        window_seconds: float = 0.3,
+        peak_decay_seconds: float = 1.5,
+        max_chunk_samples: int = 8192,
+    ):
+        self.rate = rate
+        self.window_seconds = window_seconds
+        self.peak_decay_seconds = peak_decay_seconds
+        self._scratch = np.empty(max_chunk_samples, dtype=np.float32)
+        self._mean_square = 0.0
+        self._peak = 0.0
+        self._silent_seconds = 0.0
+        self._updated_at: float | None = None
+
+    def update(self, data) -> None:
+        """Fold one captured chunk (bytes-like, int16 PCM) into the meter."""
+        samples = np.frombuffer(data, dtype=np.int16, count=len(data) // 2)
+        n = len(samples)
+        if not n:
+            return
+        if n > len(self._scratch):
+            self._scratch = np.empty(n, dtype=np.float32)
+
+        scratch = self._scratch[:n]
+        np.copyto(scratch, samples, casting="unsafe")
+        chunk_ms = float(np.dot(scratch, scratch)) / n
+        chunk_peak = float(max(int(samples.max()), -int(samples.min())))
+
+        chunk_seconds = n / self.rate
+        alpha = 1.0 - math.exp(-chunk_seconds / self.window_seconds)
+        self._mean_square += alpha * (chunk_ms - self._mean_square)
+        decay = math.exp(-chunk_seconds / self.peak_decay_seconds)
+        self._peak = max(chunk_peak, self._peak * decay)
+
+        if to_dbfs(math.sqrt(chunk_ms)) < SILENCE_DBFS:
+            self._silent_seconds += chunk_seconds
+        else:
+            self._silent_seconds = 0.0
+        self._updated_at = time.time()
+
+    def snapshot(self) -> dict:
+        rms = math.sqrt(self._mean_square)
+        return {
+            "rms": round(rms, 1),
+            "peak": int(self._peak),
+            "rms_dbfs": round(to_dbfs(rms), 1),
+            "peak_dbfs": round(to_dbfs(self._peak), 1),
+            "silent_seconds": round(self._silent_seconds, 1),
+            "updated_at": self._updated_at,
+        }
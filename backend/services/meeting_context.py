@@ -0,0 +1,200 @@
+"""Cached meeting transcripts for templates and follow-up questions.
+
+Generating several outputs for a meeting (summary, action items, an email
+draft) or asking questions about it would otherwise re-send the whole
+transcript with every prompt.  A MeetingContext uploads the compacted
+transcript once as a Gemini context cache and answers each prompt against
+it, so only the short prompt is sent per call and cached tokens are billed
+at a discount.
+
+Contexts live in a MeetingContextStore keyed by transcript path and mtime.
+The store expires a context MEETING_CONTEXT_TTL seconds after its cache
+was created (the server drops the cache at the same time) and a daemon
+thread sweeps expired contexts, deleting their caches.  Transcripts too
+short for Gemini's cache minimum are sent inline instead.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from services.ai_provider import AIProvider
+from services.note_templates import get_template
+from services.settings_store import settings_store
+from services.transcript_compaction import compact_transcript, estimate_tokens
+
+DEFAULT_MEETING_CONTEXT_TTL = 3600  # seconds
+# Gemini rejects explicit caches smaller than this
+MIN_CACHE_TOKENS = 1024
+# Treat a cache as expired this long before its TTL so no call races the
+# server-side deletion
+CACHE_EXPIRY_MARGIN = 30
+SWEEP_INTERVAL = 60
+
+SYSTEM_INSTRUCTION = (
+    "You are a meeting assistant. The transcript of one meeting follows. "
+    "Answer every request using only what was said in this meeting; if the "
+    "transcript doesn't cover something, say so. Refer to people by name."
+)
+
+
+class MeetingContext:
+    """One meeting's transcript, cached server-side while in use."""
+
+    def __init__(self, provider: AIProvider, transcript: str, name: str, ttl: int):
+        self.provider = provider
+        self.name = name
+        self.ttl = ttl
+        self.transcript = compact_transcript(transcript)
+        self.tokens = estimate_tokens(self.transcript)
+        self.cacheable = self.tokens >= MIN_CACHE_TOKENS
+        self._lock = threading.Lock()
+        self.cache_name: str | None = None
+        # Inline (uncached) contexts expire from the store on the same TTL
+        self.expires_at = time.monotonic() + ttl
+        self.stats = {"calls": 0, "caches_created": 0, "cached_tokens_reused": 0}
+
+    def _cache(self, refresh: bool = False) -> str:
+        """The live cache name, creating the cache on first use or expiry."""
+        with self._lock:
+            now = time.monotonic()
+            if refresh or self.cache_name is None or now >= self.expires_at:
+                self.cache_name = self.provider.create_cache(
+                    self.transcript, SYSTEM_INSTRUCTION, self.ttl, self.name
+                )
+                self.expires_at = now + self.ttl - min(
+                    CACHE_EXPIRY_MARGIN, self.ttl / 10
+                )
+                self.stats["caches_created"] += 1
+                print(f"[MeetingContext] Cached {self.name} (~{self.tokens} tokens)")
+            return self.cache_name
+
+    def generate(self, prompt: str, response_schema: dict | None = None) -> str:
+        with self._lock:
+            self.stats["calls"] += 1
+        if not self.cacheable:
+            return self.provider.generate_text(
+                f"{SYSTEM_INSTRUCTION}\n\nTranscript:\n\n{self.transcript}\n\n{prompt}",
+                response_schema=response_schema,
+            )
+        cache_name = self._cache()
+        try:
+            response = self.provider.generate_text(
+                prompt, response_schema=response_schema, cached_context=cache_name
+            )
+        except Exception as e:
+            # Cache evicted server-side early (or deleted): recreate once
+            if getattr(e, "code", None) != 404 and "NOT_FOUND" not in str(e):
+                raise
+            response = self.provider.generate_text(
+                prompt,
+                response_schema=response_schema,
+                cached_context=self._cache(refresh=True),
+            )
+        with self._lock:
+            self.stats["cached_tokens_reused"] += self.tokens
+        return response
+
+    def ask(self, question: str) -> str:
+        return self.generate(f"Question about this meeting: {question}")
+
+    def run_template(self, template_name: str) -> str:
+        return self.generate(get_template(template_name)["prompt"])
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def close(self):
+        """Delete the server-side cache, if any."""
+        with self._lock:
+            cache_name, self.cache_name = self.cache_name, None
+        if cache_name:
+            try:
+                self.provider.delete_cache(cache_name)
+            except Exception as e:
+                # It expires on its own anyway
+                print(f"[MeetingContext] Deleting cache {cache_name} failed: {e}")
+
+
+class MeetingContextStore:
+    def __init__(self, ttl: int = DEFAULT_MEETING_CONTEXT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._contexts: dict[tuple[str, int, str], MeetingContext] = {}
+        self._sweeper: threading.Thread | None = None
+        self._closed = threading.Event()
+
+    def get(self, transcript_path: str, provider: AIProvider) -> MeetingContext:
+        """The context for a transcript file, reused while it's unexpired."""
+        path = os.path.abspath(transcript_path)
+        key = (path, os.stat(path).st_mtime_ns, provider.name)
+        self.evict_expired()
+        with self._lock:
+            context = self._contexts.get(key)
+            if context is None:
+                context = MeetingContext(
+                    provider, Path(path).read_text(), os.path.basename(path), self.ttl
+                )
+                self._contexts[key] = context
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep, daemon=True)
+                self._sweeper.start()
+        return context
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            expired = [k for k, c in self._contexts.items() if c.expired]
+            contexts = [self._contexts.pop(k) for k in expired]
+        for context in contexts:
+            context.close()
+        if contexts:
+            print(f"[MeetingContext] Evicted {len(contexts)} expired context(s)")
+        return len(contexts)
+
+    def close(self):
+        """Drop every context and delete its cache."""
+        self._closed.set()
+        with self._lock:
+            contexts = list(self._contexts.values())
+            self._contexts.clear()
+        for context in contexts:
+            context.close()
+
+    def _sweep(self):
+        while not self._closed.wait(SWEEP_INTERVAL):
+            self.evict_expired()
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+
+_store: MeetingContextStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_context_store() -> MeetingContextStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MeetingContextStore(
+                ttl=int(
+                    settings_store.get("MEETING_CONTEXT_TTL")
+                    or DEFAULT_MEETING_CONTEXT_TTL
+                )
+            )
+        return _store
+
+
+def reset_context_store(_changed_keys=None):
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        store.close()
+
+
+settings_store.subscribe(
+    reset_context_store, ["MEETING_CONTEXT_TTL", "AI_PROVIDER", "GEMINI_API_KEY"]
+)
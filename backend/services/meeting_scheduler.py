@@ -0,0 +1,363 @@
+"""Today's meetings in memory, and warm-up ahead of each one.
+
+A background thread reloads the calendar every CALENDAR_REFRESH_SECONDS
+into a timeline of the day's timed meetings, indexed by time (see
+services.interval_index) so "which meeting is on now" and "which meeting
+does this recording belong to" are answered from memory.  Each meeting
+is prepared once per refresh: attendees are deduplicated and given real
+names (from other events, else from their email address) and the notes
+prompt's meeting details are rendered (meeting["prompt_metadata"]).
+
+MEETING_PREFETCH_MINUTES before a meeting starts, the things a recording
+and its processing would otherwise set up on first use are warmed: the
+Google token (refreshed now if it would expire during the meeting), the
+AI provider's client, the Drive client and notes folder, the audio
+process pool and the heavy imports.
+
+Disabled with MEETING_PREFETCH=0.  Nothing runs until a Google token
+exists: the scheduler never starts the interactive OAuth flow.
+"""
+
+import importlib
+import os
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from services.interval_index import IntervalIndex
+from services.settings_store import settings_store
+
+DEFAULT_REFRESH_SECONDS = 300
+DEFAULT_PREFETCH_MINUTES = 5
+# Auto-detected meetings need at least this many attendees (not solo blocks)
+MIN_ATTENDEES = 2
+# A failed refresh is retried sooner than a regular one
+RETRY_SECONDS = 60
+WARM_UP_MODULES = [
+    "services.audio_capture",
+    "services.transcription",
+    "services.note_formatter",
+    "services.drive_sync",
+]
+
+
+def prefetch_enabled() -> bool:
+    return settings_store.get("MEETING_PREFETCH", "1") != "0"
+
+
+def _timestamp(iso: str) -> float:
+    return datetime.fromisoformat(iso).timestamp()
+
+
+def name_from_email(email: str) -> str:
+    """"jane.doe@example.com" → "Jane Doe"."""
+    local = email.split("@", 1)[0]
+    parts = [p for p in local.replace("_", ".").replace("-", ".").split(".") if p]
+    return " ".join(p.capitalize() for p in parts) or email
+
+
+def resolve_attendees(meetings: list[dict]):
+    """Deduplicate attendees and replace bare email addresses with names.
+
+    A name seen for the same address in any other event wins over one
+    derived from the address.
+    """
+    directory = {}
+    for meeting in meetings:
+        for a in meeting["attendees"]:
+            email = a.get("email", "").lower()
+            if email and a["name"] not in (a.get("email"), "Unknown"):
+                directory.setdefault(email, a["name"])
+
+    for meeting in meetings:
+        seen = set()
+        attendees = []
+        for a in meeting["attendees"]:
+            email = a.get("email", "").lower()
+            key = email or a["name"]
+            if key in seen:
+                continue
+            seen.add(key)
+            if email and a["name"] in (a.get("email"), "Unknown"):
+                a = {**a, "name": directory.get(email) or name_from_email(email)}
+            attendees.append(a)
+        meeting["attendees"] = attendees
+
+
+class MeetingScheduler:
+    def __init__(self, get_calendar_service: Callable):
+        """`get_calendar_service`: returns a CalendarService, or None."""
+        self._get_calendar_service = get_calendar_service
+        self._lock = threading.Lock()
+        self._meetings: list[dict] = []
+        self._index = IntervalIndex()
+        self._loaded_at: float | None = None
+        self._warmed: dict[str, dict] = {}  # meeting id → warm-up report
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.last_error: str | None = None
+
+    # ---- Settings ----
+
+    @staticmethod
+    def refresh_seconds() -> float:
+        return float(settings_store.get("CALENDAR_REFRESH_SECONDS") or DEFAULT_REFRESH_SECONDS)
+
+    @staticmethod
+    def prefetch_seconds() -> float:
+        return 60 * float(
+            settings_store.get("MEETING_PREFETCH_MINUTES") or DEFAULT_PREFETCH_MINUTES
+        )
+
+    @staticmethod
+    def _google_paths() -> tuple[str, str]:
+        return (
+            settings_store.resolve_path("GOOGLE_CREDENTIALS_PATH", "./credentials.json"),
+            settings_store.resolve_path("GOOGLE_TOKEN_PATH", "./token.json"),
+        )
+
+    def _google_connected(self) -> bool:
+        creds_path, token_path = self._google_paths()
+        return os.path.exists(creds_path) and os.path.exists(token_path)
+
+    # ---- Timeline ----
+
+    def refresh(self) -> bool:
+        """Reload today's meetings (and the next 24 hours). Returns success."""
+        if not self._google_connected():
+            self.last_error = "Google account not connected"
+            return False
+        try:
+            from services.note_formatter import prompt_metadata
+
+            service = self._get_calendar_service()
+            if service is None:
+                self.last_error = "Google credentials not configured"
+                return False
+            now = datetime.now().astimezone()
+            day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            meetings = service.get_meetings_between(day_start, now + timedelta(days=1))
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"[Scheduler] Calendar refresh failed: {e}")
+            return False
+
+        resolve_attendees(meetings)
+        intervals = []
+        for meeting in meetings:
+            meeting["prompt_metadata"] = prompt_metadata(meeting)
+            intervals.append((_timestamp(meeting["start"]), _timestamp(meeting["end"]), meeting))
+        index = IntervalIndex(intervals)
+        ids = {m["id"] for m in meetings}
+        with self._lock:
+            self._meetings = meetings
+            self._index = index
+            self._loaded_at = time.time()
+            self._warmed = {k: v for k, v in self._warmed.items() if k in ids}
+        self.last_error = None
+        return True
+
+    @property
+    def ready(self) -> bool:
+        """Whether the timeline is loaded and recent enough to answer from."""
+        with self._lock:
+            loaded_at = self._loaded_at
+        return loaded_at is not None and time.time() - loaded_at < 2 * self.refresh_seconds()
+
+    def timeline(self) -> list[dict]:
+        """Today's meetings by start time, with their warm-up reports."""
+        with self._lock:
+            return [
+                {**m, "warm_up": self._warmed.get(m["id"])} for m in self._meetings
+            ]
+
+    def in_progress(self, at: float | None = None) -> list[dict]:
+        """Meetings running at `at` (default: now), latest-started first."""
+        with self._lock:
+            found = self._index.at(time.time() if at is None else at)
+        return sorted(found, key=lambda m: _timestamp(m["start"]), reverse=True)
+
+    def current_meeting(self, at: float | None = None, upcoming: bool = True) -> dict | None:
+        """The meeting to record now.
+
+        An in-progress meeting (the most recently started, if they
+        overlap) is preferred over the next upcoming one (only considered
+        with upcoming=True).  Either needs MIN_ATTENDEES attendees.
+        """
+        at = time.time() if at is None else at
+        for meeting in self.in_progress(at):
+            if len(meeting["attendees"]) >= MIN_ATTENDEES:
+                return dict(meeting)
+        if not upcoming:
+            return None
+        with self._lock:
+            meetings = self._meetings
+        for meeting in meetings:
+            if _timestamp(meeting["start"]) > at and len(meeting["attendees"]) >= MIN_ATTENDEES:
+                return dict(meeting)
+        return None
+
+    def match(self, start: float, end: float) -> dict | None:
+        """The meeting that overlaps [start, end) the most, or None."""
+        with self._lock:
+            candidates = self._index.overlapping(start, end)
+
+        def overlap(meeting: dict) -> float:
+            return min(end, _timestamp(meeting["end"])) - max(
+                start, _timestamp(meeting["start"])
+            )
+
+        best = max(candidates, key=overlap, default=None)
+        return dict(best) if best else None
+
+    # ---- Warm-up ----
+
+    def warm_up(self, meeting: dict | None = None) -> dict:
+        """Set up clients and credentials now; returns {step: {ms, error}}.
+
+        With a meeting, the Google token is refreshed if it would expire
+        before the meeting ends (plus processing time).
+        """
+        report = {}
+
+        def step(name: str, fn: Callable):
+            started = time.perf_counter()
+            error = None
+            try:
+                fn()
+            except Exception as e:
+                error = str(e)
+            report[name] = {
+                "ms": round((time.perf_counter() - started) * 1000, 1),
+                "error": error,
+            }
+
+        def credentials():
+            from services.google_auth import refresh_if_expiring
+
+            valid_for = self.prefetch_seconds() + 30 * 60
+            if meeting:
+                valid_for += max(0.0, _timestamp(meeting["end"]) - time.time())
+            refresh_if_expiring(*self._google_paths(), valid_for)
+
+        def ai_client():
+            from services.ai_provider import get_provider
+
+            api_key = settings_store.get("GEMINI_API_KEY")
+            if api_key:
+                get_provider(api_key)
+
+        def drive():
+            from services.drive_sync import DriveSync
+            from services.google_auth import get_cached_credentials
+
+            creds = get_cached_credentials(*self._google_paths())
+            DriveSync(creds, settings_store.get("DRIVE_FOLDER_NAME", "notes")).warm_up()
+
+        def audio_pool():
+            from services.audio_executor import get_audio_executor
+
+            get_audio_executor().warm_up()
+
+        def imports():
+            failed = []
+            for name in WARM_UP_MODULES:
+                try:
+                    importlib.import_module(name)
+                except Exception as e:
+                    failed.append(f"{name}: {e}")
+            if failed:
+                raise RuntimeError("; ".join(failed))
+
+        step("imports", imports)
+        if self._google_connected():
+            step("credentials", credentials)
+            step("drive", drive)
+        step("ai_client", ai_client)
+        step("audio_pool", audio_pool)
+
+        total_ms = sum(s["ms"] for s in report.values())
+        failed = [name for name, s in report.items() if s["error"]]
+        title = meeting["title"] if meeting else "next meeting"
+        print(
+            f"[Scheduler] Warmed up for '{title}' in {total_ms / 1000:.2f}s"
+            + (f" (failed: {', '.join(failed)})" if failed else "")
+        )
+        return report
+
+    # ---- Background thread ----
+
+    def _due_for_warm_up(self, now: float) -> list[dict]:
+        lead = self.prefetch_seconds()
+        with self._lock:
+            candidates = self._index.overlapping(now, now + lead)
+            return [m for m in candidates if m["id"] not in self._warmed]
+
+    def _next_warm_up(self, now: float) -> float | None:
+        """When the next not-yet-warmed meeting enters the prefetch window."""
+        lead = self.prefetch_seconds()
+        with self._lock:
+            starts = [
+                _timestamp(m["start"]) - lead
+                for m in self._meetings
+                if m["id"] not in self._warmed
+            ]
+        future = [t for t in starts if t > now]
+        return min(future) if future else None
+
+    def _run(self):
+        next_refresh = 0.0
+        while not self._stop.is_set():
+            now = time.time()
+            if now >= next_refresh:
+                ok = self.refresh()
+                next_refresh = now + (self.refresh_seconds() if ok else RETRY_SECONDS)
+
+            due = self._due_for_warm_up(time.time())
+            if due:
+                # Overlapping meetings share one warm-up
+                report = self.warm_up(max(due, key=lambda m: m["end"]))
+                with self._lock:
+                    for meeting in due:
+                        self._warmed[meeting["id"]] = report
+
+            wake = next_refresh
+            next_warm = self._next_warm_up(time.time())
+            if next_warm is not None:
+                wake = min(wake, next_warm)
+            self._stop.wait(max(1.0, wake - time.time()))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+_scheduler: MeetingScheduler | None = None
+
+
+def start_meeting_scheduler(get_calendar_service: Callable) -> MeetingScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = MeetingScheduler(get_calendar_service)
+        _scheduler.start()
+    return _scheduler
+
+
+def get_meeting_scheduler() -> MeetingScheduler | None:
+    """The running scheduler, or None (disabled or not started)."""
+    return _scheduler
+
+
+def shutdown_meeting_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
@@ -1,19 +1,178 @@
+import math
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from google import genai
+from services import tracing
+from services.ai_provider import AIProvider, get_provider
+from services.structured_notes import (
+    NOTES_SCHEMA,
+    describe_sections,
+    parse_notes,
+    render_notes,
+    section_schema,
+)
+from services.transcript_compaction import (
+    CHARS_PER_TOKEN,
+    compact_transcript,
+    estimate_tokens,
+)
 
-# Match the timeout used in transcription — a long transcript
-# from a 1-hour meeting can take a while to summarize.
-GEMINI_TIMEOUT = 600_000  # 10 minutes in milliseconds (SDK uses ms)
+# Transcripts whose (compacted) size exceeds this many tokens are summarized
+# chunk-by-chunk (map) and the chunk summaries are combined into the final
+# notes (reduce).  Override with NOTES_TOKEN_BUDGET in .env.
+DEFAULT_TOKEN_BUDGET = 30_000
+CHUNK_TARGET_TOKENS = 10_000
+CHUNK_TARGET_CHARS = CHUNK_TARGET_TOKENS * CHARS_PER_TOKEN
+# Chunks are submitted together; the rate governor decides how many of
+# them are actually in flight and retries each failed chunk on its own.
+CHUNK_MAX_WORKERS = 4
+# Attempts per note section that came back missing or malformed
+NOTES_SECTION_RETRIES = 2
+
+# A line that starts a new speaker turn or carries a timestamp, e.g.
+# "Speaker 1: ...", "**Alice**: ...", "[00:12:30] ...", "(12:30) ..."
+_BOUNDARY_RE = re.compile(
+    r"^\s*(?:"
+    r"[\[(]?\d{1,2}:\d{2}(?::\d{2})?[\])]?"
+    r"|\**[A-Z][\w .'-]{0,40}\**\s*:"
+    r")"
+)
+
+
+def prompt_metadata(meeting_info: dict) -> str:
+    """The meeting details block of the notes prompt.
+
+    The meeting scheduler renders it ahead of time and passes it along as
+    meeting_info["prompt_metadata"].
+    """
+    attendees_str = ", ".join([a["name"] for a in meeting_info.get("attendees", [])])
+    if not attendees_str:
+        attendees_str = "Unknown"
+    return f"""**Meeting Title**: {meeting_info.get("title", "Untitled Meeting")}
+**Date**: {meeting_info.get("start", "Unknown")}
+**Attendees**: {attendees_str}
+**Meeting Description**: {meeting_info.get("description", "N/A")}"""
+
+
+def split_transcript(transcript: str, target_chars: int = CHUNK_TARGET_CHARS) -> list[str]:
+    """Split a transcript into chunks of roughly `target_chars`.
+
+    Chunks are only cut before a speaker or timestamp line so a speaker
+    turn is never split in half.  A single turn longer than twice the
+    target is cut on a plain line boundary as a fallback.
+    """
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+
+    for line in transcript.splitlines(keepends=True):
+        at_boundary = bool(_BOUNDARY_RE.match(line))
+        if current and (
+            (size >= target_chars and at_boundary) or size >= target_chars * 2
+        ):
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+
+    if current:
+        chunks.append("".join(current))
+    return chunks
 
 
 class NoteFormatter:
-    def __init__(self, api_key: str):
-        self.client = genai.Client(
-            api_key=api_key,
-            http_options={"timeout": GEMINI_TIMEOUT},
+    def __init__(self, api_key: str, provider: AIProvider | None = None):
+        self.provider = provider or get_provider(api_key)
+        self.token_budget = int(
+            os.getenv("NOTES_TOKEN_BUDGET", "") or DEFAULT_TOKEN_BUDGET
         )
-        self.model = "gemini-2.5-flash"
+        # Token/latency figures for the most recent format_notes() call
+        self.last_report: dict = {}
+        self._output_chars = 0
+        self._section_retries = 0
+
+    def _generate(self, prompt: str, response_schema: dict | None = None) -> str:
+        return self.provider.generate_text(prompt, response_schema=response_schema)
+
+    def _notes_prompt(
+        self,
+        meeting_info: dict,
+        source_label: str,
+        source_text: str,
+        sections: list[str] | None = None,
+    ) -> str:
+        if sections:
+            task = f"Fill in only the {', '.join(sections)} field(s) of the notes"
+        else:
+            task = "Write structured meeting notes"
+
+        return f"""You are a meeting note assistant. {task} for the following \
+meeting {source_label}, as JSON with these fields:
+
+{describe_sections(sections)}
+
+Be concise: short sentences, no Markdown, no headings. Use attendee names \
+where a point, decision or action item can be attributed.
+
+{meeting_info.get("prompt_metadata") or prompt_metadata(meeting_info)}
+
+Here is the {source_label}:
+
+{source_text}
+"""
+
+    def _retry_sections(
+        self,
+        notes: dict,
+        invalid: list[str],
+        meeting_info: dict,
+        source_label: str,
+        source_text: str,
+    ) -> int:
+        """Re-request each invalid section on its own; return the retry count."""
+        retries = 0
+
+        def repair(name: str) -> tuple[str, object, int]:
+            for attempt in range(1, NOTES_SECTION_RETRIES + 1):
+                prompt = self._notes_prompt(
+                    meeting_info, source_label, source_text, sections=[name]
+                )
+                section, bad = parse_notes(
+                    self._generate(prompt, response_schema=section_schema(name)),
+                    [name],
+                )
+                if not bad:
+                    return name, section[name], attempt
+            return name, None, NOTES_SECTION_RETRIES
+
+        with ThreadPoolExecutor(max_workers=CHUNK_MAX_WORKERS) as pool:
+            for name, value, attempts in pool.map(
+                tracing.in_current_context(repair), invalid
+            ):
+                retries += attempts
+                if value is None:
+                    print(f"[NoteFormatter] Section {name!r} still invalid, omitting")
+                else:
+                    notes[name] = value
+        return retries
+
+    def _structured_notes(
+        self, meeting_info: dict, source_label: str, source_text: str
+    ) -> dict:
+        """Generate the notes JSON, repairing only the sections that fail."""
+        prompt = self._notes_prompt(meeting_info, source_label, source_text)
+        response = self._generate(prompt, response_schema=NOTES_SCHEMA)
+        self._output_chars = len(response or "")
+        notes, invalid = parse_notes(response)
+        self._section_retries = 0
+        if invalid:
+            print(f"[NoteFormatter] Invalid note sections: {', '.join(invalid)}")
+            self._section_retries = self._retry_sections(
+                notes, invalid, meeting_info, source_label, source_text
+            )
+        return notes
 
     def format_notes(
         self,
@@ -21,57 +180,124 @@ class NoteFormatter:
         meeting_info: dict,
         transcript_filename: str,
     ) -> str:
-        """Use Gemini to generate structured meeting notes from a transcript."""
-        attendees_str = ", ".join(
-            [a["name"] for a in meeting_info.get("attendees", [])]
-        )
-        if not attendees_str:
-            attendees_str = "Unknown"
+        """Use Gemini to generate structured meeting notes from a transcript.
 
-        prompt = f"""You are a meeting note assistant. Given the following meeting \
-transcript and metadata, create structured meeting notes in Markdown format.
+        The transcript is compacted first; if it still exceeds the token
+        budget it is formatted hierarchically instead of in one request.
+        The model returns the notes as JSON, rendered to Markdown here.
+        """
+        started = time.monotonic()
+        original_tokens = estimate_tokens(transcript)
+        compacted = compact_transcript(transcript)
+        compacted_tokens = estimate_tokens(compacted)
 
-**Meeting Title**: {meeting_info.get("title", "Untitled Meeting")}
-**Date**: {meeting_info.get("start", "Unknown")}
-**Attendees**: {attendees_str}
-**Meeting Description**: {meeting_info.get("description", "N/A")}
+        if compacted_tokens > self.token_budget:
+            mode = "chunked"
+            notes = self._format_notes_hierarchical(compacted, meeting_info)
+        else:
+            mode = "single"
+            notes = self._structured_notes(meeting_info, "transcript", compacted)
 
-Format the notes with these exact sections:
+        self.last_report = {
+            "mode": mode,
+            "original_tokens": original_tokens,
+            "compacted_tokens": compacted_tokens,
+            "tokens_saved": original_tokens - compacted_tokens,
+            "token_budget": self.token_budget,
+            "output_tokens": math.ceil(self._output_chars / CHARS_PER_TOKEN),
+            "section_retries": self._section_retries,
+            "latency_seconds": round(time.monotonic() - started, 2),
+        }
+        print(
+            f"[NoteFormatter] {mode} mode — ~{compacted_tokens} tokens "
+            f"(saved ~{original_tokens - compacted_tokens} by compaction), "
+            f"{self.last_report['latency_seconds']}s"
+        )
+        return render_notes(notes, meeting_info, transcript_filename)
 
-## {meeting_info.get("title", "Untitled Meeting")}
+    def notes_from_response(
+        self,
+        response_text: str,
+        transcript: str,
+        meeting_info: dict,
+        transcript_filename: str,
+    ) -> str:
+        """Render a notes response from a batch job, repairing bad sections.
 
-**Date**: (formatted date)
-**Attendees**: (comma-separated list)
+        Sections that fail validation are re-requested synchronously.
+        """
+        notes, invalid = parse_notes(response_text)
+        if invalid:
+            self._retry_sections(
+                notes,
+                invalid,
+                meeting_info,
+                "transcript",
+                compact_transcript(transcript),
+            )
+        return render_notes(notes, meeting_info, transcript_filename)
 
-### Meeting Purpose
-(1-2 sentences summarizing why this meeting was held)
+    def single_shot_prompt(
+        self,
+        transcript: str,
+        meeting_info: dict,
+        transcript_filename: str,
+    ) -> str | None:
+        """Return the one-request notes prompt, or None if over the token budget.
 
-### Key Discussion Points
-(Bulleted list of main topics discussed, with sub-bullets for details)
+        Used by batch mode, where each transcript has to fit in one request;
+        submit it with NOTES_SCHEMA and pass the result to
+        notes_from_response().
+        """
+        compacted = compact_transcript(transcript)
+        if estimate_tokens(compacted) > self.token_budget:
+            return None
+        return self._notes_prompt(meeting_info, "transcript", compacted)
 
-### Challenges & Concerns
-(Bulleted list of problems, blockers, or concerns raised)
+    # ---- Map-reduce formatting for long transcripts ----
 
-### Goals & Decisions
-(Bulleted list of decisions made or goals agreed upon)
+    def _summarize_chunk(self, chunk: str, index: int, total: int) -> str:
+        """Summarize one transcript chunk."""
+        prompt = f"""You are summarizing part {index + 1} of {total} of a long \
+meeting transcript. Write detailed Markdown bullet notes for this part only, \
+grouped under these headings: Discussion, Challenges & Concerns, \
+Decisions, Action Items. Keep speaker names and timestamps where they help \
+attribute a point or action item. Do not add an introduction or conclusion.
 
-### Next Steps
-(Bulleted list of action items, with the responsible person if identifiable)
+Transcript part {index + 1} of {total}:
 
-### Raw Transcript
-[[{transcript_filename}]]
+{chunk}
+"""
+        return self._generate(prompt)
 
----
+    def _format_notes_hierarchical(self, transcript: str, meeting_info: dict) -> dict:
+        """Summarize chunks concurrently, then combine them into the notes."""
+        chunks = split_transcript(transcript)
+        total = len(chunks)
+        print(
+            f"[NoteFormatter] Long transcript ({len(transcript)} chars) — "
+            f"summarizing {total} chunks"
+        )
 
-Here is the transcript:
+        with ThreadPoolExecutor(max_workers=CHUNK_MAX_WORKERS) as pool:
+            summaries = list(
+                pool.map(
+                    tracing.in_current_context(
+                        lambda args: self._summarize_chunk(args[1], args[0], total)
+                    ),
+                    enumerate(chunks),
+                )
+            )
 
-{transcript}
-"""
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=prompt,
+        combined = "\n\n".join(
+            f"#### Part {i + 1} of {total}\n\n{summary}"
+            for i, summary in enumerate(summaries)
+        )
+        return self._structured_notes(
+            meeting_info,
+            "transcript summaries (one per consecutive part of the meeting)",
+            combined,
         )
-        return response.text
 
     def save_notes(
         self,
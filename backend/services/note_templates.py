@@ -0,0 +1,154 @@
+"""Extra outputs that can be generated from a meeting transcript.
+
+Each template is a prompt run against the meeting's cached context (see
+services.meeting_context), so adding outputs doesn't re-send the
+transcript.  `suffix` names the file a template's output is saved as:
+``{timestamp}_{title}_{suffix}.md``.
+
+NOTE_TEMPLATES in .env lists the templates generated automatically for
+every recording, next to the regular notes; NOTE_TEMPLATES_FILE points to
+a JSON file of extra templates in the same shape as the built-in ones.
+"""
+
+import json
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from services import tracing
+from services.settings_store import settings_store
+
+# Templates (and the regular notes) generated at once for one recording;
+# the rate governor still caps how many requests are really in flight.
+NOTE_TEMPLATE_MAX_WORKERS = 4
+# Name of the regular structured notes among the generated outputs
+NOTES_OUTPUT = "notes"
+
+NOTE_TEMPLATES = {
+    "exec_summary": {
+        "title": "Executive Summary",
+        "suffix": "summary",
+        "prompt": (
+            "Write an executive summary of this meeting for someone who did not "
+            "attend: 3-5 sentences on the outcome, followed by at most five "
+            "bullets covering decisions and open risks. Markdown, no heading."
+        ),
+    },
+    "action_items": {
+        "title": "Action Items",
+        "suffix": "actions",
+        "prompt": (
+            "List every action item from this meeting as a Markdown checklist "
+            '("- [ ] ..."). Put the owner in bold at the start of each item if '
+            "they can be identified, and a due date at the end if one was "
+            "mentioned. Output only the list."
+        ),
+    },
+    "follow_up_email": {
+        "title": "Follow-up Email",
+        "suffix": "email",
+        "prompt": (
+            "Draft a short follow-up email to the attendees of this meeting: a "
+            "one-line thank-you, a recap of the decisions, the action items with "
+            "owners, and any open questions. Start with a 'Subject:' line. Plain "
+            "text, friendly and concise."
+        ),
+    },
+}
+
+
+def load_templates() -> dict[str, dict]:
+    """Built-in templates plus any from NOTE_TEMPLATES_FILE."""
+    templates = dict(NOTE_TEMPLATES)
+    path = settings_store.get("NOTE_TEMPLATES_FILE")
+    if not path:
+        return templates
+    try:
+        custom = json.loads(Path(path).read_text())
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"[NoteTemplates] Could not load {path}: {e}")
+        return templates
+    for name, template in custom.items():
+        if name == NOTES_OUTPUT:
+            print(f"[NoteTemplates] Skipping template {name!r}: reserved name")
+            continue
+        if not isinstance(template, dict) or not template.get("prompt"):
+            print(f"[NoteTemplates] Skipping template {name!r}: no prompt")
+            continue
+        templates[name] = {
+            "title": template.get("title", name.replace("_", " ").title()),
+            "suffix": template.get("suffix", name),
+            "prompt": template["prompt"],
+        }
+    return templates
+
+
+def get_template(name: str) -> dict:
+    templates = load_templates()
+    if name not in templates:
+        raise ValueError(
+            f"Unknown note template {name!r} "
+            f"(available: {', '.join(templates)})"
+        )
+    return templates[name]
+
+
+def enabled_templates(value: str | None = None) -> list[str]:
+    """Templates to generate for every recording (NOTE_TEMPLATES in .env).
+
+    `value` overrides the setting (e.g. a team-mode user's own list).
+    """
+    templates = load_templates()
+    names = []
+    if value is None:
+        value = settings_store.get("NOTE_TEMPLATES")
+    for name in value.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name in templates:
+            names.append(name)
+        else:
+            print(f"[NoteTemplates] Unknown template {name!r} in NOTE_TEMPLATES")
+    return names
+
+
+def template_filename(suffix: str, meeting_title: str, timestamp: str) -> str:
+    safe_title = meeting_title.replace(" ", "_").replace("/", "-")
+    return f"{timestamp}_{safe_title}_{suffix}.md"
+
+
+def generate_concurrently(
+    tasks: dict[str, Callable[[], str]],
+    on_done: Callable[[str, str], None],
+    max_workers: int = NOTE_TEMPLATE_MAX_WORKERS,
+) -> dict[str, dict]:
+    """Run output generators in parallel, handing each result off as it lands.
+
+    `on_done(name, content)` is called (on the worker thread) as soon as
+    that task finishes, so one slow output doesn't hold back saving the
+    others.  A failure in a task or its on_done is recorded, not raised.
+    Returns {name: {"status": "ok" | "failed", "seconds", "error"?}}.
+    """
+
+    def run(name: str) -> dict:
+        started = time.monotonic()
+        with tracing.span("output", output=name) as span:
+            try:
+                on_done(name, tasks[name]())
+                result = {"status": "ok"}
+            except Exception as e:
+                print(f"[NoteTemplates] {name} failed: {e}")
+                result = {"status": "failed", "error": str(e)}
+                span.fail(e)
+        result["seconds"] = round(time.monotonic() - started, 2)
+        return result
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        run = tracing.in_current_context(run)
+        futures = {pool.submit(run, name): name for name in tasks}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
@@ -0,0 +1,68 @@
+"""Bounded single-producer/single-consumer byte ring for audio callbacks.
+
+The PortAudio callback thread writes captured PCM into a preallocated
+buffer and returns immediately; a worker thread drains it.  Only the
+producer moves the write counter and only the consumer moves the read
+counter, so neither side takes a lock.  When the consumer falls behind and
+the ring is full, incoming chunks are dropped and counted rather than
+blocking the audio thread.
+"""
+
+import threading
+
+SAMPLE_WIDTH = 2  # bytes per int16 sample
+
+
+class PcmRingBuffer:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._written = 0  # total bytes ever written (producer only)
+        self._read = 0  # total bytes ever read (consumer only)
+        self.data_ready = threading.Event()
+        # Overflow accounting (producer only)
+        self.overflows = 0
+        self.dropped_bytes = 0
+        self.high_water = 0
+
+    @property
+    def available(self) -> int:
+        """Bytes written but not yet read."""
+        return self._written - self._read
+
+    def write(self, data) -> bool:
+        """Copy `data` in; return False (and count it) if it doesn't fit."""
+        n = len(data)
+        used = self._written - self._read
+        if n > self.capacity - used:
+            self.overflows += 1
+            self.dropped_bytes += n
+            self.data_ready.set()
+            return False
+
+        pos = self._written % self.capacity
+        first = min(n, self.capacity - pos)
+        src = memoryview(data)
+        self._view[pos : pos + first] = src[:first]
+        if first < n:
+            self._view[: n - first] = src[first:]
+        self._written += n
+        self.high_water = max(self.high_water, used + n)
+        self.data_ready.set()
+        return True
+
+    def read(self, max_bytes: int) -> bytes:
+        """Remove and return up to `max_bytes` (whole samples only)."""
+        n = min(max_bytes, self._written - self._read)
+        n -= n % SAMPLE_WIDTH
+        if n <= 0:
+            return b""
+        pos = self._read % self.capacity
+        first = min(n, self.capacity - pos)
+        if first == n:
+            out = bytes(self._view[pos : pos + n])
+        else:
+            out = bytes(self._view[pos:]) + bytes(self._view[: n - first])
+        self._read += n
+        return out
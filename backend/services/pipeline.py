@@ -0,0 +1,185 @@
+"""The recording → transcript → notes pipeline, independent of where it runs.
+
+run_pipeline() takes everything it needs in a config dict instead of
+reading the app's settings, so the same code serves the desktop app
+(routers.recording.process_recording, configured from .env) and team-mode
+worker processes (one config per user, see services.tenants).
+
+Config keys:
+    api_key, provider     Gemini key and AI_PROVIDER name
+    transcript_dir        where the transcript and its segments are saved
+    notes_dir             where the notes and template outputs are saved
+    note_templates        extra templates to generate (NOTE_TEMPLATES)
+    drive                 None, or {credentials_path, token_path,
+                          folder_name, state_path, require_token}
+                          (state_path None: DriveSync's default file)
+"""
+
+import os
+from collections.abc import Callable
+
+from services import tracing
+from services.settings_store import SettingsStore
+
+StatusCallback = Callable[[str], None]
+
+
+def config_from_settings(settings: SettingsStore) -> dict:
+    """Pipeline config for the desktop app, from its .env."""
+    from services.note_templates import enabled_templates
+
+    return {
+        "api_key": settings.get("GEMINI_API_KEY"),
+        "provider": settings.get("AI_PROVIDER", "gemini"),
+        "transcript_dir": settings.get("TRANSCRIPT_DIR"),
+        "notes_dir": settings.get("NOTES_DIR"),
+        "note_templates": enabled_templates(),
+        "drive": {
+            "credentials_path": settings.resolve_path(
+                "GOOGLE_CREDENTIALS_PATH", "./credentials.json"
+            ),
+            "token_path": settings.resolve_path("GOOGLE_TOKEN_PATH", "./token.json"),
+            "folder_name": settings.get("DRIVE_FOLDER_NAME", "notes"),
+            "state_path": None,  # the default drive-sync.json
+            # The desktop app may run the interactive OAuth flow
+            "require_token": False,
+        },
+    }
+
+
+def upload_to_drive(config: dict, notes_filename: str, doc_title: str, timestamp: str):
+    """Sync a saved notes file to Google Drive. Failures are logged, not raised.
+
+    Re-processing the same meeting updates its existing Doc in place
+    instead of creating a duplicate.
+    """
+    drive = config.get("drive")
+    if not drive:
+        return
+    if drive.get("require_token") and not os.path.exists(drive["token_path"]):
+        # No stored Google token (team mode): never start an OAuth flow
+        return
+    with tracing.span("drive_upload", filename=notes_filename) as span:
+        try:
+            from services.drive_sync import DRIVE_SYNC_STATE_PATH, DriveSync
+            from services.google_auth import get_cached_credentials
+
+            creds = get_cached_credentials(
+                drive["credentials_path"], drive["token_path"]
+            )
+            state_path = drive.get("state_path") or DRIVE_SYNC_STATE_PATH
+            DriveSync(creds, drive["folder_name"], state_path).sync_file(
+                os.path.join(config["notes_dir"], notes_filename),
+                f"{doc_title} - {timestamp}",
+            )
+        except Exception as e:
+            span.fail(e)
+            print(f"Drive upload failed (non-fatal): {e}")
+
+
+def run_pipeline(
+    wav_path: str,
+    meeting_info: dict,
+    timestamp: str,
+    config: dict,
+    on_status: StatusCallback | None = None,
+) -> dict:
+    """Transcribe a recording, save the transcript, notes and templates.
+
+    The notes and any templates are generated concurrently; each output is
+    saved and uploaded to Drive as soon as it's ready.  Raises if the
+    transcript or the main notes can't be produced (failed templates are
+    only reported).  Returns {transcript_filename, notes_filename, files,
+    outputs, report}.
+    """
+    from services.ai_provider import get_provider
+    from services.meeting_context import get_context_store
+    from services.note_formatter import NoteFormatter
+    from services.note_templates import (
+        NOTES_OUTPUT,
+        generate_concurrently,
+        get_template,
+        template_filename,
+    )
+    from services.transcription import TranscriptionService
+
+    def status(msg: str):
+        if on_status:
+            on_status(msg)
+
+    api_key = config.get("api_key")
+    transcript_dir = config.get("transcript_dir")
+    notes_dir = config.get("notes_dir")
+    title = meeting_info.get("title", "untitled")
+    if not api_key:
+        raise ValueError("Gemini API key not configured. Go to Settings to add it.")
+    if not transcript_dir or not notes_dir:
+        raise ValueError("Transcript/Notes directories not configured. Go to Settings.")
+    provider = get_provider(api_key, config.get("provider"))
+
+    # 1. Transcribe. Retries and rate limiting happen per request in the
+    # rate governor
+    transcriber = TranscriptionService(api_key, provider=provider)
+    transcript_text = transcriber.transcribe(wav_path, on_status=status)
+
+    # 2. Save transcript
+    status("Saving transcript...")
+    with tracing.span("save", output="transcript", bytes=len(transcript_text)):
+        transcript_filename = transcriber.save_transcript(
+            transcript_text,
+            title,
+            transcript_dir,
+            timestamp,
+            segments=transcriber.last_segments,
+        )
+
+    # 3. Generate the notes and any extra templates concurrently
+    formatter = NoteFormatter(api_key, provider=provider)
+    tasks = {
+        NOTES_OUTPUT: lambda: formatter.format_notes(
+            transcript_text, meeting_info, transcript_filename
+        )
+    }
+    template_names = config.get("note_templates") or []
+    if template_names:
+        context = get_context_store().get(
+            os.path.join(transcript_dir, transcript_filename), provider
+        )
+        for name in template_names:
+            tasks[name] = lambda name=name: context.run_template(name)
+    saved_files: dict[str, str] = {}
+
+    def save_output(name: str, content: str):
+        with tracing.span("save", output=name, bytes=len(content)):
+            if name == NOTES_OUTPUT:
+                filename = formatter.save_notes(content, title, notes_dir, timestamp)
+                doc_title = title
+            else:
+                template = get_template(name)
+                filename = template_filename(template["suffix"], title, timestamp)
+                with open(os.path.join(notes_dir, filename), "w") as f:
+                    f.write(content)
+                doc_title = f"{title} ({template['title']})"
+        saved_files[name] = filename
+        status(f"Generated {len(saved_files)}/{len(tasks)} notes outputs...")
+        # 4. Upload to Google Drive (non-fatal)
+        upload_to_drive(config, filename, doc_title, timestamp)
+
+    status(
+        "Generating structured notes..."
+        if len(tasks) == 1
+        else f"Generating structured notes and {len(tasks) - 1} templates..."
+    )
+    outputs = generate_concurrently(tasks, save_output)
+    if outputs[NOTES_OUTPUT]["status"] != "ok":
+        # Templates that succeeded are kept; the caller decides whether to
+        # keep the recording for a retry because the main notes are missing
+        raise RuntimeError(outputs[NOTES_OUTPUT]["error"])
+
+    return {
+        "transcript_filename": transcript_filename,
+        "notes_filename": saved_files[NOTES_OUTPUT],
+        "files": saved_files,
+        "outputs": outputs,
+        "report": {**formatter.last_report, "outputs": outputs},
+    }
@@ -0,0 +1,341 @@
+"""Shared rate limiting and retry policy for Gemini calls.
+
+Every model call goes through one RateGovernor, so concurrent jobs
+(a recording being processed, chunked note generation, multitrack
+transcription, batch submission) share a single request budget instead
+of each backing off on its own:
+
+- a token bucket caps the request rate (GEMINI_REQUESTS_PER_MINUTE);
+- a semaphore caps in-flight requests (GEMINI_MAX_CONCURRENCY);
+- failures are classified: quota errors (429) pause *all* callers until
+  the server's retry hint has passed, transient errors (5xx, timeouts,
+  connection drops) are retried with jittered exponential backoff, and
+  client errors (other 4xx) fail immediately.
+
+Operations made of several requests (upload → wait until processed →
+generate) are also retried as a unit with retry_operation(), for failures
+between the requests: a file that never became usable, an empty response.
+"""
+
+import random
+import re
+import threading
+import time
+from collections.abc import Callable
+
+from services import tracing
+from services.settings_store import settings_store
+
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 3  # retries after the first attempt
+RETRY_BASE_DELAY = 2.0  # seconds; backoff ceiling doubles each retry
+RETRY_MAX_DELAY = 60.0
+# Used for a quota error that carries no retry hint
+DEFAULT_RATE_LIMIT_DELAY = 10.0
+
+RATE_LIMITED = "rate_limited"
+TRANSIENT = "transient"
+FATAL = "fatal"
+
+# 408 (timeout) and 429 (quota) are the only retryable client errors
+_RETRYABLE_CLIENT_CODES = {408, 429}
+_TRANSIENT_EXCEPTION_NAMES = {
+    "TimeoutError",
+    "ConnectionError",
+    "ConnectError",
+    "ReadTimeout",
+    "ConnectTimeout",
+    "RemoteProtocolError",
+    "ServerDisconnectedError",
+}
+# RetryInfo in a Google API error body, e.g. "retryDelay": "17s"
+_RETRY_DELAY_RE = re.compile(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s")
+
+# Called with (attempt, delay_seconds, error) before a retry sleeps
+RetryCallback = Callable[[int, float, Exception], None]
+# Set on errors call() gave up on, so retry_operation() doesn't retry them again
+_GAVE_UP_ATTR = "_rate_governor_gave_up"
+
+
+def _status_code(error: Exception) -> int | None:
+    for attr in ("code", "status_code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def retry_after_hint(error: Exception) -> float | None:
+    """Seconds the server asked us to wait, if the error says."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        try:
+            value = headers.get("retry-after")
+            if value is not None:
+                return float(value)
+        except (TypeError, ValueError):
+            pass
+    match = _RETRY_DELAY_RE.search(str(error))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+def classify_error(error: Exception) -> str:
+    """Return RATE_LIMITED, TRANSIENT or FATAL for a failed call."""
+    code = _status_code(error)
+    if code == 429:
+        return RATE_LIMITED
+    if code is not None:
+        if code >= 500 or code in _RETRYABLE_CLIENT_CODES:
+            return TRANSIENT
+        if 400 <= code < 500:
+            return FATAL
+    if "RESOURCE_EXHAUSTED" in str(error):
+        return RATE_LIMITED
+    if isinstance(error, (ValueError, TypeError, FileNotFoundError, PermissionError)):
+        return FATAL
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return TRANSIENT
+    if type(error).__name__ in _TRANSIENT_EXCEPTION_NAMES:
+        return TRANSIENT
+    # Unknown failures were always retried before; keep doing that
+    return TRANSIENT
+
+
+class RateGovernor:
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+    ):
+        self.rate = requests_per_minute / 60.0  # tokens per second
+        self.burst = max(1.0, min(float(max_concurrency), requests_per_minute))
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self.stats = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failed": 0,
+            "throttled_seconds": 0.0,
+        }
+
+    # ---- Admission ----
+
+    def _acquire_token(self):
+        """Block until the bucket has a token and no quota pause is active."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._refilled_at) * self.rate
+                )
+                self._refilled_at = now
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.stats["throttled_seconds"] += waited
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def _pause(self, seconds: float):
+        """Stop admitting requests from any caller for `seconds`."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            # The quota is spent; don't let a burst through when it lifts
+            self._tokens = 0.0
+
+    def _backoff(self, attempt: int) -> float:
+        """Jittered exponential backoff for retry `attempt` (1-based).
+
+        The delay is drawn between half and all of the doubling ceiling, so
+        callers that failed together don't retry in lockstep.
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(ceiling / 2, ceiling)
+
+    # ---- Calls ----
+
+    def call(
+        self,
+        fn: Callable,
+        *args,
+        on_retry: RetryCallback | None = None,
+        rate_limited: bool = True,
+        **kwargs,
+    ):
+        """Run `fn(*args, **kwargs)` under the rate limit, retrying as needed.
+
+        Pass `rate_limited=False` for calls that don't count against the
+        model quota (e.g. file uploads); they still get the retry policy.
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+        attempt = 0
+        while True:
+            with tracing.span(
+                "attempt", call=getattr(fn, "__name__", "call"), attempt=attempt + 1
+            ) as span:
+                queued = time.monotonic()
+                if rate_limited:
+                    self._acquire_token()
+                with self._slots:
+                    span.set(queued_ms=round((time.monotonic() - queued) * 1000, 1))
+                    with self._lock:
+                        self.stats["attempts"] += 1
+                    try:
+                        return fn(*args, **kwargs)
+                    except Exception as e:
+                        error = e
+                kind = classify_error(error)
+                span.fail(error)
+                span.set(error_kind=kind)
+            attempt += 1
+            if kind == FATAL or attempt > self.max_retries:
+                self._give_up(error)
+                raise error
+            self._wait_to_retry(kind, attempt, error, on_retry)
+
+    def retry_operation(
+        self, fn: Callable, *args, on_retry: RetryCallback | None = None, **kwargs
+    ):
+        """Run `fn(*args, **kwargs)`, retrying the whole of it as needed.
+
+        For operations whose requests each go through call(): no rate limit
+        or slot is taken here, and errors call() already gave up on are
+        raised as they are.
+        """
+        attempt = 0
+        while True:
+            with tracing.span(
+                "operation", call=getattr(fn, "__name__", "operation"), attempt=attempt + 1
+            ) as span:
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as e:
+                    error = e
+                span.fail(error)
+            if getattr(error, _GAVE_UP_ATTR, False):
+                raise error
+            kind = classify_error(error)
+            attempt += 1
+            if kind == FATAL or attempt > self.max_retries:
+                self._give_up(error)
+                raise error
+            self._wait_to_retry(kind, attempt, error, on_retry)
+
+    def _give_up(self, error: Exception):
+        with self._lock:
+            self.stats["failed"] += 1
+        try:
+            setattr(error, _GAVE_UP_ATTR, True)
+        except AttributeError:
+            pass
+
+    def _wait_to_retry(
+        self, kind: str, attempt: int, error: Exception, on_retry: RetryCallback | None
+    ):
+        delay = self._backoff(attempt)
+        if kind == RATE_LIMITED:
+            hint = retry_after_hint(error)
+            delay = max(delay, hint if hint is not None else DEFAULT_RATE_LIMIT_DELAY)
+            # Small jitter so paused callers don't all resume at once
+            delay += random.uniform(0, min(1.0, delay * 0.1))
+            self._pause(delay)
+            with self._lock:
+                self.stats["rate_limited"] += 1
+        with self._lock:
+            self.stats["retries"] += 1
+        print(
+            f"[RateGovernor] {kind} error (attempt {attempt}/"
+            f"{self.max_retries + 1}): {error}. Retrying in {delay:.1f}s..."
+        )
+        if on_retry:
+            on_retry(attempt, delay, error)
+        time.sleep(delay)
+
+
+_governor: RateGovernor | None = None
+_governor_lock = threading.Lock()
+# This process's share of the budget is 1/_budget_share (team-mode workers)
+_budget_share = 1
+
+
+def _positive_setting(key: str, default, cast):
+    """A numeric setting, or `default` if it is missing, invalid or below 1.
+
+    0 would divide by zero (rate) or block every caller (concurrency).
+    """
+    raw = settings_store.get(key)
+    if not raw:
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        value = None
+    if value is None or value < 1:
+        print(f"[RateGovernor] Ignoring {key}={raw!r} (must be at least 1), using {default}")
+        return default
+    return value
+
+
+def get_governor() -> RateGovernor:
+    """The process-wide governor, configured from .env.
+
+    In a process given a share of the budget with set_budget_share(), the
+    rate and concurrency are divided by it (also after .env changes).
+    """
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            requests_per_minute = _positive_setting(
+                "GEMINI_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE, float
+            )
+            max_concurrency = _positive_setting(
+                "GEMINI_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY, int
+            )
+            _governor = RateGovernor(
+                requests_per_minute=requests_per_minute / _budget_share,
+                max_concurrency=max(1, max_concurrency // _budget_share),
+            )
+        return _governor
+
+
+def set_budget_share(processes: int):
+    """Limit this process to 1/`processes` of the configured budget."""
+    global _governor, _budget_share
+    with _governor_lock:
+        _budget_share = max(1, processes)
+        _governor = None
+
+
+def reset_governor(_changed_keys=None):
+    global _governor
+    with _governor_lock:
+        _governor = None
+
+
+settings_store.subscribe(
+    reset_governor, ["GEMINI_REQUESTS_PER_MINUTE", "GEMINI_MAX_CONCURRENCY"]
+)
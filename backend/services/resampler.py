@@ -0,0 +1,97 @@
+"""Streaming rational resampler for capture-time decimation.
+
+A polyphase windowed-sinc FIR (Kaiser window) converts 16-bit PCM from the
+device rate to the target speech rate chunk by chunk.  The last few input
+samples are carried between calls, so splitting a signal into chunks of any
+size produces exactly the same output as resampling it in one go.
+"""
+
+from math import gcd
+
+import numpy as np
+
+# Taps per polyphase branch.  Transition width is roughly 5 * in_rate / taps
+# (~3.4 kHz at 44.1 kHz input), giving ~80 dB stopband attenuation.
+DEFAULT_TAPS_PER_PHASE = 64
+KAISER_BETA = 8.0
+
+
+class StreamingResampler:
+    """Resample int16 PCM from `in_rate` to `out_rate`, keeping filter state."""
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int,
+        taps_per_phase: int = DEFAULT_TAPS_PER_PHASE,
+    ):
+        g = gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self.taps = taps_per_phase
+
+        # Low-pass at the lower of the two Nyquist frequencies, pulled in by
+        # half the transition width so aliases are attenuated by the edge.
+        n_taps = taps_per_phase * self.up
+        transition_hz = 5.0 * in_rate / taps_per_phase
+        cutoff_hz = max(
+            min(in_rate, out_rate) / 2 - transition_hz / 2,
+            min(in_rate, out_rate) / 4,
+        )
+        fc = cutoff_hz / (in_rate * self.up)  # cycles per upsampled sample
+        t = np.arange(n_taps) - (n_taps - 1) / 2
+        h = 2 * fc * np.sinc(2 * fc * t) * np.kaiser(n_taps, KAISER_BETA)
+        h *= self.up / h.sum()  # unity DC gain after zero-stuffing
+
+        # phases[p, k] = h[p + k * up]; output n uses phase (n*down) % up
+        # against inputs x[base], x[base - 1], ..., x[base - taps + 1].
+        self._phases = h.reshape(taps_per_phase, self.up).T.astype(np.float32)
+        self._tap_offsets = np.arange(taps_per_phase)
+
+        # The last taps-1 inputs (zeros before the first chunk)
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self._inputs_seen = 0
+        self._outputs_made = 0
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def process(self, data) -> bytes:
+        """Resample one chunk of int16 PCM (bytes-like) and return int16 bytes."""
+        if self.passthrough:
+            return bytes(data)
+
+        chunk = np.frombuffer(data, dtype=np.int16, count=len(data) // 2)
+        if not len(chunk):
+            return b""
+        buf = np.concatenate((self._history, chunk.astype(np.float32)))
+        self._inputs_seen += len(chunk)
+
+        # Outputs whose newest input sample is now available
+        last_input = self._inputs_seen - 1
+        n_end = ((last_input + 1) * self.up - 1) // self.down + 1
+        n = np.arange(self._outputs_made, n_end, dtype=np.int64)
+        self._outputs_made = max(self._outputs_made, n_end)
+        self._history = buf[len(buf) - (self.taps - 1) :].copy()
+        if not len(n):
+            return b""
+
+        m = n * self.down
+        base = m // self.up
+        phase = m % self.up
+        # Global input index of buf[0]
+        buf_start = self._inputs_seen - len(buf)
+        idx = (base - buf_start)[:, None] - self._tap_offsets[None, :]
+        out = np.einsum("nk,nk->n", buf[idx], self._phases[phase])
+
+        np.rint(out, out=out)
+        np.clip(out, -32768, 32767, out=out)
+        return out.astype(np.int16).tobytes()
+
+
+def resample(data: bytes, in_rate: int, out_rate: int) -> bytes:
+    """One-shot resampling of a whole int16 PCM buffer."""
+    return StreamingResampler(in_rate, out_rate).process(data)
@@ -0,0 +1,311 @@
+"""Compressed store for recordings that failed processing.
+
+Saved audio is compressed losslessly to FLAC (when the optional soundfile
+package is available; plain WAV otherwise), typically about half the size of
+the WAV, and decoded back to a scratch WAV when the recording is retried.
+Both run in the audio process pool (services.audio_executor).
+Each recording has a JSON metadata sidecar next to its audio.
+
+The store keeps itself within a disk budget (SAVED_RECORDINGS_MAX_MB) and
+an age limit (SAVED_RECORDINGS_MAX_DAYS): after every save, recordings
+past the age limit are evicted, then the oldest until the total fits.
+Recordings with pending work — in a running batch job, or checked out for
+a retry — are never evicted.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import wave
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import soundfile
+except ImportError:  # optional: saved audio stays uncompressed WAV
+    soundfile = None
+
+from services.audio_executor import get_audio_executor
+from services.settings_store import settings_store
+
+# Frames per block when converting, so long recordings aren't held in memory
+CONVERT_BLOCK_FRAMES = 1 << 16
+
+# Called with a recording's metadata; True means it must not be evicted
+PendingCheck = Callable[[dict], bool]
+
+
+def compress_wav(wav_path: str, dest_base: str) -> str:
+    """Write `wav_path` losslessly to `dest_base` + .flac (or .wav); return the path.
+
+    Falls back to moving the WAV as-is without soundfile or for sample
+    formats FLAC can't hold losslessly here.
+    """
+    if soundfile is not None:
+        with wave.open(wav_path, "rb") as wf:
+            channels = wf.getnchannels()
+            if wf.getsampwidth() == 2:
+                dest = dest_base + ".flac"
+                tmp = dest + ".partial"
+                try:
+                    with soundfile.SoundFile(
+                        tmp,
+                        "w",
+                        samplerate=wf.getframerate(),
+                        channels=channels,
+                        subtype="PCM_16",
+                        format="FLAC",
+                    ) as out:
+                        while frames := wf.readframes(CONVERT_BLOCK_FRAMES):
+                            out.write(
+                                np.frombuffer(frames, dtype=np.int16).reshape(
+                                    -1, channels
+                                )
+                            )
+                    os.replace(tmp, dest)
+                    os.remove(wav_path)
+                    return dest
+                except Exception as e:
+                    print(f"[SavedStore] FLAC compression failed, keeping WAV: {e}")
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+    dest = dest_base + ".wav"
+    if os.path.abspath(wav_path) != os.path.abspath(dest):
+        shutil.move(wav_path, dest)
+    return dest
+
+
+def decode_to_wav(audio_path: str, wav_path: str):
+    """Decode stored audio (FLAC) into a 16-bit WAV at `wav_path`."""
+    if audio_path.endswith(".wav"):
+        shutil.copyfile(audio_path, wav_path)
+        return
+    if soundfile is None:
+        raise RuntimeError("soundfile is required to decode FLAC recordings")
+    with soundfile.SoundFile(audio_path) as f, wave.open(wav_path, "wb") as out:
+        out.setnchannels(f.channels)
+        out.setsampwidth(2)
+        out.setframerate(f.samplerate)
+        for block in f.blocks(blocksize=CONVERT_BLOCK_FRAMES, dtype="int16"):
+            out.writeframes(block.tobytes())
+
+
+class SavedRecordingStore:
+    def __init__(self, directory: str, is_pending: PendingCheck | None = None):
+        self.directory = directory
+        self.is_pending = is_pending or (lambda meta: False)
+        self._lock = threading.Lock()
+        self._checked_out: set[str] = set()
+
+    # ---- Records ----
+
+    def meta_path(self, recording_id: str) -> str:
+        return os.path.join(self.directory, f"{recording_id}.json")
+
+    def audio_path(self, meta: dict) -> str:
+        # "wav_filename" is what recordings saved before compression used
+        name = meta.get("audio_filename") or meta.get("wav_filename", "")
+        return os.path.join(self.directory, name)
+
+    def list_recordings(self) -> list[tuple[str, dict]]:
+        """(recording_id, metadata) for every recording with audio, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        records = []
+        for meta_file in sorted(Path(self.directory).glob("*.json"), reverse=True):
+            try:
+                meta = json.loads(meta_file.read_text())
+            except json.JSONDecodeError:
+                continue
+            if os.path.isfile(self.audio_path(meta)):
+                records.append((meta_file.stem, meta))
+        return records
+
+    def update(self, recording_id: str, **fields):
+        path = Path(self.meta_path(recording_id))
+        meta = json.loads(path.read_text())
+        meta.update(fields)
+        path.write_text(json.dumps(meta, indent=2))
+
+    # ---- Save / retry / remove ----
+
+    def save(
+        self,
+        wav_path: str,
+        meeting_info: dict,
+        timestamp: str,
+        error_msg: str,
+        retry_count: int,
+        capture_stats: dict | None = None,
+    ) -> str:
+        """Compress a recording into the store; return its metadata path.
+
+        Saving a recording that is already stored (a failed retry) keeps
+        the stored audio and only updates the metadata.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        title = meeting_info.get("title", "untitled")
+        safe_title = title.replace(" ", "_").replace("/", "-")
+        recording_id = f"{timestamp}_{safe_title}"
+        meta_path = self.meta_path(recording_id)
+
+        try:
+            existing = json.loads(Path(meta_path).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            existing = None
+
+        if existing and os.path.isfile(self.audio_path(existing)):
+            if os.path.abspath(wav_path) != os.path.abspath(
+                self.audio_path(existing)
+            ) and os.path.exists(wav_path):
+                os.remove(wav_path)
+            meta = existing
+        else:
+            with wave.open(wav_path, "rb") as wf:
+                audio = {
+                    "channels": wf.getnchannels(),
+                    "sample_rate": wf.getframerate(),
+                    "duration_seconds": round(wf.getnframes() / wf.getframerate(), 1),
+                }
+            wav_bytes = os.path.getsize(wav_path)
+            started = time.monotonic()
+            stored = get_audio_executor().run(
+                compress_wav, wav_path, os.path.join(self.directory, recording_id)
+            )
+            stored_bytes = os.path.getsize(stored)
+            print(
+                f"[SavedStore] Stored {os.path.basename(stored)}: "
+                f"{wav_bytes / 1e6:.1f} → {stored_bytes / 1e6:.1f} MB "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+            meta = {
+                "audio_filename": os.path.basename(stored),
+                "audio_format": os.path.splitext(stored)[1].lstrip("."),
+                "wav_bytes": wav_bytes,
+                "stored_bytes": stored_bytes,
+                **audio,
+            }
+
+        meta.update(
+            {
+                "title": title,
+                "timestamp": timestamp,
+                "meeting_info": meeting_info,
+                "last_error": error_msg,
+                "retry_count": retry_count,
+            }
+        )
+        # Age-based eviction counts from the first save, not the last retry
+        meta.setdefault("saved_at", datetime.now().isoformat())
+        if capture_stats:
+            meta["capture_stats"] = capture_stats
+        Path(meta_path).write_text(json.dumps(meta, indent=2))
+        self.release(recording_id)
+        # Never evict the copy the user was just told was saved for retry
+        self.enforce_budget(keep=recording_id)
+        return meta_path
+
+    def checkout(self, recording_id: str, scratch_dir: str) -> tuple[str, dict]:
+        """Decode a stored recording to a scratch WAV for reprocessing.
+
+        The recording can't be evicted until save() or remove() releases it.
+        """
+        meta = json.loads(Path(self.meta_path(recording_id)).read_text())
+        with self._lock:
+            self._checked_out.add(recording_id)
+        try:
+            os.makedirs(scratch_dir, exist_ok=True)
+            wav_path = os.path.join(scratch_dir, f"{recording_id}.wav")
+            get_audio_executor().run(decode_to_wav, self.audio_path(meta), wav_path)
+        except Exception:
+            self.release(recording_id)
+            raise
+        return wav_path, meta
+
+    def release(self, recording_id: str):
+        with self._lock:
+            self._checked_out.discard(recording_id)
+
+    def remove(self, meta_path: str):
+        """Delete a recording's audio and metadata (after it was processed)."""
+        recording_id = Path(meta_path).stem
+        try:
+            meta = json.loads(Path(meta_path).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            meta = {}
+        audio = self.audio_path(meta) if meta else None
+        for path in (audio, meta_path):
+            if path and os.path.isfile(path):
+                os.remove(path)
+        self.release(recording_id)
+
+    # ---- Budget ----
+
+    def usage(self) -> dict:
+        records = self.list_recordings()
+        stored = sum(os.path.getsize(self.audio_path(m)) for _, m in records)
+        original = sum(
+            m.get("wav_bytes") or os.path.getsize(self.audio_path(m))
+            for _, m in records
+        )
+        return {
+            "recordings": len(records),
+            "stored_bytes": stored,
+            "wav_bytes": original,
+            "saved_bytes": original - stored,
+            "budget_bytes": self._budget_bytes(),
+        }
+
+    @staticmethod
+    def _budget_bytes() -> int:
+        return int(float(settings_store.get("SAVED_RECORDINGS_MAX_MB") or 0) * 1e6)
+
+    def _evictable(self, recording_id: str, meta: dict) -> bool:
+        with self._lock:
+            if recording_id in self._checked_out:
+                return False
+        return not self.is_pending(meta)
+
+    def enforce_budget(self, keep: str | None = None) -> list[str]:
+        """Evict recordings past the age limit, then oldest-first to fit the budget.
+
+        `keep` is never evicted.  Returns the evicted recording IDs.  A
+        limit of 0 means no limit.
+        """
+        budget = self._budget_bytes()
+        max_days = float(settings_store.get("SAVED_RECORDINGS_MAX_DAYS") or 0)
+        records = sorted(self.list_recordings(), key=lambda r: r[1].get("saved_at", ""))
+        sizes = {rid: os.path.getsize(self.audio_path(m)) for rid, m in records}
+        total = sum(sizes.values())
+        now = datetime.now()
+
+        evicted = []
+        for recording_id, meta in records:
+            too_old = False
+            if max_days:
+                try:
+                    saved_at = datetime.fromisoformat(meta.get("saved_at", ""))
+                    too_old = (now - saved_at).total_seconds() > max_days * 86400
+                except ValueError:
+                    pass
+            over_budget = budget and total > budget
+            if not (too_old or over_budget):
+                continue
+            if recording_id == keep or not self._evictable(recording_id, meta):
+                continue
+            self.remove(self.meta_path(recording_id))
+            total -= sizes[recording_id]
+            evicted.append(recording_id)
+            reason = "older than the age limit" if too_old else "over the disk budget"
+            print(f"[SavedStore] Evicted {recording_id} ({reason})")
+        if budget and total > budget:
+            print(
+                f"[SavedStore] {total / 1e6:.1f} MB stored, over the "
+                f"{budget / 1e6:.1f} MB budget, but the rest have pending jobs"
+            )
+        return evicted
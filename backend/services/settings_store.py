@@ -0,0 +1,154 @@
+"""Cached access to the backend's .env settings.
+
+The file is parsed once and re-parsed only when its mtime/size changes
+(checked at most once per STAT_INTERVAL), so reads on hot paths are
+in-memory lookups.  Writes go to a temp file that is atomically renamed
+over .env.  Other caches (Google credentials, API clients) subscribe to
+the keys they depend on and are told when those keys change.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+from dotenv import dotenv_values
+
+ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env")
+
+# How often to stat() the file for external edits
+STAT_INTERVAL = 1.0
+
+ChangeCallback = Callable[[set[str]], None]
+
+
+class SettingsStore:
+    def __init__(self, env_path: str, export_env: bool = True):
+        """`export_env` marks the app's own .env: updates are mirrored into
+        os.environ and the Google path defaults are always written.  Other
+        stores (e.g. per-user settings in team mode) keep to their file.
+        """
+        self.env_path = env_path
+        self.export_env = export_env
+        self._lock = threading.RLock()
+        self._values: dict[str, str] = {}
+        self._signature: tuple[int, int] | None = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._subscribers: list[tuple[set[str] | None, ChangeCallback]] = []
+
+    # ---- Reading ----
+
+    def _file_signature(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self.env_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _refresh(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < STAT_INTERVAL:
+            return
+        with self._lock:
+            self._checked_at = now
+            signature = self._file_signature()
+            if self._loaded and signature == self._signature and not force:
+                return
+            values = {}
+            if signature is not None:
+                values = {
+                    k: v for k, v in dotenv_values(self.env_path).items()
+                    if v is not None
+                }
+            changed = {
+                k for k in values.keys() | self._values.keys()
+                if values.get(k) != self._values.get(k)
+            }
+            first_load = not self._loaded
+            self._values = values
+            self._signature = signature
+            self._loaded = True
+        if changed and not first_load:
+            self._notify(changed)
+
+    def all(self) -> dict[str, str]:
+        """Return a copy of the values currently in .env."""
+        self._refresh()
+        return dict(self._values)
+
+    def get(self, key: str, default: str = "") -> str:
+        """Look up a setting: .env first, then the process environment."""
+        self._refresh()
+        value = self._values.get(key)
+        if value:
+            return value
+        return os.environ.get(key, default) or default
+
+    def resolve_path(self, key: str, default: str) -> str:
+        """Read a path setting, resolving relative paths against .env's dir."""
+        path = self.get(key, default)
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(self.env_path), path)
+        return path
+
+    # ---- Writing ----
+
+    def update(self, values: dict[str, str]):
+        """Merge `values` into .env atomically (temp file + rename)."""
+        with self._lock:
+            self._refresh(force=True)
+            merged = dict(self._values)
+            merged.update(values)
+
+            if self.export_env:
+                # Always include these defaults
+                merged.setdefault("GOOGLE_CREDENTIALS_PATH", "./credentials.json")
+                merged.setdefault("GOOGLE_TOKEN_PATH", "./token.json")
+
+            content = "".join(f"{k}={v}\n" for k, v in merged.items())
+            env_dir = os.path.dirname(self.env_path) or "."
+            fd, tmp_path = tempfile.mkstemp(prefix=".env.", dir=env_dir)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.env_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            # Keep os.getenv() callers (and child processes) in sync
+            if self.export_env:
+                for key, val in values.items():
+                    os.environ[key] = val
+
+        self._refresh(force=True)
+
+    # ---- Change notification ----
+
+    def subscribe(self, callback: ChangeCallback, keys: Iterable[str] | None = None):
+        """Call `callback(changed_keys)` when any of `keys` (or any key) changes."""
+        self._subscribers.append((set(keys) if keys is not None else None, callback))
+
+    def notify(self, keys: Iterable[str]):
+        """Tell subscribers that something derived from `keys` changed.
+
+        Used when a file a setting points at (e.g. credentials.json) is
+        replaced without the setting itself changing.
+        """
+        self._notify(set(keys))
+
+    def _notify(self, changed: set[str]):
+        for keys, callback in list(self._subscribers):
+            if keys is None or keys & changed:
+                try:
+                    callback(changed)
+                except Exception as e:
+                    print(f"[Settings] Change callback failed: {e}")
+
+
+settings_store = SettingsStore(ENV_PATH)
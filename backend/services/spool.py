@@ -0,0 +1,19 @@
+"""Names of a recording's checkpoint spool files.
+
+Captured PCM is appended to spool files next to the output WAV and
+fsync'ed every checkpoint interval (see services.audio_capture), so a
+crash loses at most one interval.  Kept free of heavy imports: startup
+lists the orphaned spools before the server takes its first request.
+"""
+
+import glob
+import os
+
+SPOOL_META_SUFFIX = ".spool.json"
+MIC_SPOOL_SUFFIX = ".mic.pcm"
+SYSTEM_SPOOL_SUFFIX = ".system.pcm"
+
+
+def find_orphaned_spools(output_dir: str) -> list[str]:
+    """Return spool metadata files left behind by an interrupted recording."""
+    return sorted(glob.glob(os.path.join(output_dir, f"*{SPOOL_META_SUFFIX}")))
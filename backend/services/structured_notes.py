@@ -0,0 +1,189 @@
+"""Meeting notes as structured JSON, rendered to Markdown locally.
+
+The model only writes the content of the notes — purpose, discussion
+points, challenges, decisions and next steps — as JSON under NOTES_SCHEMA.
+Headings, date, attendees and the ``[[transcript]]`` link are filled in
+here from data we already have, so they cost no output tokens and can't
+come back malformed.  Each section is validated on its own, so a bad
+section can be re-requested without regenerating the others.
+"""
+
+import json
+from datetime import datetime
+
+_STRING = {"type": "string"}
+_STRING_LIST = {"type": "array", "items": _STRING}
+
+# Section name → (schema, heading, prompt description)
+NOTE_SECTIONS = {
+    "purpose": (
+        _STRING,
+        "Meeting Purpose",
+        "1-2 sentences summarizing why this meeting was held",
+    ),
+    "discussion_points": (
+        {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"topic": _STRING, "details": _STRING_LIST},
+                "required": ["topic", "details"],
+            },
+        },
+        "Key Discussion Points",
+        "main topics discussed, each with a short list of details",
+    ),
+    "challenges": (
+        _STRING_LIST,
+        "Challenges & Concerns",
+        "problems, blockers or concerns raised",
+    ),
+    "decisions": (
+        _STRING_LIST,
+        "Goals & Decisions",
+        "decisions made or goals agreed upon",
+    ),
+    "next_steps": (
+        {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"action": _STRING, "owner": _STRING},
+                "required": ["action", "owner"],
+            },
+        },
+        "Next Steps",
+        'action items, with the responsible person as owner ("" if unknown)',
+    ),
+}
+
+NOTES_SCHEMA = {
+    "type": "object",
+    "properties": {name: spec[0] for name, spec in NOTE_SECTIONS.items()},
+    "required": list(NOTE_SECTIONS),
+}
+
+
+def section_schema(name: str) -> dict:
+    """Schema for re-requesting a single section."""
+    return {
+        "type": "object",
+        "properties": {name: NOTE_SECTIONS[name][0]},
+        "required": [name],
+    }
+
+
+def describe_sections(names=None) -> str:
+    """Bullet list of the JSON fields to fill in, for prompts."""
+    return "\n".join(
+        f"- {name}: {NOTE_SECTIONS[name][2]}" for name in (names or NOTE_SECTIONS)
+    )
+
+
+def _clean_str(value) -> str | None:
+    if not isinstance(value, str):
+        return None
+    return value.strip()
+
+
+def _validate_section(name: str, value):
+    """Return the cleaned section value, or None if it doesn't validate."""
+    if name == "purpose":
+        text = _clean_str(value)
+        return text or None
+    if not isinstance(value, list):
+        return None
+    cleaned = []
+    for item in value:
+        if name == "discussion_points":
+            if not isinstance(item, dict) or not _clean_str(item.get("topic")):
+                return None
+            details = item.get("details", [])
+            if not isinstance(details, list):
+                return None
+            cleaned.append(
+                {
+                    "topic": item["topic"].strip(),
+                    "details": [d.strip() for d in details if _clean_str(d)],
+                }
+            )
+        elif name == "next_steps":
+            if not isinstance(item, dict) or not _clean_str(item.get("action")):
+                return None
+            cleaned.append(
+                {
+                    "action": item["action"].strip(),
+                    "owner": _clean_str(item.get("owner")) or "",
+                }
+            )
+        else:
+            text = _clean_str(item)
+            if text is None:
+                return None
+            if text:
+                cleaned.append(text)
+    return cleaned
+
+
+def parse_notes(
+    response_text: str, sections: list[str] | None = None
+) -> tuple[dict, list[str]]:
+    """Parse a notes response into (valid sections, invalid section names).
+
+    Only `sections` are checked if given (for a single-section retry).
+    """
+    sections = sections or list(NOTE_SECTIONS)
+    try:
+        data = json.loads(response_text)
+    except (json.JSONDecodeError, TypeError):
+        data = None
+    if not isinstance(data, dict):
+        return {}, sections
+    notes, invalid = {}, []
+    for name in sections:
+        value = _validate_section(name, data.get(name))
+        if value is None:
+            invalid.append(name)
+        else:
+            notes[name] = value
+    return notes, invalid
+
+
+def _format_date(value: str) -> str:
+    try:
+        return datetime.fromisoformat(value).strftime("%B %-d, %Y, %-I:%M %p")
+    except (TypeError, ValueError):
+        return value or "Unknown"
+
+
+def render_notes(notes: dict, meeting_info: dict, transcript_filename: str) -> str:
+    """Render structured notes as the Obsidian Markdown document."""
+    title = meeting_info.get("title", "Untitled Meeting")
+    attendees = ", ".join(a["name"] for a in meeting_info.get("attendees", []))
+    lines = [
+        f"## {title}",
+        "",
+        f"**Date**: {_format_date(meeting_info.get('start', ''))}",
+        f"**Attendees**: {attendees or 'Unknown'}",
+    ]
+
+    for name, (_, heading, _) in NOTE_SECTIONS.items():
+        value = notes.get(name)
+        lines += ["", f"### {heading}"]
+        if name == "purpose":
+            lines.append(value or "_Not available._")
+        elif not value:
+            lines.append("- None noted")
+        elif name == "discussion_points":
+            for point in value:
+                lines.append(f"- {point['topic']}")
+                lines += [f"  - {detail}" for detail in point["details"]]
+        elif name == "next_steps":
+            for step in value:
+                owner = f" — **{step['owner']}**" if step["owner"] else ""
+                lines.append(f"- {step['action']}{owner}")
+        else:
+            lines += [f"- {item}" for item in value]
+
+    lines += ["", "### Raw Transcript", f"[[{transcript_filename}]]", ""]
+    return "\n".join(lines)
@@ -0,0 +1,169 @@
+"""Users of a shared team-mode server and their private stores.
+
+Each user gets a directory under TEAM_DATA_DIR (default backend/tenants/)
+holding their own settings (.env), Google token, Drive sync state,
+transcripts, notes and uploads:
+
+    tenants/
+      tokens.json           sha256(API token) → user ID
+      <user>/.env           per-user overrides of USER_SETTING_KEYS
+      <user>/token.json     Google OAuth token (uploaded by the user)
+      <user>/transcripts/  <user>/notes/  <user>/uploads/  <user>/jobs/
+
+Users are added from the command line, which prints their API token once:
+
+    python -m services.tenants add alice
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import secrets
+import tempfile
+import threading
+from pathlib import Path
+
+from services.settings_store import SettingsStore, settings_store
+
+DEFAULT_TEAM_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "tenants"
+)
+# Settings a user may set for themselves; everything else is server-wide
+USER_SETTING_KEYS = ("GEMINI_API_KEY", "DRIVE_FOLDER_NAME", "NOTE_TEMPLATES")
+
+_USER_ID_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def team_data_dir() -> str:
+    return settings_store.resolve_path("TEAM_DATA_DIR", DEFAULT_TEAM_DATA_DIR)
+
+
+class Tenant:
+    def __init__(self, user_id: str, root: str):
+        self.user_id = user_id
+        self.dir = os.path.join(root, user_id)
+        self.transcript_dir = os.path.join(self.dir, "transcripts")
+        self.notes_dir = os.path.join(self.dir, "notes")
+        self.uploads_dir = os.path.join(self.dir, "uploads")
+        self.jobs_dir = os.path.join(self.dir, "jobs")
+        self.token_path = os.path.join(self.dir, "token.json")
+        for path in (self.transcript_dir, self.notes_dir, self.uploads_dir, self.jobs_dir):
+            os.makedirs(path, exist_ok=True)
+        self.settings = SettingsStore(os.path.join(self.dir, ".env"), export_env=False)
+
+    def get(self, key: str, default: str = "") -> str:
+        """The user's own value for `key`, else the server's."""
+        if key in USER_SETTING_KEYS:
+            value = self.settings.all().get(key)
+            if value:
+                return value
+        return settings_store.get(key, default)
+
+    def update_settings(self, values: dict[str, str]) -> list[str]:
+        """Save the allowed keys from `values`; return the keys that were ignored."""
+        allowed = {k: v for k, v in values.items() if k in USER_SETTING_KEYS}
+        if allowed:
+            self.settings.update(allowed)
+        return sorted(set(values) - set(allowed))
+
+    def pipeline_config(self) -> dict:
+        """Config for services.pipeline.run_pipeline, isolated to this user."""
+        from services.note_templates import enabled_templates
+
+        return {
+            "api_key": self.get("GEMINI_API_KEY"),
+            "provider": settings_store.get("AI_PROVIDER", "gemini"),
+            "transcript_dir": self.transcript_dir,
+            "notes_dir": self.notes_dir,
+            "note_templates": enabled_templates(self.get("NOTE_TEMPLATES")),
+            "drive": {
+                "credentials_path": settings_store.resolve_path(
+                    "GOOGLE_CREDENTIALS_PATH", "./credentials.json"
+                ),
+                "token_path": self.token_path,
+                "folder_name": self.get("DRIVE_FOLDER_NAME", "notes"),
+                "state_path": os.path.join(self.dir, "drive-sync.json"),
+                # Workers can't run an OAuth flow; skip Drive until the
+                # user has uploaded a token
+                "require_token": True,
+            },
+        }
+
+
+class TenantRegistry:
+    def __init__(self, root: str):
+        self.root = root
+        self.tokens_path = os.path.join(root, "tokens.json")
+        self._lock = threading.Lock()
+        self._tenants: dict[str, Tenant] = {}
+
+    def _load_tokens(self) -> dict[str, str]:
+        try:
+            return json.loads(Path(self.tokens_path).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def add_user(self, user_id: str) -> str:
+        """Register `user_id` (or issue them a new token); return the token."""
+        if not _USER_ID_RE.match(user_id):
+            raise ValueError(f"Invalid user ID {user_id!r}")
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            tokens = {
+                h: uid for h, uid in self._load_tokens().items() if uid != user_id
+            }
+            tokens[_hash_token(token)] = user_id
+            os.makedirs(self.root, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".tokens.", dir=self.root)
+            with os.fdopen(fd, "w") as f:
+                json.dump(tokens, f, indent=2)
+            os.replace(tmp_path, self.tokens_path)
+        self.tenant(user_id)
+        return token
+
+    def user_ids(self) -> list[str]:
+        return sorted(set(self._load_tokens().values()))
+
+    def authenticate(self, token: str) -> Tenant | None:
+        user_id = self._load_tokens().get(_hash_token(token)) if token else None
+        return self.tenant(user_id) if user_id else None
+
+    def tenant(self, user_id: str) -> Tenant:
+        with self._lock:
+            tenant = self._tenants.get(user_id)
+            if tenant is None:
+                tenant = Tenant(user_id, self.root)
+                self._tenants[user_id] = tenant
+            return tenant
+
+
+_registry: TenantRegistry | None = None
+
+
+def get_registry() -> TenantRegistry:
+    global _registry
+    if _registry is None or _registry.root != team_data_dir():
+        _registry = TenantRegistry(team_data_dir())
+    return _registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage team-mode users")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="Add a user (or rotate their token)")
+    add.add_argument("user_id")
+    args = parser.parse_args()
+
+    if args.command == "add":
+        token = get_registry().add_user(args.user_id)
+        print(f"API token for {args.user_id} (shown once): {token}")
+
+
+if __name__ == "__main__":
+    main()
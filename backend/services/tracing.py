@@ -0,0 +1,306 @@
+"""Lightweight span tracing for recording jobs.
+
+Each recording job gets a trace: a root span covering the whole job with
+nested spans for its steps (stop → checkpoint, mix; transcribe → upload,
+wait_active, generate → attempt; save; drive_upload; ...).  Spans carry
+attributes such as bytes, attempt numbers and errors.
+
+    root = tracing.new_trace("recording", title=title)
+    with tracing.activate(root):
+        with tracing.span("mix", mode=mode) as span:
+            ...
+            span.set(samples=n)
+    root.end()
+
+Finished spans are appended as JSON lines to TRACE_DIR/traces.jsonl
+(team-mode worker processes write traces.<worker>.jsonl), rotated at
+TRACE_MAX_MB with TRACE_BACKUPS old files kept.  get_trace() collects a
+trace's spans from those files, including the finished steps of a job
+that is still running.
+
+With TRACING=0, new_trace() returns a no-op span and nothing is ever
+current, so span() costs one context-variable lookup.  The current span
+is a contextvar: threads started for a job need in_current_context() to
+see it (asyncio tasks and FastAPI's threadpool copy it already).
+"""
+
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from contextlib import contextmanager
+from datetime import datetime
+
+from services.settings_store import settings_store
+
+DEFAULT_TRACE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "traces")
+DEFAULT_TRACE_MAX_MB = 10
+DEFAULT_TRACE_BACKUPS = 3
+
+_current: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attrs: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.span_id = uuid.uuid4().hex[:12]
+        self.attrs = attrs
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.error: str | None = None
+        self._ended = False
+
+    def __bool__(self) -> bool:
+        return True
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def fail(self, error: BaseException | str):
+        self.error = str(error) or type(error).__name__
+
+    def end(self, error: BaseException | str | None = None):
+        if self._ended:
+            return
+        self._ended = True
+        if error is not None:
+            self.fail(error)
+        get_exporter().export(
+            {
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "start": datetime.fromtimestamp(self.started_at).isoformat(),
+                "duration_ms": round((time.perf_counter() - self._t0) * 1000, 2),
+                "status": "error" if self.error else "ok",
+                "error": self.error,
+                "attrs": self.attrs,
+            }
+        )
+
+    # Used by span(): entered as the current span, ended on exit
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        self.end(exc)
+        return False
+
+
+class _NoopSpan:
+    """Returned when tracing is off or no trace is active."""
+
+    trace_id = None
+    span_id = None
+
+    def __bool__(self) -> bool:
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def fail(self, error):
+        pass
+
+    def end(self, error=None):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def enabled() -> bool:
+    return settings_store.get("TRACING", "1") != "0"
+
+
+def new_trace(name: str, trace_id: str | None = None, **attrs) -> Span | _NoopSpan:
+    """Start a trace's root span (not yet current: see activate())."""
+    if not enabled():
+        return NOOP_SPAN
+    return Span(name, trace_id or uuid.uuid4().hex[:16], None, attrs)
+
+
+@contextmanager
+def activate(span: Span | _NoopSpan):
+    """Make `span` the parent of spans opened in this context, without ending it."""
+    if not span:
+        yield span
+        return
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _current.reset(token)
+
+
+def span(name: str, **attrs) -> Span | _NoopSpan:
+    """A child of the current span, ended when the with-block exits.
+
+    Outside a trace this is the no-op span.
+    """
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, attrs)
+
+
+def current_trace_id() -> str | None:
+    parent = _current.get()
+    return parent.trace_id if parent is not None else None
+
+
+def in_current_context(fn: Callable) -> Callable:
+    """Wrap `fn` to run with the caller's current span (for worker threads)."""
+    if _current.get() is None:
+        return fn
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+
+# ---- Export ----
+
+
+class JsonlExporter:
+    """Append span records to a JSONL file, rotating it by size."""
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+    def export(self, record: dict):
+        line = json.dumps(record, default=str) + "\n"
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                try:
+                    size = os.path.getsize(self.path)
+                except FileNotFoundError:
+                    size = 0
+                if size and size + len(line) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, "a") as f:
+                    f.write(line)
+        except OSError as e:
+            print(f"[Tracing] Could not write span: {e}")
+
+    def _rotate(self):
+        """traces.jsonl → .1 → .2 ...; the oldest beyond `backups` is dropped."""
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+_exporter: JsonlExporter | None = None
+_exporter_lock = threading.Lock()
+_process_name: str | None = None
+
+
+def trace_dir() -> str:
+    return settings_store.resolve_path("TRACE_DIR", DEFAULT_TRACE_DIR)
+
+
+def get_exporter() -> JsonlExporter:
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            filename = f"traces.{_process_name}.jsonl" if _process_name else "traces.jsonl"
+            _exporter = JsonlExporter(
+                os.path.join(trace_dir(), filename),
+                int(
+                    float(settings_store.get("TRACE_MAX_MB") or DEFAULT_TRACE_MAX_MB)
+                    * 1e6
+                ),
+                int(settings_store.get("TRACE_BACKUPS") or DEFAULT_TRACE_BACKUPS),
+            )
+        return _exporter
+
+
+def set_process_name(name: str):
+    """Give this process its own trace file (processes don't share one)."""
+    global _exporter, _process_name
+    with _exporter_lock:
+        _process_name = name
+        _exporter = None
+
+
+def _reset_exporter(_changed_keys=None):
+    global _exporter
+    with _exporter_lock:
+        _exporter = None
+
+
+settings_store.subscribe(_reset_exporter, ["TRACE_DIR", "TRACE_MAX_MB", "TRACE_BACKUPS"])
+
+
+# ---- Lookup ----
+
+
+def _trace_files() -> list[str]:
+    return glob.glob(os.path.join(trace_dir(), "traces*.jsonl*"))
+
+
+def _read_spans(needle: str):
+    """Span records whose line contains `needle`, from every trace file.
+
+    A torn line (a crash mid-append, or another process still writing) is
+    skipped on its own; the rest of its file is still read.
+    """
+    for path in _trace_files():
+        try:
+            with open(path) as f:
+                for line in f:
+                    if needle not in line:
+                        continue
+                    try:
+                        span = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    yield span
+        except OSError:
+            continue
+
+
+def get_trace(trace_id: str) -> list[dict]:
+    """Every exported span of a trace, in start order, with its depth."""
+    needle = f'"trace_id": "{trace_id}"'
+    spans = list(_read_spans(needle))
+    spans.sort(key=lambda s: s["start"])
+
+    parents = {s["span_id"]: s["parent_id"] for s in spans}
+    for s in spans:
+        depth, parent = 0, s["parent_id"]
+        while parent in parents and depth < 32:
+            depth, parent = depth + 1, parents[parent]
+        s["depth"] = depth
+    return spans
+
+
+def list_traces(limit: int = 20) -> list[dict]:
+    """Root spans of the most recently finished traces, newest first."""
+    roots = list(_read_spans('"parent_id": null'))
+    roots.sort(key=lambda s: s["start"], reverse=True)
+    return roots[:limit]
@@ -0,0 +1,93 @@
+"""Deterministic transcript clean-up and token estimation.
+
+Run before a transcript is sent for note generation.  Compaction only drops
+content that carries no meaning for the notes (filler words, repeated
+speaker labels, redundant timestamps), so running it twice is a no-op.
+"""
+
+import math
+import re
+
+# Rough characters-per-token ratio for English text with Gemini tokenizers.
+CHARS_PER_TOKEN = 4
+
+# Keep at most one timestamp per this many seconds of conversation.
+TIMESTAMP_MIN_GAP_SECONDS = 60
+
+_FILLER_RE = re.compile(
+    r"(?:(?<=\s)|(?<=^))(?:uh-huh|mm+-?hmm+|u+m+|u+h+|e+r+m+|h+m+)\b[,.]?\s*",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# "[00:01:05]", "(1:05)", "00:01:05 -", "1:05:" at the start of a line
+_TIMESTAMP_RE = re.compile(
+    r"^\s*[\[(]?(?:(\d{1,2}):)?(\d{1,2}):(\d{2})[\])]?\s*[-:–]?\s*"
+)
+
+# "Speaker 1: text" or "**Alice**: text" / "**Alice:** text"
+_SPEAKER_RE = re.compile(r"^\**([A-Z][\w .'-]{0,40}?)(?::\**|\**:)\s*(.*)$")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, deterministic token estimate for budgeting."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _format_timestamp(seconds: int) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"[{hours}:{minutes:02d}:{secs:02d}]"
+    return f"[{minutes:02d}:{secs:02d}]"
+
+
+def compact_transcript(transcript: str) -> str:
+    """Remove filler, merge same-speaker lines and normalize timestamps."""
+    turns: list[list[str]] = []  # [timestamp, speaker, text]
+    pending_ts = ""
+    pending_speaker = ""
+    last_kept_ts: int | None = None
+
+    for raw_line in transcript.splitlines():
+        line = re.sub(r"[ \t]+", " ", _FILLER_RE.sub("", raw_line)).strip()
+        if not line:
+            continue
+
+        ts_match = _TIMESTAMP_RE.match(line)
+        if ts_match:
+            hours, minutes, secs = ts_match.groups()
+            seconds = int(hours or 0) * 3600 + int(minutes) * 60 + int(secs)
+            line = line[ts_match.end():].strip()
+            if (
+                last_kept_ts is None
+                or seconds - last_kept_ts >= TIMESTAMP_MIN_GAP_SECONDS
+            ):
+                pending_ts = _format_timestamp(seconds)
+                last_kept_ts = seconds
+
+        sp_match = _SPEAKER_RE.match(line)
+        if sp_match:
+            pending_speaker = sp_match.group(1).strip()
+            line = sp_match.group(2).strip()
+
+        if not line:
+            # Bare timestamp or speaker label: applies to the next text line
+            continue
+
+        speaker = pending_speaker
+        if (
+            turns
+            and not pending_ts
+            and (not speaker or speaker == turns[-1][1])
+        ):
+            turns[-1][2] += " " + line
+        else:
+            turns.append([pending_ts, speaker, line])
+        pending_ts = pending_speaker = ""
+
+    lines = []
+    for timestamp, speaker, text in turns:
+        prefix = f"{timestamp} " if timestamp else ""
+        label = f"{speaker}: " if speaker else ""
+        lines.append(f"{prefix}{label}{text}")
+    return "\n".join(lines) + ("\n" if lines else "")
@@ -0,0 +1,293 @@
+"""Structured transcript segments and their on-disk index.
+
+Transcription asks the model for JSON segments (start/end offsets in
+seconds, speaker, text) under TRANSCRIPT_SCHEMA.  Alongside the Markdown
+transcript they are stored as two sidecar files:
+
+- ``<transcript>.segments.jsonl`` — a header line
+  ``{"version": 1, "speakers": [...]}`` followed by one compact
+  ``[start, end, speaker_index, text]`` array per segment, sorted by start;
+- ``<transcript>.segments.idx`` — a fixed-width little-endian record per
+  segment (start_ms, end_ms, speaker_index, byte offset into the .jsonl).
+
+TranscriptIndex memory-maps the .idx, so finding the segment at a given
+time is a binary search and pulling out one speaker's turns reads only
+those lines of the .jsonl.
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+
+SEGMENTS_SUFFIX = ".segments.jsonl"
+INDEX_SUFFIX = ".segments.idx"
+SEGMENTS_VERSION = 1
+
+TRANSCRIPT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "segments": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "start": {"type": "number"},
+                    "end": {"type": "number"},
+                    "speaker": {"type": "string"},
+                    "text": {"type": "string"},
+                },
+                "required": ["start", "end", "speaker", "text"],
+            },
+        }
+    },
+    "required": ["segments"],
+}
+
+INDEX_DTYPE = np.dtype(
+    [("start_ms", "<u4"), ("end_ms", "<u4"), ("speaker", "<u2"), ("offset", "<u8")]
+)
+
+# "[00:01:23] Speaker 1: text" / "(1:23) Me: text" / "Alice: text"
+_TEXT_LINE_RE = re.compile(
+    r"^\s*(?:[\[(]?(?:(\d{1,2}):)?(\d{1,2}):(\d{2})[\])]?\s*)?"
+    r"(?:\**([A-Z][\w .'-]{0,40}?)\**\s*:\s*)?(.*)$"
+)
+
+
+def _ms(seconds: float) -> int:
+    """Seconds → milliseconds, clamped to the index's uint32 range."""
+    return int(min(max(seconds, 0.0), 0xFFFFFFFF / 1000) * 1000)
+
+
+def format_offset(seconds: float) -> str:
+    total = int(seconds)
+    return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
+
+
+def _normalize(segments: list[dict]) -> list[dict]:
+    """Drop empty segments, coerce types and sort by start time."""
+    cleaned = []
+    for seg in segments:
+        text = str(seg.get("text", "")).strip()
+        if not text:
+            continue
+        try:
+            start = max(0.0, float(seg.get("start", 0)))
+            end = float(seg.get("end", start))
+        except (TypeError, ValueError):
+            continue
+        cleaned.append(
+            {
+                "start": start,
+                "end": max(start, end),
+                "speaker": str(seg.get("speaker") or "Unknown").strip(),
+                "text": text,
+            }
+        )
+    cleaned.sort(key=lambda s: s["start"])
+    return cleaned
+
+
+def segments_from_text(text: str) -> list[dict]:
+    """Best-effort segments from a plain-text transcript.
+
+    Timestamped lines start a segment at that time; lines without one
+    continue at the last time seen.  Each segment ends where the next
+    one starts.
+    """
+    segments: list[dict] = []
+    seconds = 0.0
+    speaker = "Unknown"
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        match = _TEXT_LINE_RE.match(line)
+        hours, minutes, secs, label, body = match.groups()
+        if minutes is not None:
+            seconds = float(int(hours or 0) * 3600 + int(minutes) * 60 + int(secs))
+        if label:
+            speaker = label.strip()
+        if body.strip():
+            segments.append(
+                {"start": seconds, "end": seconds, "speaker": speaker, "text": body}
+            )
+    for seg, nxt in zip(segments, segments[1:]):
+        seg["end"] = max(seg["start"], nxt["start"])
+    return _normalize(segments)
+
+
+def parse_segments(response_text: str) -> tuple[list[dict], bool]:
+    """Parse a structured transcription response into (segments, truncated).
+
+    Output cut off mid-JSON (e.g. at the model's output limit) keeps every
+    complete segment before the cut and is flagged as truncated: the rest
+    of the recording is missing.  A response that isn't JSON at all is
+    parsed as a plain-text transcript.
+    """
+    try:
+        data = json.loads(response_text)
+    except json.JSONDecodeError:
+        data = None
+    if isinstance(data, dict):
+        data = data.get("segments")
+    if isinstance(data, list):
+        return _normalize([s for s in data if isinstance(s, dict)]), False
+
+    key = response_text.find('"segments"')
+    start = response_text.find("[", key) if key >= 0 else -1
+    if start < 0:
+        return segments_from_text(response_text), False
+    decoder = json.JSONDecoder()
+    items = []
+    pos = start + 1
+    while True:
+        while pos < len(response_text) and response_text[pos] in " \t\r\n,":
+            pos += 1
+        try:
+            item, pos = decoder.raw_decode(response_text, pos)
+        except json.JSONDecodeError:
+            break
+        if isinstance(item, dict):
+            items.append(item)
+    print(f"[TranscriptIndex] Recovered {len(items)} segments from truncated JSON")
+    return _normalize(items), True
+
+
+def segments_to_text(segments: list[dict]) -> str:
+    """Render segments as "[HH:MM:SS] Speaker: text" lines."""
+    return "".join(
+        f"[{format_offset(s['start'])}] {s['speaker']}: {s['text']}\n"
+        for s in segments
+    )
+
+
+def write_segments(segments: list[dict], base_path: str):
+    """Write the .segments.jsonl sidecar and its .segments.idx index."""
+    segments = _normalize(segments)
+    speakers: list[str] = []
+    speaker_ids: dict[str, int] = {}
+    index = np.zeros(len(segments), dtype=INDEX_DTYPE)
+
+    with open(base_path + SEGMENTS_SUFFIX, "wb") as f:
+        header = {"version": SEGMENTS_VERSION, "speakers": speakers}
+        lines = []
+        for i, seg in enumerate(segments):
+            speaker_id = speaker_ids.setdefault(seg["speaker"], len(speakers))
+            if speaker_id == len(speakers):
+                speakers.append(seg["speaker"])
+            line = json.dumps(
+                [round(seg["start"], 2), round(seg["end"], 2), speaker_id, seg["text"]],
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode()
+            lines.append(line)
+            index[i] = (
+                int(seg["start"] * 1000),
+                int(seg["end"] * 1000),
+                speaker_id,
+                0,
+            )
+        header_line = json.dumps(header, ensure_ascii=False).encode() + b"\n"
+        f.write(header_line)
+        offset = len(header_line)
+        for i, line in enumerate(lines):
+            index["offset"][i] = offset
+            f.write(line + b"\n")
+            offset += len(line) + 1
+
+    index.tofile(base_path + INDEX_SUFFIX)
+
+
+class TranscriptIndex:
+    """Random access to a transcript's segments by time or speaker."""
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        self.segments_path = base_path + SEGMENTS_SUFFIX
+        index_path = base_path + INDEX_SUFFIX
+        with open(self.segments_path, "rb") as f:
+            header = json.loads(f.readline())
+        self.speakers: list[str] = header["speakers"]
+
+        if not os.path.exists(index_path) or os.path.getmtime(
+            index_path
+        ) < os.path.getmtime(self.segments_path):
+            self._rebuild_index(index_path)
+        if os.path.getsize(index_path):
+            self._index = np.memmap(index_path, dtype=INDEX_DTYPE, mode="r")
+        else:
+            self._index = np.zeros(0, dtype=INDEX_DTYPE)
+
+    def _rebuild_index(self, index_path: str):
+        """Recreate a missing or stale .idx from the .jsonl."""
+        records = []
+        with open(self.segments_path, "rb") as f:
+            offset = len(f.readline())
+            for line in f:
+                start, end, speaker_id, _ = json.loads(line)
+                records.append((int(start * 1000), int(end * 1000), speaker_id, offset))
+                offset += len(line)
+        np.array(records, dtype=INDEX_DTYPE).tofile(index_path)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _read(self, positions) -> list[dict]:
+        segments = []
+        with open(self.segments_path, "rb") as f:
+            for i in positions:
+                f.seek(int(self._index["offset"][i]))
+                start, end, speaker_id, text = json.loads(f.readline())
+                segments.append(
+                    {
+                        "start": start,
+                        "end": end,
+                        "speaker": self.speakers[speaker_id],
+                        "text": text,
+                    }
+                )
+        return segments
+
+    def segment(self, i: int) -> dict:
+        return self._read([i])[0]
+
+    def position_at(self, seconds: float) -> int | None:
+        """Index of the last segment starting at or before `seconds`."""
+        starts = self._index["start_ms"]
+        i = int(np.searchsorted(starts, _ms(seconds), side="right")) - 1
+        return i if i >= 0 else None
+
+    def segment_at(self, seconds: float) -> dict | None:
+        """The segment being spoken at `seconds`, if any."""
+        i = self.position_at(seconds)
+        if i is None or self._index["end_ms"][i] < _ms(seconds):
+            return None
+        return self.segment(i)
+
+    def between(self, start: float = 0.0, end: float | None = None) -> list[dict]:
+        """Segments starting in [start, end) (to the end if `end` is None)."""
+        starts = self._index["start_ms"]
+        lo = int(np.searchsorted(starts, _ms(start), side="left"))
+        hi = len(starts)
+        if end is not None:
+            hi = int(np.searchsorted(starts, _ms(end), side="left"))
+        return self._read(range(lo, hi))
+
+    def by_speaker(self, speaker: str) -> list[dict]:
+        """All of one speaker's segments, in time order."""
+        if speaker not in self.speakers:
+            return []
+        speaker_id = self.speakers.index(speaker)
+        return self._read(np.flatnonzero(self._index["speaker"] == speaker_id))
+
+    def speaker_seconds(self) -> dict[str, float]:
+        """Total speaking time per speaker."""
+        durations = (
+            self._index["end_ms"].astype(np.int64) - self._index["start_ms"]
+        ) / 1000
+        totals = np.bincount(
+            self._index["speaker"], weights=durations, minlength=len(self.speakers)
+        )
+        return {name: round(float(t), 1) for name, t in zip(self.speakers, totals)}
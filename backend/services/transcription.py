@@ -1,75 +1,169 @@
 import os
-import time
-
-from google import genai
-
-# 10-minute timeout for large audio files (default is 60s which is
-# too short for 1-hour+ recordings).
-GEMINI_TIMEOUT = 600_000  # 10 minutes in milliseconds (SDK uses ms)
+import tempfile
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from services import tracing
+from services.ai_provider import AIProvider, get_provider
+from services.transcript_index import (
+    TRANSCRIPT_SCHEMA,
+    parse_segments,
+    segments_to_text,
+    write_segments,
+)
+
+# Transcripts are requested as JSON segments (see TRANSCRIPT_SCHEMA) and
+# rendered to "[HH:MM:SS] Speaker: text" lines for the Markdown file.
+_SEGMENT_INSTRUCTIONS = (
+    "Return JSON segments. Each segment has `start` and `end` (seconds "
+    "from the beginning of the recording), `speaker` and `text`. Start a "
+    "new segment whenever the speaker changes, and at least every 30 "
+    "seconds during long turns."
+)
+
+TRANSCRIBE_PROMPT = (
+    "Transcribe this audio recording of a meeting. "
+    "Label speakers where you can distinguish them "
+    "(e.g., Speaker 1, Speaker 2, or names if they are stated). "
+    + _SEGMENT_INSTRUCTIONS
+)
+
+# Multitrack recordings: left channel = local mic ("Me"), right = system audio
+MIC_TRACK_LABEL = "Me"
+MIC_TRACK_PROMPT = (
+    "Transcribe this microphone recording from one meeting participant. "
+    "Only transcribe the person closest to the microphone. Ignore other "
+    "voices (they are captured on a separate track). "
+    + _SEGMENT_INSTRUCTIONS
+)
+SYSTEM_TRACK_PROMPT = (
+    "Transcribe this recording of the remote participants in a meeting. "
+    "Label speakers (e.g., Speaker 1, Speaker 2, or names if they are "
+    "stated). " + _SEGMENT_INSTRUCTIONS
+)
+
+TRACK_SPLIT_BLOCK_FRAMES = 1 << 16
+
+
+def merge_track_segments(tracks: list[list[dict]]) -> list[dict]:
+    """Interleave per-track segments into one list, ordered by start time.
+
+    Ties keep track order, so the mic track wins when both start together.
+    """
+    entries = [
+        (seg["start"], track_index, i, seg)
+        for track_index, segments in enumerate(tracks)
+        for i, seg in enumerate(segments)
+    ]
+    entries.sort(key=lambda e: e[:3])
+    return [entry[3] for entry in entries]
+
+
+def split_stereo_wav(wav_path: str, output_dir: str) -> list[str]:
+    """Write each channel of a stereo WAV to its own mono WAV, block by block."""
+    base = os.path.splitext(os.path.basename(wav_path))[0]
+    paths = [
+        os.path.join(output_dir, f"{base}.mic.wav"),
+        os.path.join(output_dir, f"{base}.system.wav"),
+    ]
+    with wave.open(wav_path, "rb") as src:
+        outputs = [wave.open(p, "wb") for p in paths]
+        try:
+            for out in outputs:
+                out.setnchannels(1)
+                out.setsampwidth(src.getsampwidth())
+                out.setframerate(src.getframerate())
+            while True:
+                data = src.readframes(TRACK_SPLIT_BLOCK_FRAMES)
+                if not data:
+                    break
+                frames = np.frombuffer(data, dtype=np.int16).reshape(-1, 2)
+                for channel, out in enumerate(outputs):
+                    out.writeframes(np.ascontiguousarray(frames[:, channel]).tobytes())
+        finally:
+            for out in outputs:
+                out.close()
+    return paths
 
 
 class TranscriptionService:
-    def __init__(self, api_key: str):
-        self.client = genai.Client(
-            api_key=api_key,
-            http_options={"timeout": GEMINI_TIMEOUT},
-        )
-        self.model = "gemini-2.5-flash"
-
-    def _wait_for_file_active(self, uploaded_file, poll_interval: int = 2, max_wait: int = 300):
-        """Poll until an uploaded file reaches ACTIVE state.
-
-        Large files need server-side processing after upload before they
-        can be used in generate_content().
-        """
-        start = time.time()
-        while uploaded_file.state.name == "PROCESSING":
-            if time.time() - start > max_wait:
-                raise TimeoutError(
-                    f"Uploaded file did not become active within {max_wait}s"
-                )
-            time.sleep(poll_interval)
-            uploaded_file = self.client.files.get(name=uploaded_file.name)
-        if uploaded_file.state.name != "ACTIVE":
+    def __init__(self, api_key: str, provider: AIProvider | None = None):
+        self.provider = provider or get_provider(api_key)
+        # Segments behind the most recent transcribe() call
+        self.last_segments: list[dict] = []
+
+    def _transcribe_file(
+        self, wav_path: str, prompt: str, on_status=None
+    ) -> list[dict]:
+        with tracing.span("transcribe_file", bytes=os.path.getsize(wav_path)) as span:
+            response = self.provider.transcribe_audio(
+                wav_path, prompt, on_status, response_schema=TRANSCRIPT_SCHEMA
+            )
+            segments, truncated = parse_segments(response)
+            span.set(segments=len(segments), truncated=truncated)
+        if truncated:
+            # Accepting it would lose the rest of the meeting once the
+            # recording is cleaned up; failing keeps the audio for a retry
             raise RuntimeError(
-                f"File upload failed with state: {uploaded_file.state.name}"
+                f"Transcription was cut off after {len(segments)} segments "
+                "(model output limit)"
             )
-        return uploaded_file
+        return segments
 
     def transcribe(self, wav_path: str, on_status=None) -> str:
-        """Upload WAV to Gemini Files API and get a transcript.
+        """Transcribe a recording with the configured provider.
+
+        Stereo (multitrack) recordings are split per channel, transcribed
+        concurrently and merged by timestamp.  Returns the transcript text;
+        the structured segments are kept in `last_segments`.  Raises if the
+        response was cut off or had no segments, so the audio is kept.
 
         Args:
             wav_path: Path to the WAV file.
             on_status: Optional callback(str) for progress updates.
         """
-        if on_status:
-            on_status("Uploading audio to Gemini...")
-        uploaded_file = self.client.files.upload(file=wav_path)
-
-        if on_status:
-            on_status("Waiting for file processing...")
-        uploaded_file = self._wait_for_file_active(uploaded_file)
-
-        if on_status:
-            on_status("Transcribing audio (this may take a few minutes)...")
-
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=[
-                (
-                    "Transcribe this audio recording of a meeting. "
-                    "Include speaker labels where you can distinguish different speakers "
-                    "(e.g., Speaker 1, Speaker 2). "
-                    "Include timestamps approximately every few minutes. "
-                    "Output the transcript as plain text, preserving the natural flow "
-                    "of conversation."
-                ),
-                uploaded_file,
-            ],
-        )
-
-        return response.text
+        with wave.open(wav_path, "rb") as wf:
+            channels = wf.getnchannels()
+            seconds = wf.getnframes() / wf.getframerate()
+        with tracing.span(
+            "transcribe", channels=channels, audio_seconds=round(seconds, 1)
+        ) as span:
+            if channels == 2:
+                segments = self._transcribe_multitrack(wav_path, on_status)
+            else:
+                segments = self._transcribe_file(
+                    wav_path, TRANSCRIBE_PROMPT, on_status
+                )
+            span.set(segments=len(segments))
+        if not segments:
+            raise RuntimeError("Transcription came back empty")
+        self.last_segments = segments
+        return segments_to_text(segments)
+
+    def _transcribe_multitrack(self, wav_path: str, on_status=None) -> list[dict]:
+        """Transcribe the mic and system tracks in parallel and merge them."""
+        with tempfile.TemporaryDirectory(prefix="meeting-tracks-") as tmp:
+            if on_status:
+                on_status("Splitting audio tracks...")
+            with tracing.span("split_tracks"):
+                mic_path, system_path = split_stereo_wav(wav_path, tmp)
+
+            if on_status:
+                on_status("Transcribing mic and system tracks in parallel...")
+            transcribe_file = tracing.in_current_context(self._transcribe_file)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                mic_future = pool.submit(transcribe_file, mic_path, MIC_TRACK_PROMPT)
+                system_future = pool.submit(
+                    transcribe_file, system_path, SYSTEM_TRACK_PROMPT
+                )
+                mic_segments = mic_future.result()
+                system_segments = system_future.result()
+
+        for seg in mic_segments:
+            seg["speaker"] = MIC_TRACK_LABEL
+        return merge_track_segments([mic_segments, system_segments])
 
     def save_transcript(
         self,
@@ -77,8 +171,13 @@ class TranscriptionService:
         meeting_title: str,
         transcript_dir: str,
         timestamp: str,
+        segments: list[dict] | None = None,
     ) -> str:
-        """Save transcript as a markdown file. Return the filename (no path)."""
+        """Save transcript as a markdown file. Return the filename (no path).
+
+        With `segments`, the indexed segment sidecar files are written next
+        to it (see services.transcript_index).
+        """
         safe_title = meeting_title.replace(" ", "_").replace("/", "-")
         filename = f"{timestamp}_{safe_title}_transcript.md"
         filepath = os.path.join(transcript_dir, filename)
@@ -91,4 +190,7 @@ class TranscriptionService:
         with open(filepath, "w") as f:
             f.write(content)
 
+        if segments:
+            write_segments(segments, os.path.splitext(filepath)[0])
+
         return filename
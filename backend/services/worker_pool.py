@@ -0,0 +1,313 @@
+"""Team-mode processing across a pool of worker processes.
+
+Uploaded recordings are processed outside the API process, by TEAM_WORKERS
+worker processes (default: one per CPU core).  Each worker has its own job
+queue (shard).  A user's jobs go to a home shard picked by hashing their
+user ID, so that worker's provider clients and meeting contexts for the
+user stay warm.  If the home shard is more than SHARD_SPILL jobs behind
+the least busy one, the job goes to that shard instead, so one busy user
+can't hold up the others.
+
+Workers report progress on a shared results queue.  A collector thread
+in the API process folds the reports into job records, persisted under
+the user's jobs/ directory.  It also watches the workers: when one dies
+(OOM, a native crash), the job it was running fails, the jobs still
+queued for its shard are requeued, and a replacement is started.  The server-wide Gemini limits
+(GEMINI_REQUESTS_PER_MINUTE / GEMINI_MAX_CONCURRENCY) are split evenly
+between the workers.
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+from services.settings_store import settings_store
+
+# Jobs a home shard may be behind the least busy shard before spilling
+SHARD_SPILL = 1
+TERMINAL_STATES = {"done", "failed"}
+# How often the collector checks that the workers are alive
+WATCHDOG_INTERVAL = 1.0
+
+
+def default_workers() -> int:
+    return int(settings_store.get("TEAM_WORKERS") or os.cpu_count() or 1)
+
+
+def _worker_main(shard: int, num_workers: int, jobs, results):
+    """Worker process loop: run jobs from this shard's queue until None."""
+    from services import tracing
+    from services.pipeline import run_pipeline
+    from services.rate_governor import set_budget_share
+
+    tracing.set_process_name(f"worker{shard}")
+    # Kept when the governor is rebuilt after a .env change
+    set_budget_share(num_workers)
+
+    while (job := jobs.get()) is not None:
+        job_id = job["id"]
+        results.put(
+            (job_id, {"state": "processing", "started_at": datetime.now().isoformat()})
+        )
+        # The job ID doubles as the trace ID (GET /api/team/jobs/{id}/trace)
+        trace = tracing.new_trace(
+            "team.job", trace_id=job_id, user=job["user_id"], shard=shard
+        )
+        error = None
+        with tracing.activate(trace):
+            try:
+                result = run_pipeline(
+                    job["wav_path"],
+                    job["meeting_info"],
+                    job["timestamp"],
+                    job["config"],
+                    on_status=lambda msg: results.put((job_id, {"step": msg})),
+                )
+                os.remove(job["wav_path"])
+                fields = {
+                    "state": "done",
+                    "step": "Done!",
+                    "result": {k: v for k, v in result.items() if k != "outputs"},
+                }
+            except Exception as e:
+                # The upload is kept so the job can be retried
+                error = e
+                fields = {"state": "failed", "error": str(e)}
+        trace.end(error)
+        fields["finished_at"] = datetime.now().isoformat()
+        results.put((job_id, fields))
+
+
+class ShardedWorkerPool:
+    def __init__(self, num_workers: int | None = None):
+        self.num_workers = max(1, num_workers or default_workers())
+        self._ctx = multiprocessing.get_context("spawn")
+        self._queues = [self._ctx.Queue() for _ in range(self.num_workers)]
+        self._results = self._ctx.Queue()
+        self._processes = [self._new_worker(shard) for shard in range(self.num_workers)]
+        self._lock = threading.Lock()
+        self._pending = [0] * self.num_workers
+        self._running: list[str | None] = [None] * self.num_workers
+        # Unfinished jobs as submitted, in order, for requeueing after a crash
+        self._unfinished: dict[str, dict] = {}
+        self.jobs: dict[str, dict] = {}
+        self.restarts = 0
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._started = False
+        self._closing = False
+
+    def _new_worker(self, shard: int):
+        return self._ctx.Process(
+            target=_worker_main,
+            args=(shard, self.num_workers, self._queues[shard], self._results),
+            name=f"team-worker-{shard}",
+            daemon=True,
+        )
+
+    def start(self):
+        for process in self._processes:
+            process.start()
+        self._collector.start()
+        self._started = True
+        print(f"[WorkerPool] Started {self.num_workers} worker process(es)")
+
+    # ---- Submission ----
+
+    def _pick_shard(self, user_id: str) -> int:
+        home = zlib.crc32(user_id.encode()) % self.num_workers
+        least = min(range(self.num_workers), key=self._pending.__getitem__)
+        if self._pending[home] - self._pending[least] > SHARD_SPILL:
+            return least
+        return home
+
+    def submit(self, job: dict) -> dict:
+        """Queue a job: {id, user_id, wav_path, meeting_info, timestamp,
+        config, record_path}.  Returns its (public) record."""
+        with self._lock:
+            shard = self._pick_shard(job["user_id"])
+            self._pending[shard] += 1
+            record = {
+                "id": job["id"],
+                "user_id": job["user_id"],
+                "title": job["meeting_info"].get("title", "untitled"),
+                "timestamp": job["timestamp"],
+                "wav_path": job["wav_path"],
+                "meeting_info": job["meeting_info"],
+                "record_path": job["record_path"],
+                "state": "queued",
+                "step": "Queued",
+                "shard": shard,
+                "submitted_at": datetime.now().isoformat(),
+            }
+            self.jobs[job["id"]] = record
+            self._unfinished[job["id"]] = job
+            # Under the lock, so a worker restart can't swap the queue meanwhile
+            self._queues[shard].put(job)
+        self._persist(record)
+        return record
+
+    # ---- Results ----
+
+    def _collect(self):
+        next_check = time.monotonic() + WATCHDOG_INTERVAL
+        while True:
+            try:
+                message = self._results.get(timeout=WATCHDOG_INTERVAL)
+            except queue.Empty:
+                message = ()
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            if message:
+                self._apply(*message)
+            if time.monotonic() >= next_check:
+                self._check_workers()
+                next_check = time.monotonic() + WATCHDOG_INTERVAL
+
+    def _apply(self, job_id: str, fields: dict):
+        with self._lock:
+            record = self.jobs.get(job_id)
+            # A job failed by the watchdog ignores its dead worker's reports
+            if record is None or record["state"] in TERMINAL_STATES:
+                return
+            record.update(fields)
+            shard = record["shard"]
+            if fields.get("state") == "processing":
+                self._running[shard] = job_id
+            terminal = fields.get("state") in TERMINAL_STATES
+            if terminal:
+                self._pending[shard] -= 1
+                self._unfinished.pop(job_id, None)
+                if self._running[shard] == job_id:
+                    self._running[shard] = None
+        if "state" in fields:
+            self._persist(record)
+        if terminal:
+            print(f"[WorkerPool] Job {job_id} {record['state']}")
+
+    def _check_workers(self):
+        """Fail the job of any dead worker and start a replacement."""
+        for shard, process in enumerate(self._processes):
+            if self._closing or process.is_alive():
+                continue
+            print(
+                f"[WorkerPool] Worker {shard} died (exit code {process.exitcode}); "
+                "restarting"
+            )
+            with self._lock:
+                running, self._running[shard] = self._running[shard], None
+            if running:
+                self._apply(
+                    running,
+                    {
+                        "state": "failed",
+                        "error": f"Worker process died (exit code {process.exitcode})",
+                        "finished_at": datetime.now().isoformat(),
+                    },
+                )
+            with self._lock:
+                # The dead worker may have died holding its queue's lock, so
+                # the replacement gets a new queue with the shard's backlog
+                old = self._queues[shard]
+                self._queues[shard] = self._ctx.Queue()
+                for job_id, job in self._unfinished.items():
+                    if self.jobs[job_id]["shard"] == shard:
+                        self._queues[shard].put(job)
+                self._processes[shard] = self._new_worker(shard)
+                self._processes[shard].start()
+                self.restarts += 1
+            old.cancel_join_thread()
+            old.close()
+
+    @staticmethod
+    def _persist(record: dict):
+        path = record["record_path"]
+        fd, tmp_path = tempfile.mkstemp(prefix=".job.", dir=os.path.dirname(path))
+        with os.fdopen(fd, "w") as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp_path, path)
+
+    # ---- Queries ----
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            record = self.jobs.get(job_id)
+            return dict(record) if record else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = list(self._pending)
+        return {
+            "workers": self.num_workers,
+            "pending_per_worker": pending,
+            "alive": [p.is_alive() for p in self._processes],
+            "restarts": self.restarts,
+        }
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until no job is queued or running (for tests and benchmarks)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if not any(self._pending):
+                    return True
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+
+    def close(self, timeout: float = 10.0):
+        """Stop the workers after their current job."""
+        if not self._started:
+            return
+        self._closing = True
+        for q in self._queues:
+            q.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._results.put(None)
+        self._collector.join(timeout)
+        self._started = False
+
+
+def load_job_records(jobs_dir: str) -> list[dict]:
+    """Persisted job records in a user's jobs/ directory, newest first."""
+    records = []
+    for path in sorted(Path(jobs_dir).glob("*.json"), reverse=True):
+        try:
+            records.append(json.loads(path.read_text()))
+        except json.JSONDecodeError:
+            continue
+    return records
+
+
+_pool: ShardedWorkerPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> ShardedWorkerPool:
+    """The team-mode worker pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ShardedWorkerPool()
+            _pool.start()
+        return _pool
+
+
+def shutdown_worker_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the backend's packages (services, routers) like main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import pyaudio  # noqa: F401
+except ImportError:
+    # No PortAudio here: audio_capture gets the fake module (tests never
+    # open a real device either way)
+    from tests import fake_pyaudio
+
+    sys.modules["pyaudio"] = fake_pyaudio
+
+from services.settings_store import settings_store  # noqa: E402
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    """Point the app's settings at a .env in tmp_path; returns a setter."""
+    env_path = tmp_path / ".env"
+    monkeypatch.setattr(settings_store, "env_path", str(env_path))
+
+    def set_values(**values):
+        env_path.write_text("".join(f"{k}={v}\n" for k, v in values.items()))
+        settings_store._refresh(force=True)
+
+    set_values()
+    yield set_values
+    monkeypatch.undo()
+    settings_store._refresh(force=True)
@@ -0,0 +1,55 @@
+"""Stand-in for the pyaudio module: a mic stream that replays given buffers.
+
+Constants match PortAudio's.  FakePyAudio(buffers).open(...) returns a
+stream that, once started, calls the stream callback with each
+(data, status_flags) pair from its own thread, like PortAudio does.
+"""
+
+import threading
+
+paInt16 = 8
+paContinue = 0
+paInputUnderflow = 1
+paInputOverflow = 2
+
+
+class FakeStream:
+    def __init__(self, callback, buffers, frames_per_buffer):
+        self.callback = callback
+        self.buffers = buffers
+        self.frames_per_buffer = frames_per_buffer
+        self.finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        for data, flags in self.buffers:
+            self.callback(data, len(data) // 2, {}, flags)
+        self.finished.set()
+
+    def start_stream(self):
+        self._thread.start()
+
+    def stop_stream(self):
+        self._thread.join()
+
+    def close(self):
+        pass
+
+
+class PyAudio:
+    def __init__(self, buffers=()):
+        self.buffers = list(buffers)
+        self.streams: list[FakeStream] = []
+        self.opened = threading.Event()  # set once a stream is open
+
+    def open(self, stream_callback=None, frames_per_buffer=1024, **kwargs):
+        stream = FakeStream(stream_callback, self.buffers, frames_per_buffer)
+        self.streams.append(stream)
+        self.opened.set()
+        return stream
+
+    def get_device_count(self):
+        return 0
+
+    def terminate(self):
+        pass
@@ -0,0 +1,137 @@
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+from services import audio_capture
+from services.audio_capture import (
+    DEVICE_RATE,
+    MIC_MAX_DRAIN_BYTES,
+    MIC_MIN_DRAIN_BYTES,
+    SAMPLE_WIDTH,
+    AudioRecorder,
+)
+from services.resampler import StreamingResampler
+from services.saved_store import SavedRecordingStore
+from tests import fake_pyaudio
+
+pyaudio = audio_capture.pyaudio
+
+
+def _pcm(frames: int) -> bytes:
+    t = np.arange(frames) / DEVICE_RATE
+    return (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16).tobytes()
+
+
+@pytest.fixture
+def recorder(settings, tmp_path, monkeypatch):
+    settings(AUDIO_PROCESS_POOL="0")
+    monkeypatch.setattr(audio_capture, "_find_audiotee_binary", lambda: None)
+    rec = AudioRecorder(output_dir=str(tmp_path / "recordings"), sample_rate=16000)
+    rec.audio = fake_pyaudio.PyAudio()
+    return rec
+
+
+def test_callback_counts_portaudio_status_flags(recorder):
+    chunk = _pcm(1024)
+    for flags in (
+        pyaudio.paInputOverflow,
+        0,
+        pyaudio.paInputOverflow,
+        pyaudio.paInputUnderflow,
+        pyaudio.paInputOverflow | pyaudio.paInputUnderflow,
+    ):
+        assert recorder._on_mic_audio(chunk, 1024, {}, flags) == (None, pyaudio.paContinue)
+
+    stats = recorder.get_capture_stats()
+    assert stats["input_overflows"] == 3
+    assert stats["input_underflows"] == 2
+    # Flagged buffers still carry audio and are kept
+    assert recorder._mic_ring.available == 5 * len(chunk)
+    assert stats["ring_overflows"] == 0
+
+
+def test_full_ring_drops_and_counts_chunks(recorder):
+    ring = recorder._mic_ring
+    # 100 of these fill the 5 s ring exactly
+    chunk = _pcm(ring.capacity // SAMPLE_WIDTH // 100)
+    for _ in range(100):
+        recorder._on_mic_audio(chunk, len(chunk) // 2, {}, 0)
+    for _ in range(7):
+        recorder._on_mic_audio(chunk, len(chunk) // 2, {}, 0)
+
+    stats = recorder.get_capture_stats()
+    assert stats["ring_overflows"] == 7
+    assert stats["dropped_seconds"] == round(7 * len(chunk) / SAMPLE_WIDTH / DEVICE_RATE, 3)
+    assert stats["ring_high_water"] == 1.0
+    assert ring.available == ring.capacity  # the ring itself is intact
+
+    # Once drained, new audio is accepted again
+    recorder._drain_mic(StreamingResampler(DEVICE_RATE, 16000))
+    assert recorder._on_mic_audio(chunk, len(chunk) // 2, {}, 0) == (None, pyaudio.paContinue)
+    assert recorder.get_capture_stats()["ring_overflows"] == 7
+
+
+def test_drain_size_adapts_to_backlog(recorder):
+    resampler = StreamingResampler(DEVICE_RATE, 16000)
+    backlog = _pcm(MIC_MAX_DRAIN_BYTES)  # twice the largest batch
+    sizes = []
+    for _ in range(8):
+        recorder._on_mic_audio(backlog, len(backlog) // 2, {}, 0)
+        recorder._drain_mic(resampler)
+        sizes.append(recorder._mic_drain_bytes)
+        assert recorder._mic_ring.available == 0
+    # Doubles while behind, capped at the maximum
+    assert sizes[:5] == [MIC_MIN_DRAIN_BYTES * 2**i for i in range(1, 6)]
+    assert sizes[-1] == MIC_MAX_DRAIN_BYTES
+
+    # Halves again (not below the minimum) once the backlog is small
+    small = _pcm(16)
+    shrinking = []
+    for _ in range(8):
+        recorder._on_mic_audio(small, 16, {}, 0)
+        recorder._drain_mic(resampler)
+        shrinking.append(recorder._mic_drain_bytes)
+    assert shrinking[0] == MIC_MAX_DRAIN_BYTES // 2
+    assert shrinking[-1] == MIC_MIN_DRAIN_BYTES
+
+    # Everything drained was resampled into mic_frames
+    fed = 8 * len(backlog) + 8 * len(small)
+    expected = fed / SAMPLE_WIDTH * 16000 / DEVICE_RATE
+    assert abs(recorder.mic_frames.nbytes / SAMPLE_WIDTH - expected) <= 2
+
+
+def test_capture_stats_are_saved_with_a_failed_recording(
+    recorder, settings, tmp_path, monkeypatch
+):
+    from routers import recording
+
+    chunk = _pcm(1024)
+    buffers = [(chunk, 0)] * 40 + [(chunk, pyaudio.paInputOverflow)] * 3 + [(chunk, 0)] * 40
+    recorder.audio = fake_pyaudio.PyAudio(buffers)
+
+    recorder.start(meeting_title="Standup")
+    # The mic thread opens the stream
+    assert recorder.audio.opened.wait(5)
+    assert recorder.audio.streams[0].finished.wait(5)
+    time.sleep(0.1)
+    wav_path = recorder.stop()
+
+    stats = recorder.capture_stats
+    assert stats["input_overflows"] == 3
+    assert stats["ring_overflows"] == 0
+    assert os.path.getsize(wav_path) > 44
+
+    # No API key: processing fails and the recording is saved for a retry
+    settings(AUDIO_PROCESS_POOL="0", TRACING="0")
+    store = SavedRecordingStore(str(tmp_path / "saved"))
+    monkeypatch.setattr(recording, "_saved_store", store)
+    recording.process_recording(
+        wav_path, {"title": "Standup"}, "2026-01-01_10-00-00", capture_stats=stats
+    )
+    with open(store.meta_path("2026-01-01_10-00-00_Standup")) as f:
+        meta = json.load(f)
+    assert meta["capture_stats"] == stats
+    assert "API key" in meta["last_error"]
@@ -0,0 +1,25 @@
+import threading
+
+from services.audio_import import ImportManager
+
+
+def test_concurrent_saves_leave_a_valid_record(tmp_path):
+    manager = ImportManager(str(tmp_path))
+    # Records of varying length, so a short write after a long one would
+    # leave trailing bytes if writes weren't atomic
+    jobs = [
+        {"id": "job1", "state": "running", "files": [{"n": i}] * (i % 7)}
+        for i in range(200)
+    ]
+    threads = [
+        threading.Thread(target=lambda chunk=jobs[i::4]: [manager._save(j) for j in chunk])
+        for i in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert manager.get_job("job1")["id"] == "job1"
+    assert [j["id"] for j in manager.list_jobs()] == ["job1"]
+    assert [p.name for p in tmp_path.iterdir()] == ["job1.json"]
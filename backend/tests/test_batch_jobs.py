@@ -0,0 +1,152 @@
+import asyncio
+import json
+import time
+import wave
+
+from fastapi import BackgroundTasks
+
+from routers import recording
+from services import batch_jobs
+from services.batch_jobs import BatchJobManager
+from services.saved_store import SavedRecordingStore
+
+TRANSCRIPT = json.dumps(
+    {"segments": [{"start": 0, "end": 3, "speaker": "Ana", "text": "Hello."}]}
+)
+
+
+class FakeBatchProvider:
+    """The transcribe job succeeded; the format job fails."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def batch_state(self, job_name):
+        return "JOB_STATE_SUCCEEDED" if job_name == "transcribe-job" else "JOB_STATE_FAILED"
+
+    def batch_results(self, job_name, count):
+        if job_name == "transcribe-job":
+            return [(TRANSCRIPT, None)] * count
+        return [(None, "Batch job ended in state JOB_STATE_FAILED")] * count
+
+    def submit_batch(self, requests, display_name, response_schema=None):
+        self.submitted.append(len(requests))
+        return "format-job"
+
+
+def _wait_for_polling(manager):
+    deadline = time.monotonic() + 10
+    while manager._polling and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_results_interrupted_mid_handling_are_picked_up_once(
+    settings, tmp_path, monkeypatch
+):
+    transcripts = tmp_path / "transcripts"
+    transcripts.mkdir()
+    settings(GEMINI_API_KEY="key", TRANSCRIPT_DIR=str(transcripts), TRACING="0")
+    provider = FakeBatchProvider()
+    monkeypatch.setattr(batch_jobs, "get_batch_provider", lambda api_key: provider)
+
+    # A restart hit after the job finished and the first item was handled
+    (transcripts / "2026-01-01_09-00-00_First_transcript.md").write_text("Hello.")
+    items = [
+        {
+            "meeting_info": {"title": "First"},
+            "timestamp": "2026-01-01_09-00-00",
+            "transcript_filename": "2026-01-01_09-00-00_First_transcript.md",
+        },
+        {"meeting_info": {"title": "Second"}, "timestamp": "2026-01-01_10-00-00"},
+    ]
+    manager = BatchJobManager(str(tmp_path / "batches"), lambda item, notes: None)
+    manager._save(
+        {
+            "id": "b1",
+            "kind": "transcribe",
+            "job_name": "transcribe-job",
+            "state": "JOB_STATE_SUCCEEDED",
+            "items": items,
+        }
+    )
+
+    manager.resume()
+    _wait_for_polling(manager)
+
+    records = {r["id"]: r for r in manager.list_jobs()}
+    transcribe = records["b1"]
+    assert "finished_at" in transcribe
+    assert [i["transcript_filename"] for i in transcribe["items"]] == [
+        "2026-01-01_09-00-00_First_transcript.md",
+        "2026-01-01_10-00-00_Second_transcript.md",
+    ]
+    # Both transcripts went into one follow-up, which finished too
+    assert provider.submitted == [2]
+    assert "finished_at" in records[transcribe["follow_up"]]
+
+    # Nothing is left to resume
+    manager.resume()
+    _wait_for_polling(manager)
+    assert provider.submitted == [2]
+
+
+def test_recording_stays_in_flight_through_the_follow_up(settings, tmp_path, monkeypatch):
+    settings(AUDIO_PROCESS_POOL="0", TRACING="0")
+    monkeypatch.setattr(recording, "BATCH_DIR", str(tmp_path / "batches"))
+    monkeypatch.setattr(recording, "_batch_manager", None)
+    store = SavedRecordingStore(str(tmp_path / "saved"), recording._is_in_running_batch)
+    monkeypatch.setattr(recording, "_saved_store", store)
+    with wave.open(str(tmp_path / "a.wav"), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(b"\0\0" * 1600)
+    store.save(
+        str(tmp_path / "a.wav"), {"title": "Sync"}, "2026-01-01_09-00-00", "boom", 1
+    )
+    recording_id = "2026-01-01_09-00-00_Sync"
+    store.update(recording_id, batch_id="t1")
+
+    manager = recording.get_batch_manager()
+    transcribed = {
+        "meeting_info": {"title": "Sync"},
+        "timestamp": "2026-01-01_09-00-00",
+        "transcript_filename": "x_transcript.md",
+    }
+    manager._save(
+        {
+            "id": "t1",
+            "kind": "transcribe",
+            "job_name": "t",
+            "state": "JOB_STATE_SUCCEEDED",
+            "items": [transcribed],
+            "follow_up": "f1",
+            "finished_at": "2026-01-01T10:00:00",
+        }
+    )
+    # The transcribe batch is over, but its format batch is still running
+    follow_up = {
+        "id": "f1",
+        "kind": "format",
+        "job_name": "f",
+        "state": "JOB_STATE_RUNNING",
+        "items": [transcribed],
+    }
+    manager._save(follow_up)
+
+    def retry():
+        return asyncio.run(recording.retry_saved_recording(recording_id, BackgroundTasks()))
+
+    assert retry()["status"] == "error"
+    assert store.enforce_budget() == []
+
+    # Once the follow-up failed for good, the recording can be retried
+    manager._save(
+        {
+            **follow_up,
+            "state": "JOB_STATE_FAILED",
+            "items": [{**transcribed, "error": "failed"}],
+            "finished_at": "2026-01-01T11:00:00",
+        }
+    )
+    assert retry()["status"] == "processing"
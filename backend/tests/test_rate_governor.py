@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+
+from services import rate_governor
+from services.ai_provider import EmptyResponseError, GeminiProvider
+from services.rate_governor import RateGovernor
+
+
+@pytest.fixture
+def governor(monkeypatch, settings):
+    settings(TRACING="0")
+    governor = RateGovernor(requests_per_minute=6000, base_delay=0.001, max_delay=0.001)
+    monkeypatch.setattr(rate_governor, "_governor", governor)
+    return governor
+
+
+def test_operation_is_retried_as_a_unit(governor):
+    outcomes = [TimeoutError("not active"), EmptyResponseError("empty"), "ok"]
+
+    def operation():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert governor.retry_operation(operation) == "ok"
+    assert governor.stats["retries"] == 2
+
+
+def test_requests_the_governor_gave_up_on_are_not_retried_again(governor):
+    calls = []
+
+    def request():
+        calls.append(1)
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        governor.retry_operation(lambda: governor.call(request))
+    assert len(calls) == governor.max_retries + 1
+
+
+class FakeGeminiClient:
+    """Upload → FAILED file, then an empty response, then a transcript."""
+
+    def __init__(self):
+        self.uploads = 0
+        self.generated = 0
+        self.files = SimpleNamespace(upload=self._upload, get=None)
+        self.models = SimpleNamespace(generate_content=self._generate)
+
+    def _upload(self, file):
+        self.uploads += 1
+        state = "FAILED" if self.uploads == 1 else "ACTIVE"
+        return SimpleNamespace(name="files/1", state=SimpleNamespace(name=state))
+
+    def _generate(self, model, contents, config):
+        self.generated += 1
+        return SimpleNamespace(text="" if self.generated == 1 else '{"segments": []}')
+
+
+def test_gemini_transcription_starts_over_after_a_failed_file_or_empty_text(
+    governor, tmp_path
+):
+    audio = tmp_path / "meeting.wav"
+    audio.write_bytes(b"RIFF")
+    provider = GeminiProvider.__new__(GeminiProvider)  # no SDK needed
+    provider.client = FakeGeminiClient()
+    provider.model = "test"
+
+    assert provider.transcribe_audio(str(audio), "Transcribe") == '{"segments": []}'
+    assert provider.client.uploads == 3
+    assert provider.client.generated == 2
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+
+from fastapi import BackgroundTasks
+
+from routers import recording
+
+
+class SlowRecorder:
+    """Stands in for AudioRecorder; stop() takes a while, like the mixdown."""
+
+    def __init__(self):
+        self.is_recording = True
+        self.stops = 0
+        self.capture_stats = {}
+
+    def stop(self) -> str:
+        self.stops += 1
+        time.sleep(0.2)
+        self.is_recording = False
+        return "/tmp/meeting.wav"
+
+    def cleanup(self):
+        pass
+
+
+def test_concurrent_stops_finalize_the_recording_once(settings, monkeypatch):
+    settings(TRACING="0")
+    fake = SlowRecorder()
+    monkeypatch.setattr(recording, "recorder", fake)
+    monkeypatch.setattr(recording, "current_meeting", {"title": "Standup"})
+    tasks = [BackgroundTasks(), BackgroundTasks()]
+
+    async def stop_twice():
+        return await asyncio.gather(*(recording.stop_recording(t) for t in tasks))
+
+    results = asyncio.run(stop_twice())
+
+    assert sorted(r["status"] for r in results) == ["error", "processing"]
+    assert fake.stops == 1
+    assert sum(len(t.tasks) for t in tasks) == 1
+
+
+def test_startup_recovery_only_sees_spools_from_before_startup(tmp_path, monkeypatch):
+    monkeypatch.setattr(recording, "RECORDINGS_DIR", str(tmp_path))
+    (tmp_path / "crashed.spool.json").write_text("{}")
+    seen = []
+    release = threading.Event()
+
+    def recover(spool_paths):
+        release.wait(5)  # slow heavy imports on the recovery thread
+        seen.append(spool_paths)
+
+    monkeypatch.setattr(recording, "_recover_and_process", recover)
+    recording.recover_interrupted_recordings()
+    # A recording started while recovery is still importing its modules
+    (tmp_path / "live.spool.json").write_text("{}")
+    release.set()
+    deadline = time.monotonic() + 5
+    while not seen and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert seen == [[str(tmp_path / "crashed.spool.json")]]
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from services.resampler import StreamingResampler, resample
+
+RATES = [(44100, 16000), (48000, 16000), (16000, 16000), (22050, 16000)]
+
+
+def _chirp(rate: int, seconds: float = 1.5) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    # 50 Hz → rate/2 sweep, covering the passband, transition and stopband
+    phase = 2 * np.pi * (50 * t + (rate / 2 - 50) * t**2 / (2 * seconds))
+    return (12000 * np.sin(phase)).astype(np.int16)
+
+
+def _tone(rate: int, freq: float, seconds: float = 2.0) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return (16000 * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+
+def _gain_db(data: np.ndarray, out_rate: int, in_rate: int, freq: float) -> float:
+    out = np.frombuffer(resample(data.tobytes(), in_rate, out_rate), dtype=np.int16)
+    steady = out[out_rate // 10 : -out_rate // 10].astype(np.float64)
+    amplitude = max(np.sqrt(np.mean(steady**2)) * np.sqrt(2), 1e-9)
+    return 20 * np.log10(amplitude / 16000)
+
+
+@pytest.mark.parametrize("in_rate,out_rate", RATES)
+@pytest.mark.parametrize("seed", range(5))
+def test_random_chunks_match_one_shot(in_rate, out_rate, seed):
+    signal = _chirp(in_rate)
+    expected = resample(signal.tobytes(), in_rate, out_rate)
+
+    rng = np.random.default_rng(seed)
+    resampler = StreamingResampler(in_rate, out_rate)
+    pieces, pos = [], 0
+    while pos < len(signal):
+        # Include 0- and 1-sample chunks: they must not disturb the state
+        n = int(rng.choice([0, 1, 2, 3, 17, 160, 441, 1024, 4097]))
+        pieces.append(resampler.process(signal[pos : pos + n].tobytes()))
+        pos += n
+    assert b"".join(pieces) == expected
+
+
+@pytest.mark.parametrize("in_rate,out_rate", [(44100, 16000), (48000, 16000)])
+def test_output_length(in_rate, out_rate):
+    signal = _chirp(in_rate)
+    out = resample(signal.tobytes(), in_rate, out_rate)
+    assert abs(len(out) // 2 - len(signal) * out_rate / in_rate) <= 1
+
+
+@pytest.mark.parametrize("in_rate", [44100, 48000])
+@pytest.mark.parametrize("freq", [300, 1000, 3000])
+def test_passband_is_unity_gain(in_rate, freq):
+    assert abs(_gain_db(_tone(in_rate, freq), 16000, in_rate, freq)) < 0.1
+
+
+@pytest.mark.parametrize("in_rate", [44100, 48000])
+@pytest.mark.parametrize("freq", [9000, 12000, 16000, 20000])
+def test_stopband_above_new_nyquist(in_rate, freq):
+    # Tones above 8 kHz would alias into the 16 kHz output
+    assert _gain_db(_tone(in_rate, freq), 16000, in_rate, freq) < -70
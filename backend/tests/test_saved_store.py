@@ -0,0 +1,75 @@
+import os
+import wave
+
+import numpy as np
+
+from services.saved_store import SavedRecordingStore
+
+
+def _write_wav(path, seconds: float, seed: int):
+    audio = np.random.default_rng(seed).integers(-20000, 20000, int(16000 * seconds))
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(audio.astype(np.int16).tobytes())
+
+
+def test_save_never_evicts_the_recording_just_saved(settings, tmp_path):
+    # Noise barely compresses: each recording is well over the budget
+    settings(AUDIO_PROCESS_POOL="0", SAVED_RECORDINGS_MAX_MB="0.05")
+    store = SavedRecordingStore(str(tmp_path / "saved"))
+
+    _write_wav(tmp_path / "a.wav", 5, seed=0)
+    store.save(str(tmp_path / "a.wav"), {"title": "First"}, "2026-01-01_09-00-00", "boom", 1)
+    assert [rid for rid, _ in store.list_recordings()] == ["2026-01-01_09-00-00_First"]
+
+    # The next save evicts the older one to get back under budget, but
+    # keeps itself even though it alone is still over
+    _write_wav(tmp_path / "b.wav", 5, seed=1)
+    store.save(str(tmp_path / "b.wav"), {"title": "Second"}, "2026-01-01_10-00-00", "boom", 1)
+    assert [rid for rid, _ in store.list_recordings()] == ["2026-01-01_10-00-00_Second"]
+
+
+def test_retry_releases_the_checkout_when_processing_raises(settings, tmp_path, monkeypatch):
+    from routers import recording
+
+    settings(AUDIO_PROCESS_POOL="0")
+    store = SavedRecordingStore(str(tmp_path / "saved"))
+    monkeypatch.setattr(recording, "_saved_store", store)
+    monkeypatch.setattr(recording, "RECORDINGS_DIR", str(tmp_path / "scratch"))
+    _write_wav(tmp_path / "a.wav", 1, seed=0)
+    store.save(str(tmp_path / "a.wav"), {"title": "Sync"}, "2026-01-01_09-00-00", "boom", 1)
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(recording, "process_recording", crash)
+    try:
+        recording._retry_saved("2026-01-01_09-00-00_Sync")
+    except OSError:
+        pass
+    assert store.enforce_budget() == []
+    assert os.listdir(tmp_path / "saved")
+    settings(AUDIO_PROCESS_POOL="0", SAVED_RECORDINGS_MAX_MB="0.001")
+    assert store.enforce_budget() == ["2026-01-01_09-00-00_Sync"]
+
+
+def test_each_failed_retry_increments_the_stored_count(settings, tmp_path, monkeypatch):
+    from routers import recording
+
+    # No API key: processing fails right away
+    settings(AUDIO_PROCESS_POOL="0", TRACING="0")
+    store = SavedRecordingStore(str(tmp_path / "saved"))
+    monkeypatch.setattr(recording, "_saved_store", store)
+    monkeypatch.setattr(recording, "RECORDINGS_DIR", str(tmp_path / "scratch"))
+    _write_wav(tmp_path / "a.wav", 1, seed=0)
+
+    recording.process_recording(
+        str(tmp_path / "a.wav"), {"title": "Sync"}, "2026-01-01_09-00-00"
+    )
+    recording_id = "2026-01-01_09-00-00_Sync"
+    assert dict(store.list_recordings())[recording_id]["retry_count"] == 1
+    recording._retry_saved(recording_id)
+    recording._retry_saved(recording_id)
+    assert dict(store.list_recordings())[recording_id]["retry_count"] == 3
@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+DESKTOP_ENDPOINTS = [
+    ("GET", "/api/settings"),
+    ("POST", "/api/settings"),
+    ("POST", "/api/settings/credentials"),
+    ("POST", "/api/recording/start"),
+    ("GET", "/api/recording/saved"),
+    ("GET", "/api/notes/list"),
+    ("POST", "/api/notes/sync-drive"),
+    ("GET", "/api/calendar/today"),
+    ("POST", "/api/import"),
+]
+
+
+def test_team_server_does_not_serve_the_desktop_routers(settings):
+    client = TestClient(app)  # no lifespan: nothing is started
+
+    settings(TEAM_MODE="1")
+    for method, path in DESKTOP_ENDPOINTS:
+        assert client.request(method, path, json={}).status_code == 404, path
+    assert client.get("/api/health").status_code == 200
+    assert client.get("/api/team/jobs").status_code == 401
+
+    settings(TEAM_MODE="0")
+    for path in ("/api/settings", "/api/notes/list", "/api/recording/status"):
+        assert client.get(path).status_code == 200, path
@@ -0,0 +1,23 @@
+from services import tracing
+
+
+def test_torn_lines_are_skipped_not_the_rest_of_the_file(settings, tmp_path):
+    settings(TRACE_DIR=str(tmp_path / "traces"))
+    tracing._reset_exporter()
+
+    root = tracing.new_trace("recording", title="Standup")
+    with tracing.activate(root):
+        with tracing.span("transcribe"):
+            pass
+        # A write torn by a crash, or still in progress in another process
+        with open(tracing.get_exporter().path, "a") as f:
+            f.write('{"trace_id": "%s", "span_id": "x", "na\n' % root.trace_id)
+        with tracing.span("save"):
+            pass
+    root.end()
+
+    spans = tracing.get_trace(root.trace_id)
+    assert [s["name"] for s in spans] == ["recording", "transcribe", "save"]
+    assert [s["depth"] for s in spans] == [0, 1, 1]
+    assert [t["trace_id"] for t in tracing.list_traces()] == [root.trace_id]
+    tracing._reset_exporter()
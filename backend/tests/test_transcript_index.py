@@ -0,0 +1,57 @@
+import json
+import wave
+
+import pytest
+
+from services.transcript_index import parse_segments
+from services.transcription import TranscriptionService
+
+SEGMENTS = [
+    {"start": 0, "end": 4, "speaker": "Ana", "text": "Morning."},
+    {"start": 4, "end": 9, "speaker": "Ben", "text": "Let's start."},
+]
+
+
+def test_complete_truncated_and_plain_text_responses():
+    complete = json.dumps({"segments": SEGMENTS})
+    segments, truncated = parse_segments(complete)
+    assert [s["text"] for s in segments] == ["Morning.", "Let's start."]
+    assert not truncated
+
+    # Cut off at the output limit in the middle of the second segment
+    segments, truncated = parse_segments(complete[: complete.index("Let's")])
+    assert [s["text"] for s in segments] == ["Morning."]
+    assert truncated
+
+    segments, truncated = parse_segments("[00:00:05] Ana: Morning.\n")
+    assert [s["speaker"] for s in segments] == ["Ana"]
+    assert not truncated
+
+
+class CannedProvider:
+    def __init__(self, response: str):
+        self.response = response
+
+    def transcribe_audio(self, wav_path, prompt, on_status=None, response_schema=None):
+        return self.response
+
+
+@pytest.mark.parametrize(
+    "response, error",
+    [
+        (json.dumps({"segments": SEGMENTS})[:60], "cut off"),
+        (json.dumps({"segments": []}), "empty"),
+    ],
+)
+def test_truncated_or_empty_transcription_fails(tmp_path, settings, response, error):
+    settings(TRACING="0")
+    wav_path = tmp_path / "meeting.wav"
+    with wave.open(str(wav_path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(b"\0\0" * 16000)
+
+    service = TranscriptionService("", provider=CannedProvider(response))
+    with pytest.raises(RuntimeError, match=error):
+        service.transcribe(str(wav_path))
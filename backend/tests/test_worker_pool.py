@@ -0,0 +1,154 @@
+import queue
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from services import rate_governor
+from services.worker_pool import ShardedWorkerPool, _worker_main
+
+
+@pytest.fixture
+def budget_share():
+    yield
+    rate_governor.set_budget_share(1)
+
+
+def test_worker_gets_its_share_of_the_budget(settings, budget_share):
+    settings(GEMINI_REQUESTS_PER_MINUTE="120", GEMINI_MAX_CONCURRENCY="8", TRACING="0")
+    jobs = queue.Queue()
+    jobs.put(None)  # start up, then exit
+    _worker_main(0, 4, jobs, queue.Queue())
+
+    governor = rate_governor.get_governor()
+    assert governor.rate * 60 == pytest.approx(30)
+    assert governor.max_concurrency == 2
+
+    # Still split after the limits change in .env
+    settings(GEMINI_REQUESTS_PER_MINUTE="240", GEMINI_MAX_CONCURRENCY="8", TRACING="0")
+    governor = rate_governor.get_governor()
+    assert governor.rate * 60 == pytest.approx(60)
+    assert governor.max_concurrency == 2
+
+
+def test_users_stick_to_their_shard():
+    pool = ShardedWorkerPool(4)  # processes are never started
+    users = [f"user{i}" for i in range(20)]
+    homes = {user: pool._pick_shard(user) for user in users}
+    assert len(set(homes.values())) > 1
+    for _ in range(3):
+        assert {user: pool._pick_shard(user) for user in users} == homes
+
+    # A shard that falls behind spills new jobs to the least busy one
+    user = users[0]
+    pool._pending[homes[user]] = 5
+    assert pool._pick_shard(user) != homes[user]
+
+
+def _write_wav(path, seconds=1.0, rate=16000):
+    audio = (np.random.default_rng(0).standard_normal(int(seconds * rate)) * 2000).astype(
+        np.int16
+    )
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(audio.tobytes())
+
+
+def test_pool_runs_jobs_with_the_fake_provider(tmp_path, monkeypatch):
+    # Worker processes are spawned and inherit the environment
+    monkeypatch.setenv("TRACING", "0")
+    monkeypatch.setenv("FAKE_PROVIDER_LATENCY", "0")
+    transcripts, notes = tmp_path / "t", tmp_path / "n"
+    transcripts.mkdir()
+    notes.mkdir()
+    config = {
+        "api_key": "fake",
+        "provider": "fake",
+        "transcript_dir": str(transcripts),
+        "notes_dir": str(notes),
+        "note_templates": [],
+        "drive": None,
+    }
+
+    pool = ShardedWorkerPool(2)
+    pool.start()
+    try:
+        job_ids = []
+        for n in range(6):
+            job_id = f"job{n}"
+            wav_path = tmp_path / f"{job_id}.wav"
+            _write_wav(wav_path)
+            pool.submit(
+                {
+                    "id": job_id,
+                    "user_id": f"user{n % 2}",
+                    "wav_path": str(wav_path),
+                    "meeting_info": {"title": f"Sync {n}", "attendees": []},
+                    "timestamp": f"2026-01-01_10-00-0{n}",
+                    "config": config,
+                    "record_path": str(tmp_path / f"{job_id}.json"),
+                }
+            )
+            job_ids.append(job_id)
+        assert pool.wait_idle(timeout=120)
+    finally:
+        pool.close()
+
+    records = [pool.get(job_id) for job_id in job_ids]
+    assert [r["state"] for r in records] == ["done"] * 6, records[0].get("error")
+    assert len(list(notes.glob("*_notes.md"))) == 6
+
+
+def test_dead_worker_fails_its_job_and_is_replaced(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRACING", "0")
+    monkeypatch.setenv("FAKE_PROVIDER_LATENCY", "5")
+    transcripts, notes = tmp_path / "t", tmp_path / "n"
+    transcripts.mkdir()
+    notes.mkdir()
+    config = {
+        "api_key": "fake",
+        "provider": "fake",
+        "transcript_dir": str(transcripts),
+        "notes_dir": str(notes),
+        "note_templates": [],
+        "drive": None,
+    }
+
+    pool = ShardedWorkerPool(1)
+    pool.start()
+    try:
+        for n in range(2):
+            wav_path = tmp_path / f"job{n}.wav"
+            _write_wav(wav_path)
+            pool.submit(
+                {
+                    "id": f"job{n}",
+                    "user_id": "user0",
+                    "wav_path": str(wav_path),
+                    "meeting_info": {"title": f"Sync {n}", "attendees": []},
+                    "timestamp": f"2026-01-01_10-00-0{n}",
+                    "config": config,
+                    "record_path": str(tmp_path / f"job{n}.json"),
+                }
+            )
+        deadline = time.monotonic() + 60
+        while pool.get("job0")["state"] != "processing":
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+        # The replacement inherits the environment as it is now
+        monkeypatch.setenv("FAKE_PROVIDER_LATENCY", "0")
+        pool._processes[0].kill()
+        assert pool.wait_idle(timeout=120)
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert pool.get("job0")["state"] == "failed"
+    assert "Worker process died" in pool.get("job0")["error"]
+    assert pool.get("job1")["state"] == "done"
+    assert stats["restarts"] == 1 and stats["alive"] == [True]
+    assert (tmp_path / "job0.wav").exists()  # kept for a retry
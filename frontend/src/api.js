@@ -36,6 +36,7 @@ const api = {
   startRecording: (body) => apiPost("/api/recording/start", body),
   stopRecording: () => apiPost("/api/recording/stop"),
   recordingStatus: () => apiGet("/api/recording/status"),
+  recordingLevels: () => apiGet("/api/recording/levels"),
   listNotes: () => apiGet("/api/notes/list"),
 
   // Saved recordings (failed processing)
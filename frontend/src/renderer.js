@@ -22,6 +22,11 @@ const setupBanner = document.getElementById("setup-banner");
 const setupBannerBtn = document.getElementById("setup-banner-btn");
 const savedSection = document.getElementById("saved-section");
 const savedList = document.getElementById("saved-list");
+const levelMeters = document.getElementById("level-meters");
+const micLevel = document.getElementById("mic-level");
+const systemLevel = document.getElementById("system-level");
+const systemLevelRow = document.getElementById("system-level-row");
+const levelWarning = document.getElementById("level-warning");
 
 // ===== DOM Elements — Settings View =====
 const settingsToggle = document.getElementById("settings-toggle");
@@ -54,6 +59,7 @@ let isRecording = false;
 let isProcessing = false;
 let timerInterval = null;
 let statusPollInterval = null;
+let levelPollInterval = null;
 let recordingStartTime = null;
 let selectedMeeting = null;
 let pickerOpen = false;
@@ -477,6 +483,10 @@ async function startRecording() {
     recordingStartTime = Date.now();
     elapsedTime.style.display = "inline";
     timerInterval = setInterval(updateTimer, 1000);
+
+    // Live levels
+    levelMeters.style.display = "block";
+    levelPollInterval = setInterval(pollLevels, 500);
   } catch (err) {
     showError(`Failed to start recording: ${err.message}`);
     recordBtn.disabled = false;
@@ -488,7 +498,9 @@ async function stopRecording() {
     recordBtn.disabled = true;
     isRecording = false;
     clearInterval(timerInterval);
+    clearInterval(levelPollInterval);
     elapsedTime.style.display = "none";
+    levelMeters.style.display = "none";
 
     await api.stopRecording();
     isProcessing = true;
@@ -550,6 +562,40 @@ async function pollProcessingStatus() {
   }
 }
 
+// ===== Live Levels =====
+
+// Map dBFS (-60..0) onto a 0-100% bar
+function levelPercent(dbfs) {
+  return Math.max(0, Math.min(100, ((dbfs + 60) / 60) * 100));
+}
+
+async function pollLevels() {
+  try {
+    const data = await api.recordingLevels();
+    if (!data.recording) return;
+
+    micLevel.style.width = `${levelPercent(data.mic.rms_dbfs)}%`;
+    if (data.system) {
+      systemLevelRow.style.display = "flex";
+      systemLevel.style.width = `${levelPercent(data.system.rms_dbfs)}%`;
+    } else {
+      systemLevelRow.style.display = "none";
+    }
+
+    const warnings = [];
+    if (data.mic.silent_seconds >= 10) warnings.push("Mic is silent — is it muted?");
+    if (data.system && data.system.silent_seconds >= 30) {
+      warnings.push("No system audio detected");
+    }
+    if (data.capture && data.capture.dropped_seconds > 0) {
+      warnings.push(`Mic audio dropped (${data.capture.dropped_seconds}s) — system overloaded?`);
+    }
+    levelWarning.textContent = warnings.join(" ");
+  } catch {
+    // Ignore transient errors during polling
+  }
+}
+
 // ===== Notes List =====
 
 function openInObsidian(filename) {
@@ -598,6 +644,15 @@ async function fetchNotesList() {
 
 // ===== Saved Recordings =====
 
+function formatSavedSize(rec) {
+  const mb = (bytes) => `${(bytes / 1e6).toFixed(1)} MB`;
+  if (rec.stored_bytes == null) return "";
+  const format = (rec.audio_format || "wav").toUpperCase();
+  return rec.saved_bytes > 0
+    ? `${mb(rec.stored_bytes)} ${format} (${mb(rec.saved_bytes)} saved)`
+    : `${mb(rec.stored_bytes)} ${format}`;
+}
+
 async function fetchSavedRecordings() {
   try {
     const data = await api.savedRecordings();
@@ -610,6 +665,7 @@ async function fetchSavedRecordings() {
           <div class="saved-info">
             <div class="saved-title">${escapeHtml(rec.title)}</div>
             <div class="saved-error">${escapeHtml(rec.error)}</div>
+            <div class="saved-error">${formatSavedSize(rec)}</div>
           </div>
           <button class="saved-retry-btn" data-id="${escapeHtml(rec.id)}">Retry</button>
         </li>